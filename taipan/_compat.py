@@ -2,9 +2,13 @@
 Compatibility shims for different Python versions and platforms.
 """
 import sys
+import time
 IS_PY26 = sys.version_info[:2] == (2, 6)
 IS_PY3 = sys.version_info[0] == 3
 
+#: Whether ``async def`` generators are supported (Python 3.6+).
+HAS_ASYNC_GENERATORS = sys.version_info[:2] >= (3, 6)
+
 
 # Modules
 
@@ -26,9 +30,21 @@ try:
 except ImportError:
     from io import StringIO
 
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+try:
+    from concurrent import futures
+except ImportError:
+    futures = None  # Python 2 without the `futures` backport
+
 
 # Global symbols
 
+memoryview = getattr(builtins, 'memoryview', None)  # None on Python 2.6
+monotonic = getattr(time, 'monotonic', time.time)
 unichr = chr if IS_PY3 else unichr
 xrange = range if IS_PY3 else xrange
 
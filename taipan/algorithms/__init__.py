@@ -0,0 +1,3070 @@
+"""
+General purpose algorithms dealing with data structures.
+"""
+from __future__ import absolute_import
+
+from array import array
+from collections import deque
+from itertools import chain, cycle as cycle_, groupby, islice, repeat
+import heapq
+import math
+import multiprocessing
+import os
+from numbers import Integral
+from operator import itemgetter
+import pickle
+import random
+import sys
+import tempfile
+import threading
+
+from taipan._compat import (IS_PY3, futures, imap, izip, memoryview,
+                            monotonic, queue, xrange)
+from taipan.collections import ensure_iterable, ensure_sequence
+from taipan.functional import ensure_callable, ensure_keyword_args
+from taipan.functional.combinators import compose
+from taipan.functional.functions import identity, zero
+from taipan.strings import BaseString
+
+
+__all__ = [
+    'batch', 'batch_file', 'broadcast', 'BroadcastLagError', 'cycle',
+    'intertwine', 'iterate', 'pad', 'prefetch', 'sample',
+    'unique', 'unique_justseen', 'window',
+    'merge_sorted', 'external_sorted', 'top', 'bottom',
+    'pmap',
+    'breadth_first', 'depth_first', 'iterative_deepening',
+    'shortest_path', 'bidirectional_search',
+    'topological_order', 'topological_layers', 'run_in_dependency_order',
+    'critical_path', 'strongly_connected_components', 'CycleError',
+    'compile_graph', 'CompiledGraph', 'ReachabilityIndex',
+    'DynamicTopologicalOrder',
+]
+
+
+# Itertools recipes
+
+def batch(iterable, n=None, fillvalue=None,
+          max_weight=None, weight=None, max_wait=None):
+    """Batches the elements of given iterable.
+
+    Resulting iterable will yield tuples containing at most ``n`` elements
+    (might be less if ``fillvalue`` isn't specified).
+
+    Besides (or instead of) the number of elements, batches can be also
+    bounded by their total weight (e.g. size in bytes) and by the time
+    spent waiting for their elements.
+
+    :param n: Number of items in every batch
+    :param fillvalue: Value to fill the last batch with. If None, last batch
+                      might be shorter than ``n`` elements.
+                      Only allowed if batches are bounded by ``n`` alone.
+    :param max_weight: Maximum total weight of elements in a batch.
+                       An element heavier than that is put in a batch alone.
+    :param weight: Function returning weight of an element.
+                   By default, :func:`len` is used.
+    :param max_wait: Maximum time (in seconds) since the first element
+                     of a batch was received, after which the batch is
+                     yielded even if it's not full.
+                     The ``iterable`` is then read on a background thread.
+
+    :return: Iterable of batches
+
+    When batching by ``n`` alone (without ``fillvalue``), binary buffers
+    (:class:`bytes`, :class:`bytearray`, :class:`memoryview`,
+    :class:`array.array`) are split into :class:`memoryview` chunks,
+    and NumPy arrays into slices, rather than tuples of their elements.
+    No data is copied in those cases, except for :class:`array.array`
+    on Python 2 (and all buffers on Python 2.6), which don't support
+    :class:`memoryview` and are split into copied slices instead.
+
+    Example::
+
+        for rows in batch(rows, 1000, max_weight=2 ** 20, weight=row_size):
+            insert_rows(rows)
+
+    .. note::
+
+        This is an extended version of grouper() recipe
+        from the :module:`itertools` module documentation.
+
+    .. versionchanged:: 0.0.4
+       Added ``max_weight``, ``weight`` and ``max_wait`` arguments.
+       Binary buffers and NumPy arrays are batched without copying.
+    """
+    ensure_iterable(iterable)
+    weight = _ensure_batch_args(n, fillvalue, max_weight, weight, max_wait)
+
+    if max_weight is None and max_wait is None:
+        return _batch_by_count(iterable, n, fillvalue)
+    if max_wait is None:
+        return _batch_by_weight(iterable, n, max_weight, weight)
+    return _batch_by_time(iterable, n, max_weight, weight, max_wait)
+
+
+def batch_file(file_, n):
+    """Reads a binary file in batches of bytes.
+
+    All batches are read into the same, reusable buffer, so no memory
+    is allocated per batch. As a consequence, every batch is only valid
+    until the next one is retrieved, and must be copied (e.g. with
+    :func:`bytes`) if it's needed for longer.
+
+    :param file_: Binary file object supporting ``readinto()``
+    :param n: Number of bytes in every batch. The last batch
+              might be shorter.
+
+    :return: Iterable of :class:`memoryview` batches.
+             On Python 2.6, which lacks :class:`memoryview`,
+             batches are instead newly allocated :class:`bytes` objects.
+
+    Example::
+
+        with open('data.bin', 'rb') as f:
+            for chunk in batch_file(f, 2 ** 16):
+                digest.update(chunk)
+
+    .. versionadded:: 0.0.4
+    """
+    if not hasattr(file_, 'readinto'):
+        raise TypeError(
+            "expected a file object with readinto(), got %s" % (
+                type(file_).__name__,))
+    if not isinstance(n, Integral):
+        raise TypeError("invalid number of bytes in a batch")
+    if not (n > 0):
+        raise ValueError("number of bytes in a batch must be positive")
+
+    if memoryview is None:
+        return iter(lambda: file_.read(n), b'')
+
+    def generator():
+        buffer_ = memoryview(bytearray(n))
+        while True:
+            # raw streams can return less than requested before EOF,
+            # so keep reading until the buffer is full
+            size = 0
+            while size < n:
+                count = file_.readinto(buffer_[size:])
+                if not count:
+                    break
+                size += count
+
+            if size:
+                yield buffer_[:size]
+            if size < n:
+                break
+
+    return generator()
+
+
+def broadcast(iterable, n, max_lag=1024, block=False):
+    """Splits an iterable into ``n`` independent iterables,
+    each yielding all of its elements.
+
+    Unlike :func:`itertools.tee`, memory used is bounded: elements
+    are kept in a shared ring buffer of ``max_lag`` elements.
+    What happens when a consumer falls more than ``max_lag`` elements
+    behind the most advanced one depends on ``block``:
+
+    * if False (default), the lagging consumer fails fast, raising
+      :class:`BroadcastLagError` when it requests the next element;
+      other consumers are unaffected
+    * if True, the most advanced consumer waits for the lagging ones
+      to catch up. This only makes sense when every consumer runs
+      in a separate thread; otherwise, it would wait forever.
+
+    The resulting iterators are thread-safe. Calling ``close()`` on one
+    of them (or letting it get garbage-collected) makes others
+    stop waiting for it.
+
+    :param n: Number of resulting iterables
+    :param max_lag: Maximum number of elements that a consumer
+                    can lag behind the most advanced one
+    :param block: Whether to block the most advanced consumer
+                  rather than fail the lagging one
+
+    :return: Tuple of ``n`` iterators
+
+    Example::
+
+        counts, sums = broadcast(parse(stream), 2, block=True)
+        threads = [Thread(target=count, args=(counts,)),
+                   Thread(target=summarize, args=(sums,))]
+
+    .. versionadded:: 0.0.4
+    """
+    ensure_iterable(iterable)
+    if not isinstance(n, Integral):
+        raise TypeError("invalid number of iterables")
+    if n < 0:
+        raise ValueError("number of iterables must not be negative")
+    if not isinstance(max_lag, Integral):
+        raise TypeError("invalid maximum lag")
+    if not (max_lag > 0):
+        raise ValueError("maximum lag must be positive")
+
+    buffer_ = _BroadcastBuffer(iterable, n, max_lag, block)
+    return tuple(_BroadcastConsumer(buffer_, i) for i in xrange(n))
+
+
+class BroadcastLagError(RuntimeError):
+    """Error raised by an iterable returned from :func:`broadcast`
+    when it has fallen too far behind the others.
+
+    .. versionadded:: 0.0.4
+    """
+
+
+def cycle(iterable, n=None):
+    """Cycle through given iterable specific (or infinite) number of times.
+
+    :param n: Number of cycles.
+              If None, result cycles through ``iterable`` indefinitely.
+
+    :return: Iterable that cycles through given one
+
+    .. note::
+
+        This is an extended version of ncycles() recipe
+        from the :module:`itertools` module documentation
+        that also has the functionality of standard :func:`itertools.cycle`.
+    """
+    ensure_iterable(iterable)
+
+    if n is None:
+        return cycle_(iterable)
+    else:
+        if not isinstance(n, Integral):
+            raise TypeError("invalid number of cycles")
+        if n < 0:
+            raise ValueError("number of cycles cannot be negative")
+
+        return chain.from_iterable(repeat(tuple(iterable), n))
+
+
+def intertwine(*iterables, **kwargs):
+    """Constructs an iterable which intertwines given iterables.
+
+    The resulting iterable will return an item from first sequence,
+    then from second, etc. until the last one - and then another item from
+    first, then from second, etc. - up until all iterables are exhausted.
+
+    Exhausted iterables are dropped from the rotation, so the cost
+    of every item is constant regardless of how many of them there are.
+
+    :param weights: Optional keyword argument with a sequence of positive
+                    integers, one for every iterable, specifying how many
+                    items to take from it in every turn
+
+    .. versionchanged:: 0.0.4
+       Added ``weights`` argument.
+    """
+    iterables = tuple(imap(ensure_iterable, iterables))
+
+    ensure_keyword_args(kwargs, optional=('weights',))
+    weights = kwargs.get('weights')
+    if weights is None:
+        def generator():
+            iterators = deque(imap(iter, iterables))
+            while iterators:
+                try:
+                    item = next(iterators[0])
+                except StopIteration:
+                    iterators.popleft()
+                else:
+                    yield item
+                    iterators.rotate(-1)
+        return generator()
+
+    ensure_sequence(weights)
+    if len(weights) != len(iterables):
+        raise ValueError("expected %s weights, got %s" % (
+            len(iterables), len(weights)))
+    for weight in weights:
+        if not isinstance(weight, Integral):
+            raise TypeError("invalid weight")
+        if not (weight > 0):
+            raise ValueError("weights must be positive")
+
+    def generator():
+        turns = deque(izip(imap(iter, iterables), weights))
+        while turns:
+            iterator, weight = turns[0]
+            count = 0
+            for item in islice(iterator, weight):
+                count += 1
+                yield item
+            if count < weight:
+                turns.popleft()
+            else:
+                turns.rotate(-1)
+
+    return generator()
+
+
+def iterate(iterator, n=None):
+    """Efficiently advances the iterator N times; by default goes to its end.
+
+    The actual loop is done "in C" and hence it is faster than equivalent 'for'.
+
+    :param n: How much the iterator should be advanced.
+              If None, it will be advanced until the end.
+    """
+    ensure_iterable(iterator)
+    if n is None:
+        deque(iterator, maxlen=0)
+    else:
+        next(islice(iterator, n, n), None)
+
+
+def pad(iterable, with_=None):
+    """Pad the end of given iterable with infinite sequence of given values.
+
+    :param with_: Object to pad the iterable with. None by default.
+
+    :return: New iterable yielding elements of given ``iterable``,
+             which are then followed by infinite number of ``with_`` values
+    """
+    ensure_iterable(iterable)
+    return chain(iterable, repeat(with_))
+
+
+def prefetch(iterable, n, executor=None):
+    """Reads elements of given iterable in advance, on a background thread.
+
+    This allows the production of elements (e.g. reading and decompressing
+    files) to overlap with their consumption, as long as at least one of
+    them releases the GIL (like I/O does).
+
+    :param n: Maximum number of elements to read in advance
+    :param executor: Optional thread pool executor
+                     (:class:`concurrent.futures.ThreadPoolExecutor`)
+                     to read the elements on.
+                     By default, a dedicated thread is started.
+
+    :return: Iterable of the same elements. Exceptions raised by
+             ``iterable`` are re-raised when their position is reached.
+             Closing the result (or letting it get garbage-collected)
+             stops the background reading.
+
+    Example::
+
+        for record in prefetch(read_records(path), 100):
+            process(record)
+
+    .. versionadded:: 0.0.4
+    """
+    ensure_iterable(iterable)
+    if not isinstance(n, Integral):
+        raise TypeError("invalid number of elements to prefetch")
+    if not (n > 0):
+        raise ValueError("number of elements to prefetch must be positive")
+
+    def generator():
+        reader = _BackgroundIterator(iterable, maxsize=n, executor=executor)
+        try:
+            while True:
+                elem = reader.get()
+                if elem is _ABSENT:
+                    break
+                yield elem
+        finally:
+            reader.close()
+
+    return generator()
+
+
+def sample(iterable, k, weights=None, seed=None):
+    """Randomly chooses ``k`` elements from given iterable,
+    reading it only once and keeping at most ``k`` elements in memory.
+
+    Without ``weights``, every element is equally likely to be chosen.
+    Algorithm L is used: after the first ``k`` elements, the number
+    of elements to skip before the next replacement is drawn directly,
+    and those elements are consumed without further random draws.
+
+    With ``weights``, elements are chosen with probabilities proportional
+    to their weights, using the A-ExpJ algorithm (weighted sampling
+    without replacement, with exponential jumps).
+
+    :param k: Number of elements to choose
+    :param weights: Optional function taking an element and returning
+                    its (non-negative) weight.
+                    Elements of zero weight are never chosen.
+    :param seed: Optional seed for the random number generator
+
+    :return: List of at most ``k`` chosen elements, in no particular order.
+             If the iterable has fewer than ``k`` elements
+             (of non-zero weight), all of them are returned.
+
+    Example::
+
+        for event in sample(read_events(log_file), 1000):
+            inspect(event)
+
+    .. versionadded:: 0.0.4
+    """
+    ensure_iterable(iterable)
+    if not isinstance(k, Integral):
+        raise TypeError("invalid sample size")
+    if k < 0:
+        raise ValueError("sample size must not be negative")
+    if weights is not None:
+        ensure_callable(weights)
+
+    rng = random.Random(seed)
+    if k == 0:
+        return []
+    if weights is None:
+        return _sample_uniform(iterable, k, rng)
+    return _sample_weighted(iterable, k, weights, rng)
+
+
+def unique(iterable, key=None, window=None, error_rate=None, capacity=None):
+    """Removes duplicates from given iterable, using given key as criterion.
+
+    By default, all the keys seen so far are remembered,
+    so the memory used grows with the number of unique elements.
+    To bound it, either ``window`` or ``error_rate`` and ``capacity``
+    can be specified.
+
+    :param key: Key function which returns a hashable,
+                uniquely identifying an object.
+                By default, elements themselves are used as keys.
+    :param window: Number of most recently seen keys to remember.
+                   Duplicates further apart than that are not removed.
+    :param error_rate: Probability of an unique element being mistakenly
+                       considered a duplicate. If given, a Bloom filter
+                       is used instead of remembering the keys exactly.
+    :param capacity: Expected number of unique elements;
+                     required with ``error_rate``.
+                     The Bloom filter takes roughly
+                     ``-capacity * ln(error_rate) / (8 * ln(2)^2)`` bytes.
+
+    :return: Iterable with duplicates removed
+
+    .. versionchanged:: 0.0.4
+       Elements are compared by themselves rather than by their hashes.
+       Added ``window``, ``error_rate`` and ``capacity`` arguments.
+    """
+    ensure_iterable(iterable)
+    key = identity() if key is None else ensure_callable(key)
+
+    seen = _seen_keys(window, error_rate, capacity)
+    if seen is not None:
+        def generator():
+            for elem in iterable:
+                if seen.add(key(elem)):
+                    yield elem
+        return generator()
+
+    def generator():
+        seen = set()
+        for elem in iterable:
+            k = key(elem)
+            if k not in seen:
+                seen.add(k)
+                yield elem
+
+    return generator()
+
+
+def unique_justseen(iterable, key=None):
+    """Removes consecutive duplicates from given iterable,
+    using given key as criterion.
+
+    For sorted iterables, this removes all duplicates
+    while using only constant memory.
+
+    :param key: Key function which returns a value
+                that is compared between consecutive elements.
+                By default, elements themselves are compared.
+
+    :return: Iterable with consecutive duplicates removed
+
+    .. versionadded:: 0.0.4
+    """
+    ensure_iterable(iterable)
+    if key is not None:
+        ensure_callable(key)
+
+    return imap(next, imap(itemgetter(1), groupby(iterable, key)))
+
+
+def window(iterable, n, step=1, copy=True):
+    """Constructs an iterable of sliding windows over given iterable.
+
+    Only full windows are yielded: if the iterable is shorter than ``n``,
+    the result is empty, and trailing elements which don't fill a window
+    after the final ``step`` are omitted.
+
+    :param n: Number of elements in every window
+    :param step: Number of elements the window is moved by in every step
+    :param copy: Whether every window should be a new tuple (default).
+                 If False, the same :class:`collections.deque` is yielded
+                 every time, modified in place; it must not be altered,
+                 and is only valid until the next window is retrieved.
+
+    :return: Iterable of windows
+
+    For NumPy arrays, the result is a read-only, strided view
+    of the array, with the windows along its first axis; no data is copied.
+    This allows to compute rolling statistics in a vectorized way::
+
+        rolling_mean = window(samples, 100).mean(axis=1)
+
+    .. versionadded:: 0.0.4
+    """
+    ensure_iterable(iterable)
+    if not isinstance(n, Integral):
+        raise TypeError("invalid window size")
+    if not (n > 0):
+        raise ValueError("window size must be positive")
+    if not isinstance(step, Integral):
+        raise TypeError("invalid window step")
+    if not (step > 0):
+        raise ValueError("window step must be positive")
+
+    if _is_ndarray(iterable):
+        return _ndarray_windows(iterable, n, step)
+
+    def generator():
+        iterator = iter(iterable)
+        window_ = deque(islice(iterator, n), maxlen=n)
+        if len(window_) < n:
+            return
+
+        if step == 1:
+            while True:
+                yield tuple(window_) if copy else window_
+                elem = next(iterator, _ABSENT)
+                if elem is _ABSENT:
+                    return
+                window_.append(elem)
+        else:
+            while True:
+                yield tuple(window_) if copy else window_
+                elems = tuple(islice(iterator, step))
+                if len(elems) < step:
+                    return
+                window_.extend(elems)
+
+    return generator()
+
+
+# Sorting
+
+def merge_sorted(*iterables, **kwargs):
+    """Merges sorted iterables into a single sorted iterable.
+
+    The iterables are consumed lazily, and only one element from each
+    is held in memory at a time. Merging is stable: equal elements
+    come in the order of iterables they originate from.
+
+    :param key: Optional keyword argument with a key function
+                that the iterables are sorted by
+    :param reverse: Optional keyword argument specifying whether
+                    the iterables are sorted in descending order
+
+    :return: Iterable of merged elements
+
+    .. versionadded:: 0.0.4
+    """
+    iterables = tuple(imap(ensure_iterable, iterables))
+
+    ensure_keyword_args(kwargs, optional=('key', 'reverse'))
+    key = kwargs.get('key')
+    key = identity() if key is None else ensure_callable(key)
+    if kwargs.get('reverse'):
+        key = compose(_ReversedKey, key)
+
+    def generator():
+        # heap entries are lists: [key, iterable index, element, iterator];
+        # the index ensures stability and that elements are never compared
+        heap = []
+        for index, iterable in enumerate(iterables):
+            iterator = iter(iterable)
+            for elem in islice(iterator, 1):
+                heap.append([key(elem), index, elem, iterator])
+        heapq.heapify(heap)
+
+        while len(heap) > 1:
+            entry = heap[0]
+            yield entry[2]
+            elem = next(entry[3], _ABSENT)
+            if elem is _ABSENT:
+                heapq.heappop(heap)
+            else:
+                entry[0], entry[2] = key(elem), elem
+                heapq.heapreplace(heap, entry)
+
+        if heap:
+            _, _, elem, iterator = heap[0]
+            yield elem
+            for elem in iterator:
+                yield elem
+
+    return generator()
+
+
+def top(iterable, k, key=None, reverse=False):
+    """Returns ``k`` largest elements of given iterable,
+    in descending order.
+
+    Only ``k`` elements are held in memory at a time. Most elements
+    are compared only against the smallest of those, and discarded.
+    Ties are resolved in favor of the elements which come first.
+
+    :param k: Number of elements to return
+    :param key: Optional key function that the elements are compared by
+    :param reverse: Whether to return ``k`` smallest elements instead,
+                    in ascending order (like :func:`bottom`)
+
+    :return: List of at most ``k`` elements. For one-dimensional NumPy
+             arrays (without a ``key``), an array is returned instead,
+             computed with :func:`numpy.partition` rather than in Python.
+
+    Example::
+
+        for request in top(requests, 10, key=attr_func('duration')):
+            print(request)
+
+    .. versionadded:: 0.0.4
+    """
+    return _top(iterable, k, key, largest=not reverse)
+
+
+def bottom(iterable, k, key=None, reverse=False):
+    """Returns ``k`` smallest elements of given iterable,
+    in ascending order.
+
+    This is the counterpart of :func:`top`; see its documentation
+    for details.
+
+    :param k: Number of elements to return
+    :param key: Optional key function that the elements are compared by
+    :param reverse: Whether to return ``k`` largest elements instead,
+                    in descending order (like :func:`top`)
+
+    :return: List (or NumPy array) of at most ``k`` elements
+
+    .. versionadded:: 0.0.4
+    """
+    return _top(iterable, k, key, largest=reverse)
+
+
+def external_sorted(iterable, key=None, reverse=False,
+                    max_memory=64 * 2 ** 20, sizeof=sys.getsizeof,
+                    dir=None, max_files=256):
+    """Sorts an iterable which may not fit in memory.
+
+    Elements are gathered in runs no larger than ``max_memory``, which are
+    sorted and spilled to temporary files. The runs are then lazily merged
+    (see :func:`merge_sorted`). If the whole ``iterable`` fits in a single
+    run, no files are created.
+
+    At most ``max_files`` runs are merged at once. If there are more,
+    they are merged in several passes: groups of runs are merged
+    into longer ones, spilled to temporary files again, and so on.
+
+    :param key: Optional key function to sort by
+    :param reverse: Whether to sort in descending order
+    :param max_memory: Maximum size (in bytes) of a single run,
+                       64 MiB by default
+    :param sizeof: Function estimating size (in bytes) of an element.
+                   By default, :func:`sys.getsizeof` is used,
+                   which doesn't take into account objects referenced
+                   by the element.
+    :param dir: Directory for the temporary files
+    :param max_files: Maximum number of runs merged at once, and thus
+                      of temporary files being read at the same time;
+                      256 by default. It should be comfortably below
+                      the limit of open files for the process.
+
+    :return: Iterable of sorted elements
+
+    Example::
+
+        with open('huge.log') as f:
+            for line in external_sorted(f, key=parse_timestamp):
+                process(line)
+
+    .. note::
+
+        Elements must be picklable. Sorting is stable.
+
+    .. versionadded:: 0.0.4
+    """
+    ensure_iterable(iterable)
+    if key is not None:
+        ensure_callable(key)
+    if not (max_memory > 0):
+        raise ValueError("maximum memory must be positive")
+    ensure_callable(sizeof)
+    if not isinstance(max_files, Integral):
+        raise TypeError("invalid maximum number of files")
+    if not (max_files >= 2):
+        raise ValueError("maximum number of files must be at least 2")
+
+    def generator():
+        runs = batch(iterable, max_weight=max_memory, weight=sizeof)
+        first_run = next(runs, None)
+        if first_run is None:
+            return
+        first_run = sorted(first_run, key=key, reverse=reverse)
+
+        second_run = next(runs, None)
+        if second_run is None:
+            for elem in first_run:
+                yield elem
+            return
+
+        # paths of temporary files, which are closed when not being read;
+        # all of them are removed in the end, regardless of errors
+        paths = []
+        merged_paths = []
+        readers = []
+        try:
+            paths.append(_spill(first_run, dir))
+            first_run = None  # allow the run to be garbage-collected
+            for run in chain([second_run], runs):
+                second_run = None
+                paths.append(_spill(sorted(run, key=key, reverse=reverse),
+                                    dir))
+            run = None
+
+            # merge consecutive groups of runs (which keeps sorting stable)
+            # until they can be merged all at once
+            while len(paths) > max_files:
+                merged_paths = []
+                for group in batch(paths, max_files):
+                    merged_paths.append(
+                        _merge_spilled(group, key, reverse, dir))
+                    for path in group:
+                        _remove_file(path)
+                paths, merged_paths = merged_paths, []
+
+            readers = list(imap(_unspill, paths))
+            for elem in merge_sorted(key=key, reverse=reverse, *readers):
+                yield elem
+        finally:
+            for reader in readers:
+                reader.close()
+            for path in chain(paths, merged_paths):
+                _remove_file(path)
+
+    return generator()
+
+
+# Concurrency
+
+def pmap(func, iterable, executor=None, chunksize=1, ordered=True,
+         max_in_flight=None):
+    """Lazily maps a function over an iterable in parallel, on an executor.
+
+    Elements are sent to the executor in chunks (see :func:`batch`),
+    and only a limited number of chunks is in flight at any time,
+    so that arbitrarily long (even infinite) iterables can be processed
+    in bounded memory. This is unlike :meth:`concurrent.futures.Executor.map`,
+    which submits all of the elements right away.
+
+    :param func: Function to apply to every element
+    :param executor: Optional :class:`concurrent.futures.Executor`,
+                     e.g. a thread or process pool.
+                     If omitted, elements are mapped sequentially.
+    :param chunksize: Number of elements submitted to the executor at once
+    :param ordered: Whether the results should be in the order of elements
+                    (default), or in the order of completion of their chunks
+    :param max_in_flight: Maximum number of chunks submitted to the executor
+                          and not yet consumed. By default, it's twice
+                          the number of CPUs.
+
+    :return: Iterable of results
+
+    Example::
+
+        with ProcessPoolExecutor() as executor:
+            for result in pmap(parse, read_lines(), executor, chunksize=256):
+                store(result)
+
+    .. note::
+
+        When using a process pool, ``func`` and the elements
+        must be picklable.
+
+    .. versionadded:: 0.0.4
+    """
+    ensure_callable(func)
+    ensure_iterable(iterable)
+    if not isinstance(chunksize, Integral):
+        raise TypeError("invalid chunk size")
+    if not (chunksize > 0):
+        raise ValueError("chunk size must be positive")
+    if max_in_flight is None:
+        max_in_flight = 2 * _cpu_count()
+    elif not isinstance(max_in_flight, Integral):
+        raise TypeError("invalid maximum number of chunks in flight")
+    elif not (max_in_flight > 0):
+        raise ValueError("maximum number of chunks in flight must be positive")
+
+    if executor is None:
+        return imap(func, iterable)
+
+    submit = lambda chunk: executor.submit(_map_chunk, func, chunk)
+
+    if ordered:
+        def generator():
+            chunks = batch(iter(iterable), chunksize)
+            pending = deque(imap(submit, islice(chunks, max_in_flight)))
+            try:
+                while pending:
+                    results = pending.popleft().result()
+                    # keep the executor busy while results are consumed
+                    for chunk in islice(chunks, 1):
+                        pending.append(submit(chunk))
+                    for result in results:
+                        yield result
+            finally:
+                for future in pending:
+                    future.cancel()
+    else:
+        def generator():
+            chunks = batch(iter(iterable), chunksize)
+            pending = set(imap(submit, islice(chunks, max_in_flight)))
+            try:
+                while pending:
+                    done, pending = futures.wait(
+                        pending, return_when=futures.FIRST_COMPLETED)
+                    for chunk in islice(chunks, len(done)):
+                        pending.add(submit(chunk))
+                    for future in done:
+                        for result in future.result():
+                            yield result
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    return generator()
+
+
+# Traversal
+
+def breadth_first(start, expand, visited=False, key=None,
+                  max_depth=None, annotated=False, executor=None):
+    """Performs a breadth-first search of a graph-like structure.
+
+    :param start: Node to start the search from
+    :param expand: Function taking a node as an argument and returning iterable
+                   of its child nodes
+    :param visited: Whether to keep track of visited nodes, so that each one
+                    is yielded (and expanded) only once.
+                    This is necessary for graphs with cycles.
+    :param key: Function returning a hashable, uniquely identifying a node.
+                By default, nodes are identified by their ``id()``.
+                Passing ``key`` implies ``visited=True``.
+    :param max_depth: Optional maximum depth of nodes to yield;
+                      ``start`` node has the depth of 0
+    :param annotated: Whether to yield ``(node, depth, parent)`` triples
+                      instead of just nodes. Parent of ``start`` is None.
+    :param executor: Optional :class:`concurrent.futures.Executor`.
+                     If provided, all nodes at given depth are expanded
+                     concurrently on it, while they are being yielded.
+                     The order of resulting nodes is unaffected.
+
+    :return: Iterable of nodes in the BFS order
+
+    Example::
+
+        tree = json.loads(some_data)
+        for item in breadth_first(tree, key_func('children', default=())):
+            do_something_with(item)
+
+    .. note::
+
+        When using a process pool as ``executor``, ``expand``
+        and the nodes must be picklable.
+
+    .. versionchanged:: 0.0.4
+       Added ``visited``, ``key``, ``max_depth``, ``annotated``
+       and ``executor`` arguments.
+    """
+    ensure_callable(expand)
+    first_visit = _first_visit_func(visited, key)
+    _ensure_max_depth(max_depth)
+
+    if executor is not None:
+        return _level_parallel_bfs(start, expand, first_visit,
+                                   max_depth, annotated, executor)
+
+    if not (first_visit or max_depth is not None or annotated):
+        def generator():
+            queue = deque([start])
+            while queue:
+                node = queue.popleft()
+                yield node
+                queue.extend(expand(node))
+        return generator()
+
+    def generator():
+        if first_visit:
+            first_visit(start)
+
+        # nodes are marked as visited when enqueued,
+        # so that each one is put in the queue only once
+        queue = deque([(start, 0, None)])
+        while queue:
+            entry = queue.popleft()
+            yield entry if annotated else entry[0]
+
+            node, depth, _ = entry
+            if depth == max_depth:
+                continue
+            for child in expand(node):
+                if not first_visit or first_visit(child):
+                    queue.append((child, depth + 1, node))
+
+    return generator()
+
+
+def depth_first(start, descend, visited=False, key=None,
+                max_depth=None, annotated=False):
+    """Performs a depth-first search of a graph-like structure.
+
+    :param start: Node to start the search from
+    :param descend: Function taking a node as an argument and returning
+                    iterable of its child nodes
+    :param visited: Whether to keep track of visited nodes, so that each one
+                    is yielded (and expanded) only once.
+                    This is necessary for graphs with cycles.
+    :param key: Function returning a hashable, uniquely identifying a node.
+                By default, nodes are identified by their ``id()``.
+                Passing ``key`` implies ``visited=True``.
+    :param max_depth: Optional maximum depth of nodes to yield;
+                      ``start`` node has the depth of 0
+    :param annotated: Whether to yield ``(node, depth, parent)`` triples
+                      instead of just nodes. Parent of ``start`` is None.
+
+    :return: Iterable of nodes in the DFS order
+
+    Example::
+
+        for node in depth_first(graph, attr_func('adjacent'), visited=True):
+            visit(node)
+
+    .. versionchanged:: 0.0.4
+       Added ``visited``, ``key``, ``max_depth`` and ``annotated`` arguments.
+    """
+    ensure_callable(descend)
+    first_visit = _first_visit_func(visited, key)
+    _ensure_max_depth(max_depth)
+
+    if not (first_visit or max_depth is not None or annotated):
+        def generator():
+            stack = [start]
+            while stack:
+                node = stack.pop()
+                yield node
+                stack.extend(descend(node))
+        return generator()
+
+    def generator():
+        # nodes are marked as visited when popped from the stack,
+        # as otherwise the result wouldn't be in the DFS order
+        stack = [(start, 0, None)]
+        while stack:
+            entry = stack.pop()
+            node, depth, _ = entry
+            if first_visit and not first_visit(node):
+                continue
+
+            yield entry if annotated else node
+
+            if depth == max_depth:
+                continue
+            stack.extend((child, depth + 1, node) for child in descend(node))
+
+    return generator()
+
+
+def iterative_deepening(start, expand, max_depth=None, annotated=False):
+    """Performs an iterative deepening depth-first search
+    of a graph-like structure.
+
+    Nodes are yielded in the BFS order, but the memory used is only
+    proportional to the depth of the graph rather than its width.
+    The price is that nodes at depth ``d`` are expanded ``d`` times.
+
+    :param start: Node to start the search from
+    :param expand: Function taking a node as an argument and returning iterable
+                   of its child nodes
+    :param max_depth: Optional maximum depth of nodes to yield;
+                      ``start`` node has the depth of 0
+    :param annotated: Whether to yield ``(node, depth, parent)`` triples
+                      instead of just nodes. Parent of ``start`` is None.
+
+    :return: Iterable of nodes in the BFS order
+
+    .. warning::
+
+        Visited nodes are not tracked (that would defeat the memory bound),
+        so on graphs with cycles the ``max_depth`` must be provided.
+
+    .. versionadded:: 0.0.4
+    """
+    ensure_callable(expand)
+    _ensure_max_depth(max_depth)
+
+    def generator():
+        limit = 0
+        while max_depth is None or limit <= max_depth:
+            if limit == 0:
+                yield (start, 0, None) if annotated else start
+                limit += 1
+                continue
+
+            # depth-limited DFS over lazy child iterators;
+            # ``path[i]`` is the node at depth ``i`` whose children
+            # are being iterated over by ``iterators[i]``
+            found = False
+            path = [start]
+            iterators = [iter(expand(start))]
+            while iterators:
+                child = next(iterators[-1], _ABSENT)
+                if child is _ABSENT:
+                    iterators.pop()
+                    path.pop()
+                    continue
+
+                depth = len(path)
+                if depth == limit:
+                    found = True
+                    yield (child, depth, path[-1]) if annotated else child
+                else:
+                    path.append(child)
+                    iterators.append(iter(expand(child)))
+
+            if not found:
+                break
+            limit += 1
+
+    return generator()
+
+
+def shortest_path(start, goal, expand_weighted, heuristic=None, key=None):
+    """Finds the shortest path between two nodes of a weighted graph,
+    using Dijkstra's algorithm, or A* if a heuristic is provided.
+
+    :param start: Node to start the search from
+    :param goal: Node to find the path to
+    :param expand_weighted: Function taking a node as an argument and returning
+                            iterable of ``(child, weight)`` pairs.
+                            Weights must be non-negative.
+    :param heuristic: Optional function taking a node and returning
+                      an estimate of the distance from it to ``goal``.
+                      The estimate must be consistent: never greater than
+                      the weight of an edge to a neighbor plus the estimate
+                      for that neighbor (and thus never greater than
+                      the actual distance).
+    :param key: Function returning a hashable, uniquely identifying a node.
+                By default, nodes themselves are used, so they must be
+                hashable.
+
+    :return: Tuple of ``(distance, path)``, where ``path`` is a list
+             of nodes from ``start`` to ``goal`` (inclusive),
+             or None if ``goal`` is unreachable
+    :raise ValueError: When a negative weight is encountered
+
+    Example::
+
+        distance, path = shortest_path(
+            home, office, attr_func('roads'),
+            heuristic=lambda place: place.distance_to(office))
+
+    .. versionadded:: 0.0.4
+    """
+    ensure_callable(expand_weighted)
+    if heuristic is not None:
+        ensure_callable(heuristic)
+    key = identity() if key is None else ensure_callable(key)
+
+    goal_key = key(goal)
+    start_key = key(start)
+    estimate = heuristic or zero()
+
+    # ``distances`` hold the best known distances to nodes, while ``parents``
+    # the (key, node) pairs of the preceding nodes on the best known paths;
+    # outdated heap entries are skipped when popped (lazy deletion)
+    distances = {start_key: 0}
+    parents = {start_key: None}
+    finished = set()
+    heap = [(estimate(start), 0, start_key, start)]
+    counter = 1  # breaks ties between entries, so nodes are never compared
+
+    while heap:
+        _, _, k, node = heapq.heappop(heap)
+        if k in finished:
+            continue
+        if k == goal_key:
+            path = [node]
+            parent = parents[k]
+            while parent is not None:
+                k, node = parent
+                path.append(node)
+                parent = parents[k]
+            path.reverse()
+            return distances[goal_key], path
+
+        finished.add(k)
+        distance = distances[k]
+        for child, weight in expand_weighted(node):
+            if weight < 0:
+                raise ValueError("negative weight %r of edge %r -> %r" % (
+                    weight, node, child))
+            child_key = key(child)
+            if child_key in finished:
+                continue
+
+            child_distance = distance + weight
+            best_distance = distances.get(child_key)
+            if best_distance is None or child_distance < best_distance:
+                distances[child_key] = child_distance
+                parents[child_key] = (k, node)
+                heapq.heappush(heap, (child_distance + estimate(child),
+                                      counter, child_key, child))
+                counter += 1
+
+    return None
+
+
+def bidirectional_search(start, goal, expand, expand_reverse, key=None):
+    """Finds a path between two nodes of a graph, searching from both ends.
+
+    Breadth-first searches are run simultaneously from ``start``
+    along the edges, and from ``goal`` against them, always advancing
+    the smaller frontier by one level. They stop when the frontiers meet,
+    which typically happens after exploring far fewer nodes than
+    a one-sided search would.
+
+    :param start: Node to start the search from
+    :param goal: Node to find the path to
+    :param expand: Function taking a node as an argument and returning
+                   iterable of its child nodes
+    :param expand_reverse: Function taking a node as an argument and returning
+                           iterable of its parent nodes, i.e. those which have
+                           the node among their children
+    :param key: Function returning a hashable, uniquely identifying a node.
+                By default, nodes themselves are used, so they must be
+                hashable.
+
+    :return: List of nodes on a shortest path from ``start`` to ``goal``
+             (inclusive), or None if ``goal`` is unreachable
+
+    Example::
+
+        if bidirectional_search(module, other, imports, imported_by):
+            print("%s depends on %s" % (module, other))
+
+    .. versionadded:: 0.0.4
+    """
+    ensure_callable(expand)
+    ensure_callable(expand_reverse)
+    key = identity() if key is None else ensure_callable(key)
+
+    start_key, goal_key = key(start), key(goal)
+    if start_key == goal_key:
+        return [start]
+
+    # for both searches, mappings of node keys to triples of
+    # (node, depth, parent's key) and lists of keys of the frontier nodes
+    forward = {start_key: (start, 0, None)}
+    backward = {goal_key: (goal, 0, None)}
+    forward_frontier = [start_key]
+    backward_frontier = [goal_key]
+
+    while forward_frontier and backward_frontier:
+        if len(forward_frontier) <= len(backward_frontier):
+            forward_frontier, meeting = _bidirectional_step(
+                forward_frontier, forward, backward, expand, key)
+        else:
+            backward_frontier, meeting = _bidirectional_step(
+                backward_frontier, backward, forward, expand_reverse, key)
+
+        if meeting is not None:
+            path = _bidirectional_path(forward, meeting)
+            path.reverse()
+            path.pop()  # meeting node would be included twice
+            path.extend(_bidirectional_path(backward, meeting))
+            return path
+
+    return None
+
+
+def topological_order(nodes, incoming, key=None):
+    """Performs topological sort of a DAG-like structure
+    (directed acyclic graph).
+
+    :param nodes: Iterable of nodes
+    :param incoming: Function taking node as an argument and returning iterable
+                     of nodes with edges pointing _towards_ given one
+    :param key: Optional function returning a hashable, uniquely identifying
+                a node. By default, nodes are identified by their ``id()``.
+
+    :return: Iterable of nodes in the topological order
+    :raise CycleError: When a cycle is found in the graph
+                       (raised during iteration)
+
+    .. note::
+
+        ``incoming`` function works in _reverse_ to the typical adjacency
+        relation in graphs: if ``A in incoming(B)``, it implies that ``A->B``
+        is among the graph edges (**not** ``B->A``!).
+
+        This reversal is useful in practice when dealing with graphs
+        representing dependencies, module imports, header includes, and so on.
+
+    Example::
+
+        for package in topological_order(packages, attr_func('dependencies')):
+            install(package)
+
+    .. versionadded:: 0.0.4
+    """
+    ensure_iterable(nodes)
+    ensure_callable(incoming)
+    key = id if key is None else ensure_callable(key)
+
+    def generator():
+        graph = _IncomingGraph(nodes, incoming, key)
+        for k in _kahn_order(graph):
+            yield graph.nodes[k]
+
+    return generator()
+
+
+def topological_layers(nodes, incoming, key=None):
+    """Splits a DAG-like structure (directed acyclic graph) into layers
+    of mutually independent nodes.
+
+    Every node in a layer has all its predecessors in the preceding layers,
+    so all nodes within a single layer can be processed in parallel.
+
+    :param nodes: Iterable of nodes
+    :param incoming: Function taking node as an argument and returning iterable
+                     of nodes with edges pointing _towards_ given one
+    :param key: Optional function returning a hashable, uniquely identifying
+                a node. By default, nodes are identified by their ``id()``.
+
+    :return: Iterable of tuples of nodes, one tuple per layer
+    :raise CycleError: When a cycle is found in the graph
+                       (raised during iteration)
+
+    .. seealso:: :func:`topological_order`
+
+    .. versionadded:: 0.0.4
+    """
+    ensure_iterable(nodes)
+    ensure_callable(incoming)
+    key = id if key is None else ensure_callable(key)
+
+    def generator():
+        graph = _IncomingGraph(nodes, incoming, key)
+        indegrees = graph.indegrees()
+
+        layer = [k for k in graph.keys if not indegrees[k]]
+        while layer:
+            yield tuple(graph.nodes[k] for k in layer)
+            next_layer = []
+            for k in layer:
+                for succ in graph.outgoing[k]:
+                    indegrees[succ] -= 1
+                    if not indegrees[succ]:
+                        next_layer.append(succ)
+            layer = next_layer
+
+        graph.check_resolved(indegrees)
+
+    return generator()
+
+
+def run_in_dependency_order(nodes, incoming, func, executor=None, key=None):
+    """Calls a function on every node of a DAG-like structure,
+    making sure all predecessors of a node are finished before it's processed.
+
+    With an ``executor``, every node is submitted to it as soon as
+    all its predecessors have finished, allowing independent nodes
+    to be processed concurrently.
+
+    :param nodes: Iterable of nodes
+    :param incoming: Function taking node as an argument and returning iterable
+                     of nodes with edges pointing _towards_ given one
+    :param func: Function to call on every node
+    :param executor: Optional :class:`concurrent.futures.Executor`,
+                     e.g. a thread or process pool.
+                     If omitted, nodes are processed sequentially
+                     in the topological order.
+    :param key: Optional function returning a hashable, uniquely identifying
+                a node. By default, nodes are identified by their ``id()``.
+
+    :return: List of ``(node, result)`` pairs, in the order of completion
+    :raise CycleError: When a cycle is found in the graph.
+                       Nothing is processed in this case.
+
+    If ``func`` raises an exception, no more nodes are submitted,
+    pending ones are cancelled, and the exception is propagated.
+
+    Example::
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            run_in_dependency_order(packages, attr_func('dependencies'),
+                                    install, executor=executor)
+
+    .. note::
+
+        When using a process pool, ``func`` and the nodes must be picklable.
+
+    .. versionadded:: 0.0.4
+    """
+    ensure_iterable(nodes)
+    ensure_callable(incoming)
+    ensure_callable(func)
+    key = id if key is None else ensure_callable(key)
+
+    graph = _IncomingGraph(nodes, incoming, key)
+    order = list(_kahn_order(graph))  # detects cycles before running anything
+
+    if executor is None:
+        return [(graph.nodes[k], func(graph.nodes[k])) for k in order]
+
+    results = []
+    indegrees = graph.indegrees()
+    ready = deque(k for k in graph.keys if not indegrees[k])
+    running = {}
+    try:
+        while ready or running:
+            while ready:
+                k = ready.popleft()
+                running[executor.submit(func, graph.nodes[k])] = k
+
+            done, _ = futures.wait(running,
+                                   return_when=futures.FIRST_COMPLETED)
+            for future in done:
+                k = running.pop(future)
+                results.append((graph.nodes[k], future.result()))
+                for succ in graph.outgoing[k]:
+                    indegrees[succ] -= 1
+                    if not indegrees[succ]:
+                        ready.append(succ)
+    finally:
+        for future in running:
+            future.cancel()
+
+    return results
+
+
+def critical_path(nodes, incoming, duration, key=None):
+    """Computes the critical path of a weighted directed acyclic graph,
+    e.g. of tasks which can only start once their dependencies are finished.
+
+    Nodes are weighted by their durations. The critical path is the longest
+    (by total duration) path through the graph; it determines the minimum
+    time required to finish all the tasks, no matter how many of them
+    are executed in parallel.
+
+    :param nodes: Iterable of nodes
+    :param incoming: Function taking node as an argument and returning iterable
+                     of nodes with edges pointing _towards_ given one
+    :param duration: Function taking node as an argument and returning
+                     its duration (a number)
+    :param key: Optional function returning a hashable, uniquely identifying
+                a node. By default, nodes are identified by their ``id()``.
+
+    :return: Tuple of ``(length, path, schedule)``, where ``length``
+             is the total duration of the critical ``path`` (a list of nodes),
+             and ``schedule`` is a list of ``(node, earliest_start,
+             latest_start, slack)`` tuples, in the topological order.
+             Nodes on the critical path have zero slack; others can be
+             delayed by their slack without delaying the whole graph.
+
+    :raise CycleError: When a cycle is found in the graph
+
+    .. versionadded:: 0.0.4
+    """
+    ensure_iterable(nodes)
+    ensure_callable(incoming)
+    ensure_callable(duration)
+    key = id if key is None else ensure_callable(key)
+
+    graph = _IncomingGraph(nodes, incoming, key)
+    order = list(_kahn_order(graph))
+    if not order:
+        return 0, [], []
+
+    durations = dict((k, duration(graph.nodes[k])) for k in order)
+
+    # forward pass: earliest start of a node is when all predecessors finish
+    earliest = {}
+    critical_preds = {}
+    for k in order:
+        start, critical_pred = 0, None
+        for pk in graph.incoming[k]:
+            finish = earliest[pk] + durations[pk]
+            if critical_pred is None or finish > start:
+                start, critical_pred = finish, pk
+        earliest[k] = start
+        critical_preds[k] = critical_pred
+
+    last = max(order, key=lambda k: earliest[k] + durations[k])
+    length = earliest[last] + durations[last]
+
+    # backward pass: latest start of a node that doesn't delay its successors
+    latest = {}
+    for k in reversed(order):
+        finish = min([latest[sk] for sk in graph.outgoing[k]] or [length])
+        latest[k] = finish - durations[k]
+
+    path = []
+    k = last
+    while k is not None:
+        path.append(graph.nodes[k])
+        k = critical_preds[k]
+    path.reverse()
+
+    schedule = [(graph.nodes[k], earliest[k], latest[k],
+                 latest[k] - earliest[k]) for k in order]
+    return length, path, schedule
+
+
+def strongly_connected_components(nodes, incoming, key=None,
+                                  condensation=False):
+    """Finds strongly connected components of a graph,
+    i.e. maximal groups of nodes that are all reachable from each other.
+
+    Every component with more than one node (or a node that is its own
+    predecessor) is a cycle, or a union of cycles. Unlike with
+    :func:`topological_order`, all of them are found in a single pass.
+
+    The iterative version of Tarjan's algorithm is used, so the depth
+    of the graph is not limited by Python's recursion limit.
+
+    :param nodes: Iterable of nodes
+    :param incoming: Function taking node as an argument and returning iterable
+                     of nodes with edges pointing _towards_ given one
+    :param key: Optional function returning a hashable, uniquely identifying
+                a node. By default, nodes are identified by their ``id()``.
+    :param condensation: Whether to also return the condensation
+                         of the graph: the DAG of its components
+
+    :return: List of components (lists of nodes) in the topological order:
+             every component comes after those with edges pointing to it.
+             If ``condensation`` is True, a tuple is returned instead:
+             the list of components, and a list of sets of indices
+             of components with edges pointing _towards_ every component.
+
+    Example::
+
+        for component in strongly_connected_components(
+                packages, attr_func('dependencies')):
+            if len(component) > 1:
+                print("circular dependency: %r" % (component,))
+
+    .. versionadded:: 0.0.4
+    """
+    ensure_iterable(nodes)
+    ensure_callable(incoming)
+    key = id if key is None else ensure_callable(key)
+
+    graph = _IncomingGraph(nodes, incoming, key)
+
+    # since edges are followed against their direction, components are found
+    # in the topological order (rather than the reverse, as is usual)
+    components = []
+    indices = {}
+    lowlinks = {}
+    stack = []
+    on_stack = set()
+    for root in graph.keys:
+        if root in indices:
+            continue
+
+        indices[root] = lowlinks[root] = len(indices)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(graph.incoming[root]))]
+        while work:
+            k, preds = work[-1]
+            for pk in preds:
+                if pk not in indices:
+                    indices[pk] = lowlinks[pk] = len(indices)
+                    stack.append(pk)
+                    on_stack.add(pk)
+                    work.append((pk, iter(graph.incoming[pk])))
+                    break
+                if pk in on_stack:
+                    lowlinks[k] = min(lowlinks[k], indices[pk])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlinks[parent] = min(lowlinks[parent], lowlinks[k])
+
+                if lowlinks[k] == indices[k]:
+                    component = []
+                    while True:
+                        ck = stack.pop()
+                        on_stack.remove(ck)
+                        component.append(ck)
+                        if ck == k:
+                            break
+                    component.reverse()
+                    components.append(component)
+
+    result = [[graph.nodes[k] for k in component]
+              for component in components]
+    if not condensation:
+        return result
+
+    component_indices = {}
+    for i, component in enumerate(components):
+        for k in component:
+            component_indices[k] = i
+    condensed_incoming = []
+    for i, component in enumerate(components):
+        condensed_incoming.append(set(
+            component_indices[pk]
+            for k in component for pk in graph.incoming[k]) - set([i]))
+
+    return result, condensed_incoming
+
+
+class CycleError(ValueError):
+    """Error raised when a cycle is found in a graph which should be acyclic.
+
+    The offending cycle is available as the ``cycle`` attribute:
+    a list of nodes, in the edge direction, which starts and ends
+    with the same node.
+    """
+    def __init__(self, cycle):
+        self.cycle = list(cycle)
+        super(CycleError, self).__init__(
+            "cycle found: %s" % " -> ".join(imap(repr, self.cycle)))
+
+
+# Compiled graphs
+
+def compile_graph(nodes, expand, key=None):
+    """Compiles a graph into a compact representation suitable
+    for repeated traversals.
+
+    All nodes reachable from given ones are discovered, calling ``expand``
+    exactly once per node. They are then assigned consecutive integer ids,
+    and the edges are stored as arrays of those ids
+    (in the *compressed sparse row* format).
+
+    :param nodes: Iterable of nodes to start the discovery from
+    :param expand: Function taking a node as an argument and returning iterable
+                   of its child nodes
+    :param key: Optional function returning a hashable, uniquely identifying
+                a node. By default, nodes are identified by their ``id()``.
+
+    :return: :class:`CompiledGraph`
+
+    Example::
+
+        graph = compile_graph(packages, attr_func('dependents'))
+        for package in graph.breadth_first(changed_package):
+            rebuild(package)
+
+    .. versionadded:: 0.0.4
+    """
+    ensure_iterable(nodes)
+    ensure_callable(expand)
+    key = id if key is None else ensure_callable(key)
+
+    ids = {}
+    node_list = []
+    adjacency = []  # lists of children's keys, by node id
+
+    pending = []
+    for node in nodes:
+        pending.append(node)
+        while pending:
+            node = pending.pop()
+            k = key(node)
+            if k in ids:
+                continue
+
+            child_keys = []
+            for child in expand(node):
+                child_key = key(child)
+                child_keys.append(child_key)
+                if child_key not in ids:
+                    pending.append(child)
+
+            ids[k] = len(node_list)
+            node_list.append(node)
+            adjacency.append(child_keys)
+
+    offsets = array('l', [0])
+    targets = array('l')
+    for child_keys in adjacency:
+        targets.extend(ids[child_key] for child_key in child_keys)
+        offsets.append(len(targets))
+
+    return CompiledGraph(node_list, ids, key, offsets, targets)
+
+
+class CompiledGraph(object):
+    """Graph with nodes interned as integer ids, and edges stored
+    in arrays of those ids.
+
+    Traversals over this graph don't call any Python functions
+    to find node's children, and they track visited nodes in bit arrays,
+    which makes them much faster than their counterparts
+    operating on the ``expand`` functions.
+
+    All traversals yield nodes, or their ids if ``ids=True`` is passed.
+
+    .. note::
+
+        This class is not intended to be instantiated directly.
+        Use the :func:`compile_graph` function instead.
+
+    .. versionadded:: 0.0.4
+    """
+    def __init__(self, nodes, ids, key, offsets, targets):
+        #: List of nodes, indexed by their ids
+        self.nodes = nodes
+        #: Array of node ids' offsets into :attr:`targets`;
+        #: children of node ``i`` are ``targets[offsets[i]:offsets[i + 1]]``
+        self.offsets = offsets
+        #: Array of children's ids, for all nodes
+        self.targets = targets
+
+        self._ids = ids
+        self._key = key
+
+    def __len__(self):
+        return len(self.nodes)
+
+    @property
+    def edge_count(self):
+        """Number of edges in the graph."""
+        return len(self.targets)
+
+    def id_of(self, node):
+        """Returns the integer id of given node.
+        :raise KeyError: When the node is not in the graph
+        """
+        return self._ids[self._key(node)]
+
+    def children(self, node_id):
+        """Returns the array of ids of children of the node with given id."""
+        return self.targets[self.offsets[node_id]:self.offsets[node_id + 1]]
+
+    def to_numpy(self):
+        """Returns the :attr:`offsets` and :attr:`targets` arrays
+        as NumPy arrays, sharing the memory with the originals.
+
+        :return: Tuple of ``(offsets, targets)`` arrays
+        """
+        import numpy
+        dtype = numpy.dtype(self.offsets.typecode)
+        return (numpy.frombuffer(self.offsets, dtype=dtype),
+                numpy.frombuffer(self.targets, dtype=dtype))
+
+    def breadth_first(self, start, max_depth=None, ids=False):
+        """Performs a breadth-first search of the graph,
+        yielding every reachable node once.
+
+        :param start: Node to start the search from
+        :param max_depth: Optional maximum depth of nodes to yield;
+                          ``start`` node has the depth of 0
+        :param ids: Whether to yield node ids rather than nodes
+
+        :return: Iterable of nodes (or ids) in the BFS order
+        """
+        start_id = self.id_of(start)
+        _ensure_max_depth(max_depth)
+
+        def generator():
+            nodes, offsets, targets = self.nodes, self.offsets, self.targets
+            visited = bytearray(len(nodes))
+            visited[start_id] = 1
+
+            level = [start_id]
+            depth = 0
+            while level:
+                for i in level:
+                    yield i if ids else nodes[i]
+                if depth == max_depth:
+                    return
+
+                next_level = []
+                for i in level:
+                    for j in targets[offsets[i]:offsets[i + 1]]:
+                        if not visited[j]:
+                            visited[j] = 1
+                            next_level.append(j)
+                level = next_level
+                depth += 1
+
+        return generator()
+
+    def depth_first(self, start, ids=False):
+        """Performs a depth-first search of the graph,
+        yielding every reachable node once.
+
+        :param start: Node to start the search from
+        :param ids: Whether to yield node ids rather than nodes
+
+        :return: Iterable of nodes (or ids) in the DFS order,
+                 same as by :func:`depth_first` with ``visited=True``
+        """
+        start_id = self.id_of(start)
+
+        def generator():
+            nodes, offsets, targets = self.nodes, self.offsets, self.targets
+            visited = bytearray(len(nodes))
+
+            stack = [start_id]
+            while stack:
+                i = stack.pop()
+                if visited[i]:
+                    continue
+                visited[i] = 1
+                yield i if ids else nodes[i]
+                stack.extend(targets[offsets[i]:offsets[i + 1]])
+
+        return generator()
+
+    def topological_order(self, ids=False):
+        """Performs topological sort of the graph,
+        with every node coming before all its children.
+
+        :param ids: Whether to yield node ids rather than nodes
+
+        :return: Iterable of nodes (or ids) in the topological order
+        :raise CycleError: When a cycle is found in the graph
+                           (raised during iteration)
+        """
+        def generator():
+            nodes, offsets, targets = self.nodes, self.offsets, self.targets
+            indegrees = array('l', [0]) * len(nodes)
+            for j in targets:
+                indegrees[j] += 1
+
+            queue = deque(i for i in xrange(len(nodes)) if not indegrees[i])
+            while queue:
+                i = queue.popleft()
+                yield i if ids else nodes[i]
+                for j in targets[offsets[i]:offsets[i + 1]]:
+                    indegrees[j] -= 1
+                    if not indegrees[j]:
+                        queue.append(j)
+
+            for i in xrange(len(nodes)):
+                if indegrees[i]:
+                    raise CycleError(nodes[j]
+                                     for j in self._find_cycle(i, indegrees))
+
+        return generator()
+
+    def _find_cycle(self, start, indegrees):
+        """Finds a cycle among nodes left unresolved by topological sort."""
+        predecessors = {}
+        for i in xrange(len(self.nodes)):
+            if indegrees[i]:
+                for j in self.children(i):
+                    predecessors.setdefault(j, []).append(i)
+        return _find_cycle(start, predecessors.__getitem__,
+                           indegrees.__getitem__)
+
+
+class ReachabilityIndex(object):
+    """Index answering reachability queries on a directed acyclic graph
+    in constant (or bitset) time.
+
+    For every node, the sets of its ancestors and descendants are computed
+    in the topological order, and stored as bitsets (Python integers)
+    indexed by the nodes' topological positions.
+
+    Example::
+
+        index = ReachabilityIndex(targets, attr_func('dependencies'))
+        to_rebuild = index.descendants(changed_target)
+
+    .. versionadded:: 0.0.4
+    """
+    def __init__(self, nodes, incoming, key=None):
+        """Constructor.
+
+        :param nodes: Iterable of nodes
+        :param incoming: Function taking node as an argument and returning
+                         iterable of nodes with edges pointing _towards_
+                         given one
+        :param key: Optional function returning a hashable, uniquely
+                    identifying a node. By default, nodes are identified
+                    by their ``id()``.
+
+        :raise CycleError: When the graph contains a cycle
+        """
+        ensure_iterable(nodes)
+        ensure_callable(incoming)
+        self._key = id if key is None else ensure_callable(key)
+
+        graph = _IncomingGraph(nodes, incoming, self._key)
+        order = list(_kahn_order(graph))
+
+        #: List of nodes in the topological order
+        self.nodes = [graph.nodes[k] for k in order]
+        self._positions = dict((k, i) for i, k in enumerate(order))
+
+        positions = self._positions
+        ancestors = [0] * len(order)
+        for i, k in enumerate(order):
+            bits = 0
+            for pk in graph.incoming[k]:
+                j = positions[pk]
+                bits |= ancestors[j] | (1 << j)
+            ancestors[i] = bits
+        descendants = [0] * len(order)
+        for i in xrange(len(order) - 1, -1, -1):
+            bits = 0
+            for sk in graph.outgoing[order[i]]:
+                j = positions[sk]
+                bits |= descendants[j] | (1 << j)
+            descendants[i] = bits
+
+        self._ancestors = ancestors
+        self._descendants = descendants
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __contains__(self, node):
+        return self._key(node) in self._positions
+
+    def position(self, node):
+        """Returns the position of given node in the topological order.
+        :raise KeyError: When the node is not in the graph
+        """
+        return self._positions[self._key(node)]
+
+    def reaches(self, from_, to):
+        """Checks whether there is a path of (one or more) edges
+        from one node to another. A node doesn't reach itself.
+
+        :raise KeyError: When any of the nodes is not in the graph
+        """
+        i = self.position(from_)
+        j = self.position(to)
+        return bool(self._descendants[i] >> j & 1)
+
+    def ancestors(self, node):
+        """Returns the list of nodes from which given node is reachable,
+        in the topological order.
+
+        :raise KeyError: When the node is not in the graph
+        """
+        bits = self._ancestors[self.position(node)]
+        return [self.nodes[i] for i in _set_bits(bits)]
+
+    def descendants(self, node):
+        """Returns the list of nodes reachable from given node,
+        in the topological order.
+
+        :raise KeyError: When the node is not in the graph
+        """
+        bits = self._descendants[self.position(node)]
+        return [self.nodes[i] for i in _set_bits(bits)]
+
+
+# Dynamic graphs
+
+class DynamicTopologicalOrder(object):
+    """Topological order of a directed acyclic graph
+    that is maintained as edges are added to it.
+
+    When an edge is added, only the nodes between its ends
+    (in the current order) are visited and reordered,
+    using the algorithm by Pearce and Kelly. This is typically much faster
+    than sorting the whole graph again with :func:`topological_order`.
+
+    Iterating over the object yields nodes in the topological order:
+    every node comes after those with edges pointing to it.
+
+    Example::
+
+        order = DynamicTopologicalOrder(tasks, attr_func('dependencies'))
+        order.add_edge(compile_task, link_task)  # link after compiling
+        for task in order:
+            run(task)
+
+    .. versionadded:: 0.0.4
+    """
+    def __init__(self, nodes=(), incoming=None, key=None):
+        """Constructor.
+
+        :param nodes: Optional iterable of initial nodes
+        :param incoming: Function taking node as an argument and returning
+                         iterable of nodes with edges pointing _towards_
+                         given one. Required if ``nodes`` are given;
+                         nodes reachable via this function are added, too.
+        :param key: Optional function returning a hashable, uniquely
+                    identifying a node. By default, nodes are identified
+                    by their ``id()``.
+
+        :raise CycleError: When initial graph contains a cycle
+        """
+        ensure_iterable(nodes)
+        self._key = id if key is None else ensure_callable(key)
+
+        self._nodes = {}
+        self._order = []
+        self._positions = {}
+        self._outgoing = {}
+        self._incoming = {}
+
+        if incoming is None:
+            for node in nodes:
+                self.add_node(node)
+            return
+
+        graph = _IncomingGraph(nodes, ensure_callable(incoming), self._key)
+        for k in _kahn_order(graph):
+            self._nodes[k] = graph.nodes[k]
+            self._positions[k] = len(self._order)
+            self._order.append(k)
+            self._incoming[k] = set(graph.incoming[k])
+            self._outgoing[k] = set(graph.outgoing[k])
+
+    def __len__(self):
+        return len(self._order)
+
+    def __contains__(self, node):
+        return self._key(node) in self._nodes
+
+    def __iter__(self):
+        nodes = self._nodes
+        return (nodes[k] for k in list(self._order))
+
+    def add_node(self, node):
+        """Adds a node without any edges, at the end of the order.
+        Does nothing if the node is already present.
+        """
+        k = self._key(node)
+        if k in self._nodes:
+            return
+
+        self._nodes[k] = node
+        self._positions[k] = len(self._order)
+        self._order.append(k)
+        self._outgoing[k] = set()
+        self._incoming[k] = set()
+
+    def add_edge(self, from_, to):
+        """Adds an edge to the graph, so that ``from_`` will come before ``to``
+        in the topological order. Nodes which aren't present are added.
+
+        :raise CycleError: When the edge would create a cycle.
+                           The graph is left unchanged in such case.
+        """
+        x = self._key(from_)
+        y = self._key(to)
+        if x == y:
+            raise CycleError([from_, to])
+
+        # a cycle can't go through a new node, so adding it is always safe
+        self.add_node(from_)
+        self.add_node(to)
+        if y in self._outgoing[x]:
+            return
+
+        positions = self._positions
+        lower, upper = positions[y], positions[x]
+        if lower < upper:
+            forward = self._forward_region(y, x, upper)
+            backward = self._backward_region(x, lower)
+            self._reorder(backward, forward)
+
+        self._outgoing[x].add(y)
+        self._incoming[y].add(x)
+
+    def remove_edge(self, from_, to):
+        """Removes an edge from the graph.
+        The current order remains valid, so it is not changed.
+
+        :raise KeyError: When there is no such edge in the graph
+        """
+        x = self._key(from_)
+        y = self._key(to)
+        if y not in self._outgoing.get(x, ()):
+            raise KeyError((from_, to))
+
+        self._outgoing[x].remove(y)
+        self._incoming[y].remove(x)
+
+    def _forward_region(self, start, end, upper):
+        """Finds nodes reachable from ``start`` that precede ``end``
+        (at position ``upper``) in the current order.
+
+        :raise CycleError: When ``end`` itself is reachable from ``start``
+        """
+        positions, outgoing = self._positions, self._outgoing
+        parents = {start: None}
+        stack = [start]
+        while stack:
+            k = stack.pop()
+            for ck in outgoing[k]:
+                if ck == end:
+                    cycle = [end, k]
+                    while parents[k] is not None:
+                        k = parents[k]
+                        cycle.append(k)
+                    cycle.append(end)
+                    cycle[1:-1] = reversed(cycle[1:-1])
+                    raise CycleError([self._nodes[k] for k in cycle])
+                if ck not in parents and positions[ck] < upper:
+                    parents[ck] = k
+                    stack.append(ck)
+        return list(parents)
+
+    def _backward_region(self, start, lower):
+        """Finds nodes from which ``start`` is reachable that follow
+        the position ``lower`` in the current order.
+        """
+        positions, incoming = self._positions, self._incoming
+        visited = set([start])
+        stack = [start]
+        while stack:
+            k = stack.pop()
+            for pk in incoming[k]:
+                if pk not in visited and positions[pk] > lower:
+                    visited.add(pk)
+                    stack.append(pk)
+        return list(visited)
+
+    def _reorder(self, backward, forward):
+        """Moves ``backward`` nodes before ``forward`` ones,
+        reusing the positions that all of them occupy now.
+        """
+        positions, order = self._positions, self._order
+
+        by_position = positions.__getitem__
+        backward.sort(key=by_position)
+        forward.sort(key=by_position)
+        slots = sorted(imap(by_position, chain(backward, forward)))
+
+        for i, k in izip(slots, chain(backward, forward)):
+            order[i] = k
+            positions[k] = i
+
+
+# Utility functions
+
+#: Marker object for exhausted iterators and missing values.
+_ABSENT = object()
+
+#: Types of binary buffers which :func:`batch` splits into memory views.
+_BUFFER_TYPES = ((array, bytearray) +
+                 ((memoryview,) if memoryview is not None else ()) +
+                 ((bytes,) if IS_PY3 else ()))
+
+#: Types of sequences which :func:`batch` slices rather than iterates over.
+#: Other sequences may not support slicing (e.g. :class:`collections.deque`)
+#: or have an expensive ``len()`` (e.g. ``taipan.collections.lists.LazySeq``).
+_SLICEABLE_TYPES = (list, tuple, xrange, BaseString)
+
+#: Maximum number of elements read in advance by :func:`batch`
+#: with ``max_wait``, when batches aren't bounded by their length.
+_BATCH_READ_AHEAD = 1024
+
+
+def _is_ndarray(obj):
+    """Checks whether given object is a NumPy array,
+    without importing NumPy itself.
+    """
+    return any(cls.__module__ == 'numpy' and cls.__name__ == 'ndarray'
+               for cls in type(obj).__mro__)
+
+
+def _ndarray_windows(array_, n, step):
+    """Creates a strided view of sliding windows over a NumPy array.
+    See :func:`window`.
+    """
+    from numpy.lib.stride_tricks import as_strided
+
+    count = max(0, (len(array_) - n) // step + 1)
+    stride = array_.strides[0]
+    return as_strided(array_,
+                      shape=(count, n) + array_.shape[1:],
+                      strides=(stride * step, stride) + array_.strides[1:],
+                      writeable=False)
+
+
+def _ensure_batch_args(n, fillvalue, max_weight, weight, max_wait):
+    """Checks whether arguments of :func:`batch` are valid.
+    :return: Weight function to use, or None if batches aren't weighted
+    """
+    if n is None and max_weight is None and max_wait is None:
+        raise TypeError("either number of elements in a batch, "
+                        "its maximum weight, or maximum wait must be given")
+    if n is not None:
+        if not isinstance(n, Integral):
+            raise TypeError("invalid number of elements in a batch")
+        if not (n > 0):
+            raise ValueError("number of elements in a batch must be positive")
+
+    if fillvalue is not None and not (max_weight is None and max_wait is None):
+        raise ValueError(
+            "fillvalue is only allowed for batches bounded by their length")
+    if max_wait is not None and not (max_wait > 0):
+        raise ValueError("maximum wait for a batch must be positive")
+
+    if max_weight is None:
+        if weight is not None:
+            raise ValueError("weight is only meaningful with max_weight")
+        return None
+    if not (max_weight > 0):
+        raise ValueError("maximum weight of a batch must be positive")
+    return len if weight is None else ensure_callable(weight)
+
+
+def _batch_by_count(iterable, n, fillvalue):
+    """Batches elements of an iterable by their count. See :func:`batch`."""
+    if fillvalue is None:
+        if _is_ndarray(iterable):
+            # slices of NumPy arrays are already views
+            return (iterable[i:i + n] for i in xrange(0, len(iterable), n))
+        if isinstance(iterable, _BUFFER_TYPES):
+            return _batch_buffer(iterable, n)
+
+    if isinstance(iterable, _SLICEABLE_TYPES):
+        # built-in sequences can be simply (and cheaply) sliced
+        def generator():
+            length = len(iterable)
+            for i in xrange(0, length, n):
+                chunk = tuple(iterable[i:i + n])
+                if fillvalue is not None and len(chunk) < n:
+                    chunk += (fillvalue,) * (n - len(chunk))
+                yield chunk
+        return generator()
+
+    iterator = iter(iterable)
+    chunks = iter(lambda: tuple(islice(iterator, n)), ())
+    if fillvalue is None:
+        return chunks
+
+    padding = (fillvalue,) * n
+    return (chunk if len(chunk) == n else (chunk + padding)[:n]
+            for chunk in chunks)
+
+
+def _batch_buffer(buffer_, n):
+    """Batches a binary buffer into memory views of its consecutive chunks.
+    See :func:`batch`.
+    """
+    view = buffer_  # slicing it copies, e.g. ``array.array`` on Python 2
+    if memoryview is not None:
+        try:
+            view = memoryview(buffer_)
+        except TypeError:
+            pass
+
+    def generator():
+        for i in xrange(0, len(view), n):
+            yield view[i:i + n]
+
+    return generator()
+
+
+def _batch_by_weight(iterable, n, max_weight, weight):
+    """Batches elements of an iterable by their count and/or total weight.
+    See :func:`batch`.
+    """
+    def generator():
+        chunk = []
+        total = 0
+        for elem in iterable:
+            w = weight(elem)
+            if chunk and total + w > max_weight:
+                yield tuple(chunk)
+                chunk = []
+                total = 0
+
+            chunk.append(elem)
+            total += w
+            if len(chunk) == n or total >= max_weight:
+                yield tuple(chunk)
+                chunk = []
+                total = 0
+
+        if chunk:
+            yield tuple(chunk)
+
+    return generator()
+
+
+def _batch_by_time(iterable, n, max_weight, weight, max_wait):
+    """Batches elements of an iterable by the time it takes to receive them,
+    as well as (optionally) by their count and/or total weight.
+    See :func:`batch`.
+    """
+    def generator():
+        reader = _BackgroundIterator(iterable,
+                                     maxsize=n or _BATCH_READ_AHEAD)
+        try:
+            chunk = []
+            total = 0
+            deadline = None
+            while True:
+                timeout = None
+                if chunk:
+                    timeout = max(0, deadline - monotonic())
+                try:
+                    elem = reader.get(timeout)
+                except queue.Empty:
+                    yield tuple(chunk)
+                    chunk = []
+                    total = 0
+                    continue
+                if elem is _ABSENT:
+                    break
+
+                # elements may keep arriving faster than the deadline passes,
+                # so it has to be checked for every one of them, too
+                w = weight(elem) if max_weight is not None else 0
+                if chunk and (monotonic() >= deadline or (
+                        max_weight is not None and total + w > max_weight)):
+                    yield tuple(chunk)
+                    chunk = []
+                    total = 0
+
+                if not chunk:
+                    deadline = monotonic() + max_wait
+                chunk.append(elem)
+                total += w
+                if len(chunk) == n or (max_weight is not None
+                                       and total >= max_weight):
+                    yield tuple(chunk)
+                    chunk = []
+                    total = 0
+
+            if chunk:
+                yield tuple(chunk)
+        finally:
+            reader.close()
+
+    return generator()
+
+
+def _random_nonzero(rng):
+    """Returns a random number from the (0, 1) open interval."""
+    r = rng.random()
+    while not r:
+        r = rng.random()
+    return r
+
+
+def _sample_uniform(iterable, k, rng):
+    """Reservoir sampling using Algorithm L. See :func:`sample`."""
+    iterator = iter(iterable)
+    reservoir = list(islice(iterator, k))
+    if len(reservoir) < k:
+        return reservoir
+
+    w = math.exp(math.log(_random_nonzero(rng)) / k)
+    while True:
+        skip = int(math.log(_random_nonzero(rng)) / math.log(1 - w))
+        elem = next(islice(iterator, skip, None), _ABSENT)
+        if elem is _ABSENT:
+            return reservoir
+
+        reservoir[rng.randrange(k)] = elem
+        w *= math.exp(math.log(_random_nonzero(rng)) / k)
+
+
+def _sample_weighted(iterable, k, weights, rng):
+    """Weighted reservoir sampling using the A-ExpJ algorithm.
+    See :func:`sample`.
+
+    Instead of the original keys ``r ** (1 / w)``, their logarithms
+    are used, so that very large or very small weights don't cause
+    the keys to underflow.
+    """
+    iterator = iter(iterable)
+
+    # heap of (log_key, index, element); index breaks ties between keys
+    # so that elements themselves are never compared
+    heap = []
+    for i, elem in enumerate(iterator):
+        w = weights(elem)
+        if w < 0:
+            raise ValueError("weights must not be negative")
+        if w:
+            heap.append((math.log(_random_nonzero(rng)) / w, i, elem))
+            if len(heap) == k:
+                break
+    else:
+        return [elem for _, _, elem in heap]
+
+    def draw_jump(threshold):
+        """Draws the total weight of elements to skip."""
+        if not threshold:
+            return float('inf')  # no element can have a greater key
+        return math.log(_random_nonzero(rng)) / threshold
+
+    heapq.heapify(heap)
+    threshold = heap[0][0]
+    jump = draw_jump(threshold)
+    for i, elem in enumerate(iterator, k):
+        w = weights(elem)
+        if w < 0:
+            raise ValueError("weights must not be negative")
+        jump -= w
+        if jump > 0:
+            continue
+
+        # new key is drawn from the range of those exceeding the threshold
+        low = math.exp(threshold * w)
+        r = low + (1 - low) * _random_nonzero(rng)
+        heapq.heapreplace(heap, (math.log(r) / w, i, elem))
+        threshold = heap[0][0]
+        jump = draw_jump(threshold)
+
+    return [elem for _, _, elem in heap]
+
+
+def _seen_keys(window, error_rate, capacity):
+    """Creates a set-like object which remembers keys of elements
+    for :func:`unique` in a memory-bounded way, if requested.
+
+    :return: Object with an ``add(key)`` method that returns whether
+             the key is new, or None if all keys should be remembered
+    """
+    if window is not None:
+        if error_rate is not None:
+            raise ValueError("window and error_rate are mutually exclusive")
+        return _RecentKeys(window)
+
+    if error_rate is not None:
+        if capacity is None:
+            raise ValueError("capacity is required with error_rate")
+        return _BloomFilter(capacity, error_rate)
+    if capacity is not None:
+        raise ValueError("capacity is only meaningful with error_rate")
+
+    return None
+
+
+def _top(iterable, k, key, largest):
+    """Returns ``k`` largest (or smallest) elements of given iterable.
+    See :func:`top` and :func:`bottom`.
+    """
+    ensure_iterable(iterable)
+    if not isinstance(k, Integral):
+        raise TypeError("invalid number of elements")
+    if k < 0:
+        raise ValueError("number of elements must not be negative")
+    if key is not None:
+        ensure_callable(key)
+
+    if key is None and _is_ndarray(iterable) and iterable.ndim == 1:
+        return iterable[:0] if k == 0 else _ndarray_top(iterable, k, largest)
+    if k == 0:
+        return []
+
+    key = identity() if key is None else key
+    if not largest:
+        key = compose(_ReversedKey, key)
+
+    # min-heap of (key, -index, element) entries, with the "worst"
+    # of retained elements at its root; negated index makes the latest
+    # of equal elements the worst one, and ensures elements are never compared
+    iterator = iter(iterable)
+    heap = [(key(elem), -i, elem)
+            for i, elem in enumerate(islice(iterator, k))]
+    heapq.heapify(heap)
+
+    if len(heap) == k:
+        threshold = heap[0][0]
+        for i, elem in enumerate(iterator, k):
+            elem_key = key(elem)
+            if threshold < elem_key:
+                heapq.heapreplace(heap, (elem_key, -i, elem))
+                threshold = heap[0][0]
+
+    heap.sort(reverse=True)
+    return [elem for _, _, elem in heap]
+
+
+def _ndarray_top(array_, k, largest):
+    """Returns ``k`` largest (or smallest) elements of a NumPy array,
+    in descending (or ascending) order. See :func:`top`.
+
+    Like in the generic version, ties are resolved in favor
+    of the elements which come first.
+    """
+    import numpy
+
+    if k < len(array_):
+        # :func:`numpy.argpartition` picks arbitrary ones among elements
+        # equal to the k-th one, so we pick the earliest of them ourselves
+        if largest:
+            kth = numpy.partition(array_, -k)[-k]
+            better = numpy.flatnonzero(array_ > kth)
+        else:
+            kth = numpy.partition(array_, k - 1)[k - 1]
+            better = numpy.flatnonzero(array_ < kth)
+        equal = numpy.flatnonzero(array_ == kth)[:k - len(better)]
+        indices = numpy.sort(numpy.concatenate((better, equal)))
+
+        # comparisons with NaN are always false, so if the array has any,
+        # fewer than ``k`` elements may have been picked; fall back to
+        # the order of :func:`numpy.partition`, where NaNs come last
+        if len(indices) < k:
+            if largest:
+                indices = numpy.argpartition(array_, -k)[-k:]
+            else:
+                indices = numpy.argpartition(array_, k - 1)[:k]
+            indices = numpy.sort(indices)
+    else:
+        indices = numpy.arange(len(array_))
+
+    # stable sort keeps equal elements in the order of their indices;
+    # for the descending order, both are reversed, and then reversed back
+    if largest:
+        indices = indices[::-1]
+    indices = indices[numpy.argsort(array_[indices], kind='mergesort')]
+    if largest:
+        indices = indices[::-1]
+    return array_[indices]
+
+
+def _spill(iterable, dir=None):
+    """Pickles elements of an iterable into a temporary file.
+    :return: Path to the file, which has to be removed by the caller
+    """
+    fd, path = tempfile.mkstemp(dir=dir)
+    try:
+        with os.fdopen(fd, 'wb') as file_:
+            pickler = pickle.Pickler(file_, pickle.HIGHEST_PROTOCOL)
+            for elem in iterable:
+                pickler.dump(elem)
+                pickler.clear_memo()
+    except Exception:
+        _remove_file(path)
+        raise
+    return path
+
+
+def _unspill(path):
+    """Lazily unpickles elements stored in a file by :func:`_spill`."""
+    with open(path, 'rb') as file_:
+        unpickler = pickle.Unpickler(file_)
+        while True:
+            try:
+                yield unpickler.load()
+            except EOFError:
+                return
+
+
+def _merge_spilled(paths, key, reverse, dir=None):
+    """Merges sorted runs stored in files by :func:`_spill`
+    into a single run, stored in another file.
+    :return: Path to the file with the merged run
+    """
+    readers = list(imap(_unspill, paths))
+    try:
+        return _spill(merge_sorted(key=key, reverse=reverse, *readers), dir)
+    finally:
+        for reader in readers:
+            reader.close()
+
+
+def _remove_file(path):
+    """Removes a file, ignoring errors (e.g. if it doesn't exist)."""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _cpu_count():
+    """Returns the number of CPUs, or 1 if it cannot be determined."""
+    try:
+        return multiprocessing.cpu_count()
+    except NotImplementedError:
+        return 1
+
+
+def _map_chunk(func, chunk):
+    """Applies a function to elements of a chunk. Used by :func:`pmap`.
+    :return: List of results
+    """
+    return list(imap(func, chunk))
+
+
+def _call_listing(func, arg):
+    """Calls a function and returns its result (an iterable) as a list.
+
+    Used to make functions returning lazy iterables, like generators,
+    do all of their work when called on an executor.
+    """
+    return list(func(arg))
+
+
+def _level_parallel_bfs(start, expand, first_visit,
+                        max_depth, annotated, executor):
+    """Breadth-first search which expands all nodes at given depth
+    concurrently on an executor.
+
+    See :func:`breadth_first` for the description of arguments.
+    """
+    def generator():
+        if first_visit:
+            first_visit(start)
+
+        level = [(start, 0, None)]
+        pending = []
+        try:
+            while level:
+                # submit the whole level first,
+                # so that it's expanded while we yield its nodes
+                pending = [executor.submit(_call_listing, expand, node)
+                           for node, depth, _ in level if depth != max_depth]
+                for entry in level:
+                    yield entry if annotated else entry[0]
+
+                next_level = []
+                for (node, depth, _), future in zip(level, pending):
+                    for child in future.result():
+                        if not first_visit or first_visit(child):
+                            next_level.append((child, depth + 1, node))
+                level = next_level
+        finally:
+            for future in pending:
+                future.cancel()
+
+    return generator()
+
+
+def _ensure_max_depth(max_depth):
+    """Checks whether given ``max_depth`` argument for traversal is valid."""
+    if max_depth is None:
+        return
+    if not isinstance(max_depth, Integral):
+        raise TypeError("invalid maximum depth")
+    if max_depth < 0:
+        raise ValueError("maximum depth cannot be negative")
+
+
+def _first_visit_func(visited, key):
+    """Creates a function for tracking visited nodes of a graph.
+
+    :param visited: Whether visited nodes should be tracked at all
+    :param key: Optional function identifying nodes; implies ``visited``.
+                By default, nodes are identified by their ``id()``.
+
+    :return: Function that takes a node and returns whether it is being
+             visited for the first time, or None if nodes aren't tracked
+    """
+    if key is None:
+        if not visited:
+            return None
+        key = id
+    else:
+        ensure_callable(key)
+
+    # visited nodes are kept around, so that their ``id()``
+    # cannot be reused by new objects
+    seen = {}
+
+    def first_visit(node):
+        k = key(node)
+        if k in seen:
+            return False
+        seen[k] = node
+        return True
+
+    return first_visit
+
+
+def _bidirectional_step(frontier, visited, other_visited, expand, key):
+    """Advances one side of :func:`bidirectional_search` by a single level.
+
+    :return: Tuple of the new frontier, and the key of the node where
+             the searches meet on the shortest path (or None)
+    """
+    next_frontier = []
+    meeting = None
+    meeting_depth = None
+    for k in frontier:
+        node, depth, _ = visited[k]
+        for child in expand(node):
+            child_key = key(child)
+            if child_key in visited:
+                continue
+            visited[child_key] = (child, depth + 1, k)
+            next_frontier.append(child_key)
+
+            # complete the level even after the searches meet,
+            # as a shorter path may still be found in it
+            if child_key in other_visited:
+                total_depth = depth + 1 + other_visited[child_key][1]
+                if meeting_depth is None or total_depth < meeting_depth:
+                    meeting, meeting_depth = child_key, total_depth
+
+    return next_frontier, meeting
+
+
+def _bidirectional_path(visited, k):
+    """Reconstructs a path found by one side of :func:`bidirectional_search`.
+    :return: List of nodes from given one back to the search's origin
+    """
+    path = []
+    while k is not None:
+        node, _, k = visited[k]
+        path.append(node)
+    return path
+
+
+def _find_cycle(start, predecessors, unresolved):
+    """Finds a cycle in a graph by walking predecessor edges from given node.
+
+    :param start: Key of the node to start from
+    :param predecessors: Function returning keys of node's predecessors
+    :param unresolved: Function returning whether a node may lie on a cycle.
+                       Every such node must have an unresolved predecessor.
+
+    :return: List of node keys forming the cycle, in the edge direction,
+             with the first one repeated at the end
+    """
+    path = []
+    positions = {}
+    k = start
+    while k not in positions:
+        positions[k] = len(path)
+        path.append(k)
+        k = next(pk for pk in predecessors(k) if unresolved(pk))
+
+    cycle = path[positions[k]:]
+    cycle.reverse()
+    cycle.append(cycle[0])
+    return cycle
+
+
+def _set_bits(bits):
+    """Yields indices of bits that are set in given non-negative integer,
+    in the ascending order.
+    """
+    # searching the binary representation is done in C,
+    # and thus much faster than shifting and masking in Python
+    digits = bin(bits)[:1:-1]
+    i = digits.find('1')
+    while i >= 0:
+        yield i
+        i = digits.find('1', i + 1)
+
+
+def _kahn_order(graph):
+    """Kahn's algorithm: repeatedly emit nodes which have all
+    their predecessors already emitted.
+
+    :param graph: :class:`_IncomingGraph`
+    :return: Iterable of node keys in the topological order
+    :raise CycleError: When a cycle is found (raised during iteration)
+    """
+    indegrees = graph.indegrees()
+    queue = deque(k for k in graph.keys if not indegrees[k])
+    while queue:
+        k = queue.popleft()
+        yield k
+        for succ in graph.outgoing[k]:
+            indegrees[succ] -= 1
+            if not indegrees[succ]:
+                queue.append(succ)
+
+    graph.check_resolved(indegrees)
+
+
+# Utility classes
+
+class _BackgroundIterator(object):
+    """Iterator which is advanced on a background thread,
+    with its elements being put in a (possibly bounded) queue.
+
+    Exceptions raised by the original iterator are re-raised
+    when the element that would be retrieved instead is requested.
+    """
+    # kinds of queue entries
+    ITEM, ERROR, END = range(3)
+
+    #: How often (in seconds) the background thread checks
+    #: whether the iterator was closed, when the queue is full.
+    POLL_INTERVAL = 0.1
+
+    def __init__(self, iterable, maxsize=0, executor=None):
+        """Constructor.
+
+        :param iterable: Iterable to read elements from
+        :param maxsize: Maximum number of elements read in advance.
+                        If 0, the number is unbounded.
+        :param executor: Optional thread pool executor to read
+                         the elements on, instead of a dedicated thread
+        """
+        self._queue = queue.Queue(maxsize)
+        self._closed = threading.Event()
+        self._finished = False
+
+        if executor is not None:
+            executor.submit(self._run, iter(iterable))
+            return
+
+        thread = threading.Thread(target=self._run, args=(iter(iterable),))
+        thread.daemon = True
+        thread.start()
+
+    def get(self, timeout=None):
+        """Retrieve the next element.
+
+        :param timeout: Maximum time (in seconds) to wait for the element.
+                        If None, the wait is indefinite.
+
+        :return: Next element, or ``_ABSENT`` if the iterator is exhausted
+        :raise queue.Empty: If the element didn't arrive before ``timeout``
+        """
+        if self._finished:
+            return _ABSENT
+
+        kind, value = self._queue.get(timeout=timeout)
+        if kind == self.ITEM:
+            return value
+        self._finished = True
+        if kind == self.ERROR:
+            raise value
+        return _ABSENT
+
+    def close(self):
+        """Stop reading elements of the iterator.
+
+        The background thread exits as soon as it's done with
+        the element it might be currently retrieving.
+        """
+        self._closed.set()
+        self._finished = True
+
+    def _run(self, iterator):
+        try:
+            for item in iterator:
+                if not self._put(self.ITEM, item):
+                    return
+        except Exception as e:
+            self._put(self.ERROR, e)
+        else:
+            self._put(self.END)
+
+    def _put(self, kind, value=None):
+        """Put an entry in the queue, unless the iterator has been closed.
+        :return: Whether the entry has been put in the queue
+        """
+        while not self._closed.is_set():
+            try:
+                self._queue.put((kind, value), timeout=self.POLL_INTERVAL)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+
+class _BroadcastBuffer(object):
+    """Ring buffer of elements of an iterable, shared by its consumers.
+    See :func:`broadcast`.
+    """
+    def __init__(self, iterable, n, max_lag, block):
+        self._iterator = iter(iterable)
+        self._buffer = [None] * max_lag
+        self._max_lag = max_lag
+        self._block = block
+
+        #: Number of elements read from the iterator so far
+        self._head = 0
+        #: Indices of next elements for every consumer,
+        #: or None for consumers which have been closed
+        self._positions = [0] * n
+        self._finished = False
+        self._error = None
+
+        self._condition = threading.Condition()
+
+    def detach(self, i):
+        """Stop keeping elements for ``i``-th consumer."""
+        with self._condition:
+            self._positions[i] = None
+            self._condition.notify_all()
+
+    def get(self, i):
+        """Retrieve next element for ``i``-th consumer.
+        :return: Element, or ``_ABSENT`` if the iterator is exhausted
+        """
+        with self._condition:
+            position = self._positions[i]
+            while position == self._head:
+                if self._finished:
+                    if self._error is not None:
+                        raise self._error
+                    return _ABSENT
+                if self._block and self._is_full():
+                    # another consumer may read the next element
+                    # while we're waiting, hence the loop
+                    self._condition.wait()
+                    continue
+                self._read()
+
+            if position < self._head - self._max_lag:
+                raise BroadcastLagError(
+                    "consumer #%s fell behind by more than %s elements" % (
+                        i, self._max_lag))
+
+            elem = self._buffer[position % self._max_lag]
+            self._positions[i] = position + 1
+            if self._block:
+                self._condition.notify_all()
+            return elem
+
+    def _is_full(self):
+        """Checks whether reading the next element would overwrite one
+        that some consumer has yet to retrieve.
+        """
+        lowest = min(p for p in self._positions if p is not None)
+        return self._head - lowest >= self._max_lag
+
+    def _read(self):
+        """Reads the next element of the iterator into the buffer."""
+        try:
+            elem = next(self._iterator, _ABSENT)
+        except Exception as e:
+            self._error = e
+            elem = _ABSENT
+        if elem is _ABSENT:
+            self._finished = True
+            self._condition.notify_all()
+            return
+
+        self._buffer[self._head % self._max_lag] = elem
+        self._head += 1
+
+
+class _BroadcastConsumer(object):
+    """Iterator over elements of a :class:`_BroadcastBuffer`
+    for one of its consumers. See :func:`broadcast`.
+    """
+    def __init__(self, buffer_, i):
+        self._buffer = buffer_
+        self._index = i
+        self._closed = False
+
+    def __del__(self):
+        self.close()
+
+    def __iter__(self):
+        return self
+
+    def next(self):
+        if self._closed:
+            raise StopIteration()
+
+        try:
+            elem = self._buffer.get(self._index)
+        except Exception:
+            self.close()
+            raise
+        if elem is _ABSENT:
+            self.close()
+            raise StopIteration()
+        return elem
+
+    __next__ = next
+
+    def close(self):
+        """Stop retrieving elements,
+        so that other consumers don't have to wait for this one.
+        """
+        if not self._closed:
+            self._closed = True
+            self._buffer.detach(self._index)
+
+
+class _ReversedKey(object):
+    """Wrapper for sort keys which reverses their ordering."""
+    __slots__ = ['key']
+
+    def __init__(self, key):
+        self.key = key
+
+    def __lt__(self, other):
+        return other.key < self.key
+
+    def __eq__(self, other):
+        return self.key == other.key
+
+
+class _RecentKeys(object):
+    """Set of keys which remembers only a limited number
+    of the most recently added ones.
+    """
+    def __init__(self, size):
+        if not isinstance(size, Integral):
+            raise TypeError("invalid window size")
+        if not (size > 0):
+            raise ValueError("window size must be positive")
+
+        self.size = size
+        # ``seen`` maps keys to the serial number of their latest addition,
+        # while ``recent`` holds (key, serial) pairs in the order of additions;
+        # pairs with outdated serials are skipped over when evicting
+        self.seen = {}
+        self.recent = deque()
+        self.serial = 0
+
+    def add(self, key):
+        """Adds a key to the set, possibly evicting the least recent one.
+        :return: Whether the key was not present before
+        """
+        seen, recent = self.seen, self.recent
+        self.serial += 1
+
+        is_new = key not in seen
+        seen[key] = self.serial
+        recent.append((key, self.serial))
+
+        while len(seen) > self.size or seen[recent[0][0]] != recent[0][1]:
+            old_key, old_serial = recent.popleft()
+            if seen[old_key] == old_serial:
+                del seen[old_key]
+
+        # ensure outdated pairs don't accumulate indefinitely
+        # behind a recent one
+        if len(recent) > 2 * self.size:
+            self.recent = deque(pair for pair in recent
+                                if seen[pair[0]] == pair[1])
+
+        return is_new
+
+
+class _BloomFilter(object):
+    """Probabilistic set of hashable objects with a fixed memory footprint.
+
+    Membership tests can give false positives (with given probability,
+    provided the number of added objects doesn't exceed the capacity),
+    but never false negatives.
+    """
+    def __init__(self, capacity, error_rate):
+        if not isinstance(capacity, Integral):
+            raise TypeError("invalid capacity")
+        if not (capacity > 0):
+            raise ValueError("capacity must be positive")
+        if not (0 < error_rate < 1):
+            raise ValueError("error rate must be between 0 and 1")
+
+        ln2 = math.log(2)
+        self.bit_count = max(8, int(math.ceil(
+            -capacity * math.log(error_rate) / (ln2 * ln2))))
+        self.hash_count = max(1, int(round(
+            self.bit_count / float(capacity) * ln2)))
+        self.bits = bytearray((self.bit_count + 7) // 8)
+
+    def add(self, obj):
+        """Adds an object to the filter.
+        :return: Whether the object was definitely not present before
+        """
+        # double hashing scheme of Kirsch & Mitzenmacher
+        h1 = hash(obj)
+        h2 = hash((h1, self.bit_count)) | 1
+        bits = self.bits
+        added = False
+        for i in xrange(self.hash_count):
+            bit = (h1 + i * h2) % self.bit_count
+            byte, mask = bit >> 3, 1 << (bit & 7)
+            if not bits[byte] & mask:
+                bits[byte] |= mask
+                added = True
+        return added
+
+
+class _IncomingGraph(object):
+    """Graph discovered from a collection of nodes and an ``incoming``
+    function, as accepted by :func:`topological_order`.
+
+    Nodes are identified by their keys. Predecessors reachable via
+    ``incoming`` but not present in the original collection are discovered,
+    too; ``incoming`` is called exactly once per distinct node.
+    """
+    def __init__(self, nodes, incoming, key):
+        #: List of node keys, in the order of their discovery
+        self.keys = []
+        #: Mapping of node keys to nodes
+        self.nodes = {}
+        #: Mapping of node keys to lists of predecessors' keys
+        self.incoming = {}
+        #: Mapping of node keys to lists of successors' keys
+        self.outgoing = {}
+
+        pending = []
+        for node in nodes:
+            pending.append(node)
+            while pending:
+                node = pending.pop()
+                k = key(node)
+                if k in self.incoming:
+                    continue
+
+                preds = []
+                for pred in incoming(node):
+                    pk = key(pred)
+                    preds.append(pk)
+                    if pk not in self.incoming:
+                        pending.append(pred)
+
+                self.keys.append(k)
+                self.nodes[k] = node
+                self.incoming[k] = preds
+                self.outgoing.setdefault(k, [])
+                for pk in preds:
+                    self.outgoing.setdefault(pk, []).append(k)
+
+    def indegrees(self):
+        """Returns a new mapping of node keys to the numbers of their
+        predecessors.
+        """
+        return dict((k, len(preds))
+                    for k, preds in self.incoming.items())
+
+    def check_resolved(self, indegrees):
+        """Checks that all nodes had their predecessors resolved
+        in given mapping of remaining in-degrees.
+
+        :raise CycleError: If some nodes were left unresolved
+        """
+        # any node left with unsatisfied predecessors must be on
+        # (or downstream from) a cycle
+        for k in self.keys:
+            if indegrees[k]:
+                raise CycleError(self.find_cycle(k, indegrees))
+
+    def find_cycle(self, start, unresolved):
+        """Find a cycle by walking predecessor edges from given node.
+
+        :param start: Key of the node to start from
+        :param unresolved: Mapping of node keys to values that are truthy
+                           for nodes which may lie on a cycle.
+                           Every such node must have an unresolved predecessor.
+
+        :return: List of nodes forming the cycle, in the edge direction,
+                 with the first node repeated at the end
+        """
+        cycle = _find_cycle(
+            start, self.incoming.__getitem__, lambda k: unresolved.get(k))
+        return [self.nodes[k] for k in cycle]
+
@@ -0,0 +1,471 @@
+"""
+Asynchronous counterparts of the algorithms, for use with :module:`asyncio`.
+
+.. note::
+
+    This module requires Python 3.6 or later, and it is not imported
+    by the :module:`taipan.algorithms` package itself.
+
+.. versionadded:: 0.0.4
+"""
+import asyncio
+from collections import deque
+import inspect
+from itertools import islice
+from numbers import Integral
+
+from taipan.algorithms import (_ensure_batch_args, _ensure_max_depth,
+                               _first_visit_func, _seen_keys)
+from taipan.collections import ensure_sequence, is_iterable
+from taipan.functional import ensure_callable, ensure_keyword_args
+from taipan.functional.functions import identity
+
+
+__all__ = [
+    'abatch', 'acycle', 'aintertwine', 'aiterate', 'apad', 'aunique',
+    'abreadth_first', 'adepth_first',
+]
+
+
+#: Default number of expansions that traversal functions run concurrently.
+DEFAULT_CONCURRENCY = 8
+
+
+# Itertools recipes
+
+def abatch(aiterable, n=None, fillvalue=None,
+           max_weight=None, weight=None, max_wait=None):
+    """Batches the elements of given asynchronous iterable.
+
+    With ``max_wait``, an incomplete batch is yielded as soon as
+    the time runs out, even if no new element has arrived.
+
+    See :func:`taipan.algorithms.batch` for the description of arguments.
+
+    :return: Asynchronous iterable of tuples
+    """
+    aiterable = _ensure_aiterable(aiterable)
+    weight = _ensure_batch_args(n, fillvalue, max_weight, weight, max_wait)
+
+    async def generator():
+        loop_time = asyncio.get_event_loop().time
+        aiterator = aiterable.__aiter__()
+        chunk = []
+        total = 0
+        deadline = None
+        pending = None  # retrieval of the next element that is in progress
+        try:
+            while True:
+                if max_wait is None:
+                    try:
+                        elem = await aiterator.__anext__()
+                    except StopAsyncIteration:
+                        break
+                else:
+                    if pending is None:
+                        pending = asyncio.ensure_future(aiterator.__anext__())
+                    timeout = None
+                    if chunk:
+                        timeout = max(0, deadline - loop_time())
+                    done, _ = await asyncio.wait([pending], timeout=timeout)
+                    if not done:
+                        yield tuple(chunk)
+                        chunk = []
+                        total = 0
+                        continue
+                    try:
+                        elem = pending.result()
+                    except StopAsyncIteration:
+                        break
+                    finally:
+                        pending = None
+
+                # a fast source can have the next element ready every time,
+                # so the deadline has to be checked for every element, too
+                w = weight(elem) if weight is not None else 0
+                if chunk and (
+                        (max_wait is not None and loop_time() >= deadline)
+                        or (weight is not None and total + w > max_weight)):
+                    yield tuple(chunk)
+                    chunk = []
+                    total = 0
+
+                if not chunk and max_wait is not None:
+                    deadline = loop_time() + max_wait
+                chunk.append(elem)
+                total += w
+                if len(chunk) == n or (weight is not None
+                                       and total >= max_weight):
+                    yield tuple(chunk)
+                    chunk = []
+                    total = 0
+
+            if chunk:
+                if fillvalue is not None:
+                    chunk.extend([fillvalue] * (n - len(chunk)))
+                yield tuple(chunk)
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    return generator()
+
+
+def acycle(aiterable, n=None):
+    """Cycle through given asynchronous iterable specific (or infinite)
+    number of times.
+
+    Elements are remembered during the first pass,
+    so ``aiterable`` itself is iterated over only once.
+
+    :param n: Number of cycles.
+              If None, result cycles through ``aiterable`` indefinitely.
+
+    :return: Asynchronous iterable that cycles through given one
+    """
+    aiterable = _ensure_aiterable(aiterable)
+    if n is not None:
+        if not isinstance(n, Integral):
+            raise TypeError("invalid number of cycles")
+        if n < 0:
+            raise ValueError("number of cycles cannot be negative")
+
+    async def generator():
+        if n == 0:
+            return
+
+        saved = []
+        async for elem in aiterable:
+            saved.append(elem)
+            yield elem
+        if not saved:
+            return
+
+        cycles = 1
+        while n is None or cycles < n:
+            for elem in saved:
+                yield elem
+            cycles += 1
+
+    return generator()
+
+
+def aintertwine(*aiterables, **kwargs):
+    """Constructs an asynchronous iterable which intertwines given ones.
+
+    Elements are yielded in the same order as by
+    :func:`taipan.algorithms.intertwine`, but the next element of every
+    iterable is retrieved concurrently, ahead of its turn.
+
+    :param weights: Optional keyword argument with a sequence of positive
+                    integers, one for every iterable, specifying how many
+                    items to take from it in every turn
+    """
+    aiterables = tuple(map(_ensure_aiterable, aiterables))
+
+    ensure_keyword_args(kwargs, optional=('weights',))
+    weights = kwargs.get('weights')
+    if weights is None:
+        weights = (1,) * len(aiterables)
+    else:
+        ensure_sequence(weights)
+        if len(weights) != len(aiterables):
+            raise ValueError("expected %s weights, got %s" % (
+                len(aiterables), len(weights)))
+        for weight in weights:
+            if not isinstance(weight, Integral):
+                raise TypeError("invalid weight")
+            if not (weight > 0):
+                raise ValueError("weights must be positive")
+
+    async def generator():
+        # every turn is a list: [async iterator, weight, retrieval task]
+        turns = deque()
+        for aiterable, weight in zip(aiterables, weights):
+            aiterator = aiterable.__aiter__()
+            turns.append([aiterator, weight,
+                          asyncio.ensure_future(aiterator.__anext__())])
+        try:
+            while turns:
+                turn = turns[0]
+                aiterator, weight, _ = turn
+                for _ in range(weight):
+                    try:
+                        item = await turn[2]
+                    except StopAsyncIteration:
+                        turns.popleft()
+                        break
+                    turn[2] = asyncio.ensure_future(aiterator.__anext__())
+                    yield item
+                else:
+                    turns.rotate(-1)
+        finally:
+            for _, _, task in turns:
+                task.cancel()
+
+    return generator()
+
+
+async def aiterate(aiterator, n=None):
+    """Advances the asynchronous iterator N times;
+    by default goes to its end.
+
+    :param n: How much the iterator should be advanced.
+              If None, it will be advanced until the end.
+    """
+    aiterator = _ensure_aiterable(aiterator).__aiter__()
+    if n is None:
+        async for _ in aiterator:
+            pass
+        return
+
+    for _ in range(n):
+        try:
+            await aiterator.__anext__()
+        except StopAsyncIteration:
+            break
+
+
+def apad(aiterable, with_=None):
+    """Pad the end of given asynchronous iterable
+    with infinite sequence of given values.
+
+    :param with_: Object to pad the iterable with. None by default.
+
+    :return: New asynchronous iterable yielding elements of given
+             ``aiterable``, which are then followed by infinite number
+             of ``with_`` values
+    """
+    aiterable = _ensure_aiterable(aiterable)
+
+    async def generator():
+        async for elem in aiterable:
+            yield elem
+        while True:
+            yield with_
+
+    return generator()
+
+
+def aunique(aiterable, key=None, window=None, error_rate=None,
+            capacity=None):
+    """Removes duplicates from given asynchronous iterable,
+    using given key as criterion.
+
+    See :func:`taipan.algorithms.unique` for the description of arguments.
+
+    :return: Asynchronous iterable with duplicates removed
+    """
+    aiterable = _ensure_aiterable(aiterable)
+    key = identity() if key is None else ensure_callable(key)
+    seen = _seen_keys(window, error_rate, capacity)
+
+    async def generator():
+        if seen is not None:
+            async for elem in aiterable:
+                if seen.add(key(elem)):
+                    yield elem
+            return
+
+        seen_exactly = set()
+        async for elem in aiterable:
+            k = key(elem)
+            if k not in seen_exactly:
+                seen_exactly.add(k)
+                yield elem
+
+    return generator()
+
+
+# Traversal
+
+def abreadth_first(start, expand, concurrency=DEFAULT_CONCURRENCY,
+                   visited=False, key=None, max_depth=None, annotated=False):
+    """Performs a breadth-first search of a graph-like structure,
+    expanding multiple nodes concurrently.
+
+    Nodes are yielded in the same order as by the synchronous
+    :func:`taipan.algorithms.breadth_first`. Every node is yielded
+    as soon as it's discovered, while expansions of up to ``concurrency``
+    nodes are running in the background.
+
+    :param start: Node to start the search from
+    :param expand: Coroutine function (or a regular function returning
+                   an awaitable or an iterable) taking a node as an argument
+                   and producing an iterable of its child nodes
+    :param concurrency: Maximum number of expansions running at a time
+
+    See :func:`taipan.algorithms.breadth_first` for the description
+    of ``visited``, ``key``, ``max_depth`` and ``annotated`` arguments.
+
+    :return: Asynchronous iterable of nodes in the BFS order
+
+    Example::
+
+        async for package in abreadth_first(root, fetch_dependencies,
+                                            concurrency=16, visited=True):
+            print(package)
+    """
+    ensure_callable(expand)
+    _ensure_concurrency(concurrency)
+    first_visit = _first_visit_func(visited, key)
+    _ensure_max_depth(max_depth)
+
+    async def generator():
+        if first_visit:
+            first_visit(start)
+
+        # queue of nodes that have been yielded but whose expansion hasn't been
+        # started yet, and queue of running expansions in the BFS order
+        to_expand = deque()
+        running = deque()
+
+        entry = (start, 0, None)
+        yield entry if annotated else start
+        to_expand.append(entry)
+
+        try:
+            while to_expand or running:
+                while to_expand and len(running) < concurrency:
+                    entry = to_expand.popleft()
+                    if entry[1] != max_depth:
+                        task = asyncio.ensure_future(
+                            _expand(expand, entry[0]))
+                        running.append((entry, task))
+                if not running:
+                    continue
+
+                (node, depth, _), task = running.popleft()
+                for child in await task:
+                    if not first_visit or first_visit(child):
+                        entry = (child, depth + 1, node)
+                        yield entry if annotated else child
+                        to_expand.append(entry)
+        finally:
+            for _, task in running:
+                task.cancel()
+
+    return generator()
+
+
+def adepth_first(start, descend, concurrency=DEFAULT_CONCURRENCY,
+                 visited=False, key=None, max_depth=None, annotated=False):
+    """Performs a depth-first search of a graph-like structure,
+    expanding multiple nodes concurrently.
+
+    Nodes are yielded in the same order as by the synchronous
+    :func:`taipan.algorithms.depth_first`. Since DFS is inherently
+    sequential, the concurrency comes from speculatively expanding nodes
+    near the top of the DFS stack, i.e. the ones which will be visited next.
+
+    :param start: Node to start the search from
+    :param descend: Coroutine function (or a regular function returning
+                    an awaitable or an iterable) taking a node as an argument
+                    and producing an iterable of its child nodes
+    :param concurrency: Maximum number of expansions running at a time
+
+    See :func:`taipan.algorithms.depth_first` for the description
+    of ``visited``, ``key``, ``max_depth`` and ``annotated`` arguments.
+
+    :return: Asynchronous iterable of nodes in the DFS order
+
+    .. note::
+
+        With ``visited=True``, a node that is reachable through multiple
+        paths may be expanded speculatively more than once,
+        though it will only be yielded once.
+    """
+    ensure_callable(descend)
+    _ensure_concurrency(concurrency)
+    first_visit = _first_visit_func(visited, key)
+    _ensure_max_depth(max_depth)
+
+    async def generator():
+        # stack items are lists: [node, depth, parent, expansion task or None]
+        stack = [[start, 0, None, None]]
+        pending = set()
+        try:
+            while stack:
+                # tasks which are done may still await removal from ``pending``
+                # by their callbacks, so they aren't counted as running
+                running = sum(1 for task in pending if not task.done())
+                for item in islice(reversed(stack), concurrency):
+                    if running >= concurrency:
+                        break
+                    if item[3] is None and item[1] != max_depth:
+                        item[3] = task = asyncio.ensure_future(
+                            _expand(descend, item[0]))
+                        pending.add(task)
+                        task.add_done_callback(pending.discard)
+                        running += 1
+
+                node, depth, parent, task = stack.pop()
+                if first_visit and not first_visit(node):
+                    if task is not None:
+                        task.cancel()
+                    continue
+
+                yield (node, depth, parent) if annotated else node
+
+                if depth == max_depth:
+                    continue
+                if task is None:
+                    # all expansion slots were taken by nodes deeper
+                    # in the stack; wait for one of them to free up
+                    running = [task for task in pending if not task.done()]
+                    if len(running) >= concurrency:
+                        await asyncio.wait(
+                            running, return_when=asyncio.FIRST_COMPLETED)
+                    children = await _expand(descend, node)
+                else:
+                    children = await task
+                stack.extend([child, depth + 1, node, None]
+                             for child in children)
+        finally:
+            for task in list(pending):
+                task.cancel()
+
+    return generator()
+
+
+# Utility functions
+
+def _ensure_aiterable(arg):
+    """Checks whether given object is an asynchronous iterable,
+    or a regular one that can be used in place of it.
+
+    :return: Asynchronous iterable
+    :raise TypeError: When argument is not an (asynchronous) iterable
+    """
+    if hasattr(arg, '__aiter__'):
+        return arg
+    if is_iterable(arg):
+        return _async_iterable(arg)
+    raise TypeError(
+        "expected an asynchronous iterable, got %s" % type(arg).__name__)
+
+
+async def _async_iterable(iterable):
+    """Wraps a regular iterable so that it can be iterated asynchronously."""
+    for elem in iterable:
+        yield elem
+
+
+def _ensure_concurrency(concurrency):
+    """Checks whether given ``concurrency`` argument is valid."""
+    if not isinstance(concurrency, Integral):
+        raise TypeError("invalid concurrency level")
+    if not (concurrency > 0):
+        raise ValueError("concurrency level must be positive")
+
+
+async def _expand(expand, node):
+    """Calls the expansion function on given node, awaiting its result
+    if necessary.
+
+    :return: List of child nodes
+    """
+    children = expand(node)
+    if inspect.isawaitable(children):
+        children = await children
+    return list(children)
@@ -1,8 +1,16 @@
 """
 List-related functions and classes.
 """
+from __future__ import absolute_import  # for importing built-in `collections`
+
+from itertools import islice
 import sys
 
+try:
+    from collections.abc import Sequence
+except ImportError:
+    from collections import Sequence
+
 from taipan._compat import imap, xrange
 from taipan.collections import ensure_iterable, ensure_sequence
 from taipan.functional import ensure_callable, ensure_keyword_args
@@ -12,6 +20,7 @@ __all__ = [
     'head', 'last', 'tail', 'init',
     'find', 'findlast', 'index', 'lastindex',
     'intersperse', 'intercalate', 'concat', 'join', 'flatten',
+    'LazySeq',
 ]
 
 
@@ -239,3 +248,111 @@ join = concat
 
 #: Alias for the :func:`concat` function.
 flatten = concat
+
+
+# Lazy sequences
+
+class LazySeq(Sequence):
+    """Sequence over a (possibly one-shot) iterable, which pulls its
+    elements on demand and caches them for subsequent access.
+
+    Elements are pulled in chunks, so the cost of resuming the underlying
+    iterator is amortized. The sequence can be indexed, sliced and iterated
+    over many times; every iteration starts from the beginning,
+    independently of others.
+
+    Indexing with non-negative numbers only pulls as many elements
+    as necessary. Negative indices, open-ended slices and :func:`len`
+    consume the whole underlying iterable.
+
+    Example::
+
+        rows = LazySeq(read_rows(huge_file))
+        header, first_row = rows[:2]  # only the first chunk is read
+
+    .. versionadded:: 0.0.4
+    """
+    #: Default number of elements pulled from the iterable at once
+    DEFAULT_CHUNK_SIZE = 256
+
+    def __init__(self, iterable, chunk_size=None):
+        """Constructor.
+
+        :param iterable: Iterable to wrap
+        :param chunk_size: Optional number of elements to pull
+                           from the iterable at once
+        """
+        ensure_iterable(iterable)
+        if chunk_size is None:
+            chunk_size = self.DEFAULT_CHUNK_SIZE
+        elif not (chunk_size > 0):
+            raise ValueError("chunk size must be positive")
+
+        self._iterator = iter(iterable)
+        self._items = []
+        self._chunk_size = chunk_size
+
+    def __repr__(self):
+        return "<LazySeq: %s elements%s>" % (
+            len(self._items), "" if self.exhausted else " so far")
+
+    @property
+    def exhausted(self):
+        """Whether all the elements have been pulled from the iterable."""
+        return self._iterator is None
+
+    def __len__(self):
+        self._fill_all()
+        return len(self._items)
+
+    def __nonzero__(self):
+        self._fill(1)
+        return bool(self._items)
+
+    __bool__ = __nonzero__
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.start, index.stop, index.step
+            if (stop is not None and stop >= 0
+                    and (start is None or start >= 0)
+                    and (step is None or step > 0)):
+                self._fill(stop)
+            else:
+                self._fill_all()
+            return self._items[index]
+
+        if index < 0:
+            self._fill_all()
+        else:
+            self._fill(index + 1)
+        return self._items[index]
+
+    def __iter__(self):
+        items = self._items
+        i = 0
+        while True:
+            if i == len(items):
+                self._fill(i + 1)
+                if i == len(items):
+                    return
+            yield items[i]
+            i += 1
+
+    def _fill(self, n):
+        """Pulls elements from the iterable until at least ``n`` of them
+        are cached, or the iterable is exhausted.
+        """
+        items = self._items
+        while self._iterator is not None and len(items) < n:
+            count = max(self._chunk_size, n - len(items))
+            size = len(items)
+            items.extend(islice(self._iterator, count))
+            if len(items) - size < count:
+                self._iterator = None
+
+    def _fill_all(self):
+        """Pulls all the remaining elements from the iterable."""
+        if self._iterator is not None:
+            self._items.extend(self._iterator)
+            self._iterator = None
@@ -0,0 +1,9 @@
+"""
+Configuration for py.test.
+"""
+from taipan._compat import HAS_ASYNC_GENERATORS
+
+
+collect_ignore = []
+if not HAS_ASYNC_GENERATORS:
+    collect_ignore.append('test_algorithms/test_aio.py')
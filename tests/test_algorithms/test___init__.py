@@ -0,0 +1,2420 @@
+"""
+Tests for the .algorithms.__init__ module.
+"""
+from array import array
+from collections import deque, namedtuple
+from io import BytesIO
+from itertools import count, islice
+from operator import attrgetter, itemgetter
+import os
+import shutil
+import tempfile
+import time
+
+from taipan._compat import IS_PY3, futures, izip, xrange
+from taipan.collections import dicts, is_iterable, is_sequence
+from taipan.collections.lists import LazySeq
+from taipan.collections.tuples import is_tuple
+from taipan.functional import functions ; attr_func = functions.attr_func
+from taipan.testing import skipIf, TestCase
+
+import taipan.algorithms as __unit__
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class _Algorithm(TestCase):
+
+    def _assertGenerator(self, obj):
+        # objects returned by itertools functions are not "generators"
+        # in the strict sense of the word (i.e. results of functions with
+        # ``yield`` or comprehensions) but they behave functionally as such,
+        # so we check for a more general condition: iterable w/o ``__len__``
+        self.assertTrue(is_iterable(obj) and not is_sequence(obj),
+                        msg="%r is not a generator" % (obj,))
+
+
+class Batch(_Algorithm):
+    N = 3
+
+    WITHOUT_LEFTOVERS = [1, 2, 3, 4, 5, 6]
+    WITH_LEFTOVERS = [1, 2, 3, 4, 5]
+    FILLVALUE = object()
+
+    def test_iterable__none(self):
+        with self.assertRaises(TypeError):
+            __unit__.batch(None, 1)
+
+    def test_iterable__some_object(self):
+        with self.assertRaises(TypeError):
+            __unit__.batch(object(), 1)
+
+    def test_iterable__without_leftovers(self):
+        batched = __unit__.batch(self.WITHOUT_LEFTOVERS, self.N)
+
+        self._assertGenerator(batched)
+        batched = list(batched)
+
+        self.assertEquals(
+            int(len(self.WITHOUT_LEFTOVERS) / self.N), len(batched))
+        for i, batch in enumerate(batched):
+            self._assertTuple(batch)
+            self.assertEquals(self.N, len(batch))
+            self.assertItemsEqual(
+                self.WITHOUT_LEFTOVERS[i * self.N:(i + 1) * self.N], batch)
+
+    def test_iterable__with_leftovers__trimmed(self):
+        batched = __unit__.batch(self.WITH_LEFTOVERS, self.N)
+
+        self._assertGenerator(batched)
+        batched = list(batched)
+
+        self.assertEquals(
+            int(len(self.WITH_LEFTOVERS) / self.N) + 1, len(batched))
+        for i, batch in enumerate(batched):
+            self._assertTuple(batch)
+            self.assertGreaterEqual(self.N, len(batch))
+            self.assertItemsEqual(
+                self.WITH_LEFTOVERS[i * self.N:(i + 1) * self.N], batch)
+
+    def test_iterable__with_leftovers__padded(self):
+        batched = __unit__.batch(self.WITH_LEFTOVERS, self.N, self.FILLVALUE)
+
+        self._assertGenerator(batched)
+        batched = list(batched)
+
+        self.assertEquals(
+            int(len(self.WITH_LEFTOVERS) / self.N) + 1, len(batched))
+        for i, batch in enumerate(batched):
+            self._assertTuple(batch)
+            self.assertEquals(self.N, len(batch))
+            for j, elem in enumerate(batch):
+                index = i * self.N + j
+                if index < len(self.WITH_LEFTOVERS):
+                    self.assertEquals(self.WITH_LEFTOVERS[index], elem)
+                else:
+                    self.assertIs(self.FILLVALUE, elem)
+
+    def test_n__none(self):
+        with self.assertRaises(TypeError):
+            __unit__.batch(self.WITH_LEFTOVERS, None)
+
+    def test_n__zero(self):
+        with self.assertRaises(ValueError):
+            __unit__.batch(self.WITH_LEFTOVERS, 0)
+
+    def test_n__negative(self):
+        with self.assertRaises(ValueError):
+            __unit__.batch(self.WITH_LEFTOVERS, -1)
+
+    def test_n__greater_than_iterable_length(self):
+        batched = __unit__.batch(
+            self.WITHOUT_LEFTOVERS, len(self.WITHOUT_LEFTOVERS) + self.N)
+
+        self._assertGenerator(batched)
+        batched = list(batched)
+
+        self.assertEquals(1, len(batched))
+        self.assertItemsEqual(self.WITHOUT_LEFTOVERS, batched[0])
+
+    def test_iterable__generator(self):
+        batched = __unit__.batch(iter(self.WITH_LEFTOVERS), self.N)
+
+        self._assertGenerator(batched)
+        self.assertEquals([(1, 2, 3), (4, 5)], list(batched))
+
+    def test_iterable__generator__padded(self):
+        batched = __unit__.batch(
+            iter(self.WITH_LEFTOVERS), self.N, self.FILLVALUE)
+        self.assertEquals([(1, 2, 3), (4, 5, self.FILLVALUE)], list(batched))
+
+    def test_iterable__string(self):
+        self.assertEquals([('a', 'b'), ('c',)],
+                          list(__unit__.batch("abc", 2)))
+
+    def test_max_weight__default_weight(self):
+        batched = __unit__.batch(["a", "bb", "ccc", "d", "ee"], max_weight=3)
+
+        self._assertGenerator(batched)
+        self.assertEquals([("a", "bb"), ("ccc",), ("d", "ee")],
+                          list(batched))
+
+    def test_max_weight__heavy_element(self):
+        batched = __unit__.batch([1, 10, 1], max_weight=5, weight=int)
+        self.assertEquals([(1,), (10,), (1,)], list(batched))
+
+    def test_max_weight__with_n(self):
+        batched = __unit__.batch([1] * 5, 2, max_weight=10, weight=int)
+        self.assertEquals([(1, 1), (1, 1), (1,)], list(batched))
+
+    def test_max_weight__zero(self):
+        with self.assertRaises(ValueError):
+            __unit__.batch(self.WITH_LEFTOVERS, max_weight=0)
+
+    def test_max_weight__with_fillvalue(self):
+        with self.assertRaises(ValueError):
+            __unit__.batch(self.WITH_LEFTOVERS, self.N, self.FILLVALUE,
+                           max_weight=10)
+
+    def test_weight__without_max_weight(self):
+        with self.assertRaises(ValueError):
+            __unit__.batch(self.WITH_LEFTOVERS, self.N, weight=len)
+
+    def test_weight__non_function(self):
+        with self.assertRaises(TypeError):
+            __unit__.batch(self.WITH_LEFTOVERS, max_weight=1, weight=object())
+
+    def test_iterable__deque(self):
+        batched = __unit__.batch(deque([1, 2, 3, 4, 5]), 2)
+        self.assertEquals([(1, 2), (3, 4), (5,)], list(batched))
+
+    def test_iterable__lazy_seq(self):
+        seq = LazySeq(xrange(1000), chunk_size=10)
+        batched = __unit__.batch(seq, self.N)
+
+        self.assertEquals((0, 1, 2), next(batched))
+        self.assertFalse(seq.exhausted)
+
+    def test_max_wait__negative(self):
+        with self.assertRaises(ValueError):
+            __unit__.batch(self.WITH_LEFTOVERS, self.N, max_wait=-1)
+
+    def test_max_wait__fast_iterable(self):
+        batched = __unit__.batch(self.WITH_LEFTOVERS, self.N, max_wait=60)
+
+        self._assertGenerator(batched)
+        self.assertEquals([(1, 2, 3), (4, 5)], list(batched))
+
+    def test_max_wait__slow_iterable(self):
+        def slow():
+            yield 1
+            yield 2
+            time.sleep(0.5)
+            yield 3
+
+        batched = __unit__.batch(slow(), 10, max_wait=0.05)
+        self.assertEquals([(1, 2), (3,)], list(batched))
+
+    def test_max_wait__endless_iterable(self):
+        start = time.time()
+        batched = __unit__.batch(count(), max_wait=0.05)
+        first, second = next(batched), next(batched)
+
+        self.assertLess(time.time() - start, 5)
+        self.assertEquals(list(xrange(len(first))), list(first))
+        self.assertEquals(len(first), second[0])
+
+    def test_max_wait__exception(self):
+        def failing():
+            yield 1
+            raise RuntimeError()
+
+        batched = __unit__.batch(failing(), 10, max_wait=0.05)
+        with self.assertRaises(RuntimeError):
+            list(batched)
+
+    def test_iterable__bytearray(self):
+        buffer_ = bytearray(b"abcdefgh")
+        batched = list(__unit__.batch(buffer_, self.N))
+
+        self.assertEquals([b"abc", b"def", b"gh"], [bytes(b) for b in batched])
+        for chunk in batched:
+            self.assertIsInstance(chunk, memoryview)
+
+        # chunks are views, not copies
+        buffer_[0:1] = b"X"
+        self.assertEquals(b"Xbc", bytes(batched[0]))
+
+    def test_iterable__array(self):
+        numbers = array('i', xrange(5))
+        batched = list(__unit__.batch(numbers, 2))
+
+        self.assertEquals([[0, 1], [2, 3], [4]],
+                          [list(chunk) for chunk in batched])
+
+    def test_iterable__bytearray__padded(self):
+        batched = __unit__.batch(bytearray(b"abcd"), self.N, self.FILLVALUE)
+        self.assertEquals([tuple(bytearray(b"abc")),
+                           (ord("d"), self.FILLVALUE, self.FILLVALUE)],
+                          list(batched))
+
+    # Assertions
+
+    def _assertTuple(self, obj):
+        self.assertTrue(is_tuple(obj), msg="%r is not a tuple" % (obj,))
+
+
+class BatchFile(_Algorithm):
+    DATA = b"0123456789"
+
+    class TrickleFile(BytesIO):
+        """File which reads at most one byte at a time, like a slow pipe."""
+        def readinto(self, buffer_):
+            return BytesIO.readinto(self, buffer_[:1])
+
+    def test_file__none(self):
+        with self.assertRaises(TypeError):
+            __unit__.batch_file(None, 1)
+
+    def test_n__zero(self):
+        with self.assertRaises(ValueError):
+            __unit__.batch_file(BytesIO(self.DATA), 0)
+
+    def test_n__some_object(self):
+        with self.assertRaises(TypeError):
+            __unit__.batch_file(BytesIO(self.DATA), object())
+
+    def test_file__empty(self):
+        self.assertEmpty(__unit__.batch_file(BytesIO(), 4))
+
+    def test_file__with_leftovers(self):
+        chunks = [bytes(chunk)
+                  for chunk in __unit__.batch_file(BytesIO(self.DATA), 4)]
+        self.assertEquals([b"0123", b"4567", b"89"], chunks)
+
+    def test_file__without_leftovers(self):
+        chunks = [bytes(chunk)
+                  for chunk in __unit__.batch_file(BytesIO(self.DATA), 5)]
+        self.assertEquals([b"01234", b"56789"], chunks)
+
+    def test_file__short_reads(self):
+        chunks = [bytes(chunk) for chunk
+                  in __unit__.batch_file(self.TrickleFile(self.DATA), 4)]
+        self.assertEquals([b"0123", b"4567", b"89"], chunks)
+
+
+class Broadcast(_Algorithm):
+    LENGTH = 100
+    ITERABLE = list(xrange(LENGTH))
+    MAX_LAG = 10
+
+    def test_iterable__none(self):
+        with self.assertRaises(TypeError):
+            __unit__.broadcast(None, 2)
+
+    def test_n__some_object(self):
+        with self.assertRaises(TypeError):
+            __unit__.broadcast(self.ITERABLE, object())
+
+    def test_max_lag__zero(self):
+        with self.assertRaises(ValueError):
+            __unit__.broadcast(self.ITERABLE, 2, max_lag=0)
+
+    def test_n__zero(self):
+        self.assertEmpty(__unit__.broadcast(self.ITERABLE, 0))
+
+    def test_iterable__empty(self):
+        for consumer in __unit__.broadcast([], 3):
+            self.assertEmpty(list(consumer))
+
+    def test_within_lag(self):
+        first, second = __unit__.broadcast(
+            iter(self.ITERABLE), 2, max_lag=self.MAX_LAG)
+
+        result = []
+        for a, b in izip(first, second):
+            result.append(a)
+            self.assertEquals(a, b)
+        self.assertEquals(self.ITERABLE, result)
+
+    def test_one_after_another__fails_fast(self):
+        first, second = __unit__.broadcast(
+            iter(self.ITERABLE), 2, max_lag=self.MAX_LAG)
+
+        self.assertEquals(self.ITERABLE, list(first))
+        with self.assertRaises(__unit__.BroadcastLagError):
+            next(second)
+
+    def test_one_after_another__within_lag(self):
+        first, second = __unit__.broadcast(
+            iter(self.ITERABLE), 2, max_lag=self.LENGTH)
+
+        self.assertEquals(self.ITERABLE, list(first))
+        self.assertEquals(self.ITERABLE, list(second))
+
+    def test_close(self):
+        first, second = __unit__.broadcast(
+            iter(self.ITERABLE), 2, max_lag=self.MAX_LAG, block=True)
+
+        second.close()
+        self.assertEquals(self.ITERABLE, list(first))
+        self.assertEmpty(list(second))
+
+    def test_error(self):
+        def generator():
+            yield 1
+            raise ValueError()
+
+        first, second = __unit__.broadcast(generator(), 2)
+        self.assertEquals(1, next(first))
+        self.assertEquals(1, next(second))
+        for consumer in (first, second):
+            with self.assertRaises(ValueError):
+                next(consumer)
+
+    def test_block__threads(self):
+        import threading
+
+        consumers = __unit__.broadcast(
+            iter(self.ITERABLE), 3, max_lag=self.MAX_LAG, block=True)
+        results = [None] * len(consumers)
+
+        def consume(i):
+            results[i] = []
+            for elem in consumers[i]:
+                results[i].append(elem)
+                if i == 0:
+                    time.sleep(0.001)  # slowest consumer
+
+        threads = [threading.Thread(target=consume, args=(i,))
+                   for i in xrange(len(consumers))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for result in results:
+            self.assertEquals(self.ITERABLE, result)
+
+
+class Cycle(_Algorithm):
+    LENGTH = 10
+    ITERABLE = list(xrange(LENGTH))
+    CYCLES_COUNT = 64
+
+    def test_iterable__none(self):
+        with self.assertRaises(TypeError):
+            __unit__.cycle(None)
+
+    def test_iterable__some_object(self):
+        with self.assertRaises(TypeError):
+            __unit__.cycle(object())
+
+    def test_iterable__empty(self):
+        cycled = __unit__.cycle(())
+        self.assertEmpty(
+            cycled, msg="cycled empty iterable expected to be also empty")
+
+    def test_n__none(self):
+        cycled = __unit__.cycle(self.ITERABLE)
+
+        # iterate for a few cycles and check if elements match
+        for i, elem in izip(xrange(self.LENGTH * self.CYCLES_COUNT), cycled):
+            self.assertEquals(self.ITERABLE[i % self.LENGTH], elem)
+
+        # make sure there is still some more
+        for _ in xrange(self.CYCLES_COUNT):
+            next(cycled)
+
+    def test_n__zero(self):
+        cycled = __unit__.cycle(self.ITERABLE, 0)
+        self.assertEmpty(
+            cycled, msg="iterable cycled 0 times expected to be empty")
+
+    def test_n__negative(self):
+        with self.assertRaises(ValueError):
+            __unit__.cycle(self.ITERABLE, -1)
+
+    def test_n__positive(self):
+        cycled = __unit__.cycle(self.ITERABLE, self.CYCLES_COUNT)
+
+        # iterate for an exactly the expected number of elements
+        for i, elem in izip(xrange(self.LENGTH * self.CYCLES_COUNT), cycled):
+            self.assertEquals(self.ITERABLE[i % self.LENGTH], elem)
+
+        # make sure the cycled iterable has been exhausted this way
+        with self.assertRaises(StopIteration):
+            next(cycled)
+
+
+class Intertwine(_Algorithm):
+    FIRST = [1, 2, 3]
+    SECOND = ['a', 'b', 'c']
+    FIRST_AND_SECOND = [1, 'a', 2, 'b', 3, 'c']
+
+    LONGER = [13, 21, 34, 55, 89]
+    SHORTER = ['foo', 'bar', 'baz']
+    LONGER_AND_SHORTER = [13, 'foo', 21, 'bar', 34, 'baz', 55, 89]
+
+    def test_no_args(self):
+        intertwined = __unit__.intertwine()
+        self.assertEmpty(intertwined)
+
+    def test_none(self):
+        with self.assertRaises(TypeError):
+            __unit__.intertwine(None)
+
+    def test_some_object(self):
+        with self.assertRaises(TypeError):
+            __unit__.intertwine(object())
+
+    def test_single_iterable(self):
+        self.assertItemsEqual(self.FIRST, __unit__.intertwine(self.FIRST))
+        self.assertItemsEqual(self.SECOND, __unit__.intertwine(self.SECOND))
+
+    def test_single_iterable__passed_twice(self):
+        self.assertItemsEqual(
+            self.FIRST * 2, __unit__.intertwine(self.FIRST, self.FIRST))
+        self.assertItemsEqual(
+            self.SECOND * 2, __unit__.intertwine(self.SECOND, self.SECOND))
+
+    def test_two_iterables__one_empty(self):
+        self.assertItemsEqual(self.FIRST, __unit__.intertwine(self.FIRST, ()))
+        self.assertItemsEqual(self.SECOND, __unit__.intertwine(self.SECOND, ()))
+
+    def test_two_iterables__equal_lengths(self):
+        self.assertItemsEqual(self.FIRST_AND_SECOND,
+                              __unit__.intertwine(self.FIRST, self.SECOND))
+
+    def test_two_iterables__inequal_lengths(self):
+        self.assertItemsEqual(
+            self.LONGER_AND_SHORTER,
+            __unit__.intertwine(self.LONGER, self.SHORTER))
+
+    def test_many_iterables__skewed_lengths(self):
+        shorts = [[i] for i in xrange(100)]
+        intertwined = list(__unit__.intertwine(self.LONGER, *shorts))
+
+        self.assertEquals(self.LONGER[0], intertwined[0])
+        self.assertEquals(list(xrange(100)), intertwined[1:101])
+        self.assertEquals(self.LONGER[1:], intertwined[101:])
+
+    def test_iterators(self):
+        self.assertEquals(
+            self.LONGER_AND_SHORTER,
+            list(__unit__.intertwine(iter(self.LONGER), iter(self.SHORTER))))
+
+    def test_weights__invalid_keyword(self):
+        with self.assertRaises(TypeError):
+            __unit__.intertwine(self.FIRST, foo=42)
+
+    def test_weights__wrong_count(self):
+        with self.assertRaises(ValueError):
+            __unit__.intertwine(self.FIRST, self.SECOND, weights=[1])
+
+    def test_weights__zero(self):
+        with self.assertRaises(ValueError):
+            __unit__.intertwine(self.FIRST, self.SECOND, weights=[1, 0])
+
+    def test_weights__some_object(self):
+        with self.assertRaises(TypeError):
+            __unit__.intertwine(self.FIRST, self.SECOND, weights=object())
+
+    def test_weights__ones(self):
+        self.assertEquals(
+            self.LONGER_AND_SHORTER,
+            list(__unit__.intertwine(self.LONGER, self.SHORTER,
+                                     weights=[1, 1])))
+
+    def test_weights__uneven(self):
+        intertwined = __unit__.intertwine(
+            self.LONGER, self.SHORTER, weights=[2, 1])
+        self.assertEquals([13, 21, 'foo', 34, 55, 'bar', 89, 'baz'],
+                          list(intertwined))
+
+
+class Iterate(_Algorithm):
+    MAX = 10
+    FEW = int(MAX / 2)
+
+    class Counter(object):
+        """Simplest iterable that can tell how much it's been iterated over."""
+        def __init__(self, max_count=None):
+            self.max_count = max_count
+            self.current_count = 0
+
+        def __iter__(self):
+            return self
+
+        def next(self):
+            if self.max_count is not None:
+                if self.current_count >= self.max_count:
+                    raise StopIteration()
+            self.current_count += 1
+            return self.current_count
+
+        if IS_PY3:
+            __next__ = next
+
+    def test_iterable__none(self):
+        with self.assertRaises(TypeError):
+            __unit__.iterate(None)
+
+    def test_iterable__some_object(self):
+        with self.assertRaises(TypeError):
+            __unit__.iterate(object())
+
+    def test_iterable__finite__few_iterations(self):
+        counter = self.Counter(self.MAX)
+        __unit__.iterate(counter, self.FEW)
+        self.assertEquals(self.FEW, counter.current_count)
+
+    def test_iterable__finite__to_the_end(self):
+        counter = self.Counter(self.MAX)
+        __unit__.iterate(counter)
+        self.assertEquals(self.MAX, counter.current_count)
+
+    def test_iterable__finite__past_the_end(self):
+        counter = self.Counter(self.MAX)
+        __unit__.iterate(counter, self.MAX * 2)
+        self.assertEquals(self.MAX, counter.current_count)
+
+    def test_iterable__finite__multiple_calls(self):
+        counter = self.Counter(self.MAX)
+        for i in xrange(1, self.FEW):
+            __unit__.iterate(counter, self.FEW)
+            self.assertEquals(
+                min(self.MAX, i * self.FEW), counter.current_count)
+
+    def test_iterable__infinite__few_iterations(self):
+        counter = self.Counter()
+        __unit__.iterate(counter, self.FEW)
+        self.assertEquals(self.FEW, counter.current_count)
+
+    def test_iterable__infinite__multiple_calls(self):
+        counter = self.Counter()
+        for i in xrange(1, self.FEW):
+            __unit__.iterate(counter, self.FEW)
+            self.assertEquals(i * self.FEW, counter.current_count)
+
+
+class Pad(_Algorithm):
+    LENGTH = 10
+    ITERABLE = list(xrange(LENGTH))
+
+    MUCH_MORE_THAN_LENGTH = 100 * LENGTH
+    PADDING = object()
+
+    def test_iterable__none(self):
+        with self.assertRaises(TypeError):
+            __unit__.pad(None)
+
+    def test_iterable__some_object(self):
+        with self.assertRaises(TypeError):
+            __unit__.pad(object())
+
+    def test_iterable__empty(self):
+        padded = __unit__.pad([])
+
+        self._assertGenerator(padded)
+        for _, elem in izip(xrange(self.MUCH_MORE_THAN_LENGTH), padded):
+            self.assertIsNone(elem)
+
+    def test_pad__default(self):
+        padded = __unit__.pad(self.ITERABLE)
+
+        self._assertGenerator(padded)
+        for i, elem in izip(xrange(self.MUCH_MORE_THAN_LENGTH), padded):
+            if i < self.LENGTH:
+                self.assertIs(self.ITERABLE[i], elem)
+            else:
+                self.assertIsNone(elem)
+
+    def test_pad__custom(self):
+        padded = __unit__.pad(self.ITERABLE, with_=self.PADDING)
+
+        self._assertGenerator(padded)
+        for i, elem in izip(xrange(self.MUCH_MORE_THAN_LENGTH), padded):
+            if i < self.LENGTH:
+                self.assertIs(self.ITERABLE[i], elem)
+            else:
+                self.assertIs(self.PADDING, elem)
+
+
+class Prefetch(_Algorithm):
+    LENGTH = 100
+    ITERABLE = list(xrange(LENGTH))
+    N = 10
+
+    def test_iterable__none(self):
+        with self.assertRaises(TypeError):
+            __unit__.prefetch(None, self.N)
+
+    def test_n__some_object(self):
+        with self.assertRaises(TypeError):
+            __unit__.prefetch(self.ITERABLE, object())
+
+    def test_n__zero(self):
+        with self.assertRaises(ValueError):
+            __unit__.prefetch(self.ITERABLE, 0)
+
+    def test_iterable__empty(self):
+        prefetched = __unit__.prefetch([], self.N)
+        self._assertGenerator(prefetched)
+        self.assertEmpty(list(prefetched))
+
+    def test_iterable__some(self):
+        prefetched = __unit__.prefetch(iter(self.ITERABLE), self.N)
+        self._assertGenerator(prefetched)
+        self.assertEquals(self.ITERABLE, list(prefetched))
+
+    def test_reads_in_advance(self):
+        read = []
+
+        def generator():
+            for i in self.ITERABLE:
+                read.append(i)
+                yield i
+
+        prefetched = __unit__.prefetch(generator(), self.N)
+        self.assertEquals(0, next(prefetched))
+
+        deadline = time.time() + 5
+        while len(read) < self.N + 1 and time.time() < deadline:
+            time.sleep(0.01)
+        # one element is retrieved, N are queued, and one more
+        # might be waiting to be put in the queue
+        self.assertGreaterEqual(len(read), self.N + 1)
+        self.assertLessEqual(len(read), self.N + 2)
+
+    def test_error(self):
+        def generator():
+            yield 1
+            raise ValueError()
+
+        prefetched = __unit__.prefetch(generator(), self.N)
+        self.assertEquals(1, next(prefetched))
+        with self.assertRaises(ValueError):
+            next(prefetched)
+
+    def test_close(self):
+        prefetched = __unit__.prefetch(iter(self.ITERABLE), self.N)
+        self.assertEquals(0, next(prefetched))
+        prefetched.close()
+        self.assertEmpty(list(prefetched))
+
+    @skipIf(futures is None, "requires concurrent.futures")
+    def test_executor(self):
+        with futures.ThreadPoolExecutor(max_workers=1) as executor:
+            prefetched = __unit__.prefetch(
+                iter(self.ITERABLE), self.N, executor=executor)
+            self.assertEquals(self.ITERABLE, list(prefetched))
+
+
+class Sample(_Algorithm):
+    LENGTH = 100
+    ITERABLE = list(xrange(LENGTH))
+    K = 10
+    TRIALS = 2000
+
+    def test_iterable__none(self):
+        with self.assertRaises(TypeError):
+            __unit__.sample(None, self.K)
+
+    def test_k__some_object(self):
+        with self.assertRaises(TypeError):
+            __unit__.sample(self.ITERABLE, object())
+
+    def test_k__negative(self):
+        with self.assertRaises(ValueError):
+            __unit__.sample(self.ITERABLE, -1)
+
+    def test_weights__some_object(self):
+        with self.assertRaises(TypeError):
+            __unit__.sample(self.ITERABLE, self.K, weights=object())
+
+    def test_k__zero(self):
+        self.assertEmpty(__unit__.sample(self.ITERABLE, 0))
+
+    def test_iterable__shorter_than_k(self):
+        self.assertItemsEqual(
+            self.ITERABLE[:5], __unit__.sample(self.ITERABLE[:5], self.K))
+
+    def test_uniform__distinct_elements(self):
+        result = __unit__.sample(iter(self.ITERABLE), self.K, seed=42)
+
+        self.assertEquals(self.K, len(result))
+        self.assertEquals(self.K, len(set(result)))
+        for elem in result:
+            self.assertIn(elem, self.ITERABLE)
+
+    def test_uniform__seed(self):
+        self.assertEquals(__unit__.sample(self.ITERABLE, self.K, seed=42),
+                          __unit__.sample(self.ITERABLE, self.K, seed=42))
+
+    def test_uniform__distribution(self):
+        counts = [0] * self.LENGTH
+        for seed in xrange(self.TRIALS):
+            for elem in __unit__.sample(self.ITERABLE, self.K, seed=seed):
+                counts[elem] += 1
+
+        # every element is expected to be chosen TRIALS * K / LENGTH times
+        expected = self.TRIALS * self.K // self.LENGTH
+        for count in counts:
+            self.assertGreater(count, expected // 2)
+            self.assertLess(count, expected * 2)
+
+    def test_weighted__negative_weight(self):
+        with self.assertRaises(ValueError):
+            __unit__.sample(self.ITERABLE, self.K, weights=lambda x: -1)
+
+    def test_weighted__zero_weights(self):
+        result = __unit__.sample(self.ITERABLE, self.K,
+                                 weights=lambda x: x % 2, seed=42)
+
+        self.assertEquals(self.K, len(result))
+        for elem in result:
+            self.assertEquals(1, elem % 2)
+
+    def test_weighted__all_zero_weights(self):
+        self.assertEmpty(
+            __unit__.sample(self.ITERABLE, self.K, weights=lambda x: 0))
+
+    def test_weighted__distribution(self):
+        # the last ten elements weigh as much as all the others together
+        weights = lambda x: 9 if x >= self.LENGTH - 10 else 1
+
+        heavy_count = 0
+        for seed in xrange(self.TRIALS // 10):
+            result = __unit__.sample(self.ITERABLE, 1,
+                                     weights=weights, seed=seed)
+            heavy_count += result[0] >= self.LENGTH - 10
+
+        self.assertGreater(heavy_count, self.TRIALS // 10 // 3)
+        self.assertLess(heavy_count, self.TRIALS // 10 * 2 // 3)
+
+
+class Unique(_Algorithm):
+    NORMAL_WITHOUT_DUPLICATES = [1, 2, 3, 4, 5]
+    NORMAL_WITH_DUPLICATES = [1, 2, 2, 3, 4, 5, 1]
+
+    STRLEN_WITHOUT_DUPLICATES = "Alice has a parrot".split()
+    STRLEN_WITH_DUPLICATES = "Alice has a cat and a dog and a parrot".split()
+
+    def test_iterable__none(self):
+        with self.assertRaises(TypeError):
+            __unit__.unique(None)
+
+    def test_iterable__some_object(self):
+        with self.assertRaises(TypeError):
+            __unit__.unique(object())
+
+    def test_iterable__empty(self):
+        uniqued = __unit__.unique([])
+
+        self._assertGenerator(uniqued)
+        uniqued = list(uniqued)
+
+        self.assertZero(len(uniqued))
+
+    def test_iterable__without_duplicates(self):
+        uniqued = __unit__.unique(self.NORMAL_WITHOUT_DUPLICATES)
+
+        self._assertGenerator(uniqued)
+        uniqued = list(uniqued)
+
+        self.assertItemsEqual(self.NORMAL_WITHOUT_DUPLICATES, uniqued)
+
+    def test_iterable__with_duplicates(self):
+        uniqued = __unit__.unique(self.NORMAL_WITH_DUPLICATES)
+
+        self._assertGenerator(uniqued)
+        uniqued = list(uniqued)
+
+        self.assertItemsEqual(self.NORMAL_WITHOUT_DUPLICATES, uniqued)
+
+    def test_key__non_function(self):
+        with self.assertRaises(TypeError):
+            __unit__.unique((), object())
+
+    def test_key__strlen__without_duplicates(self):
+        uniqued = __unit__.unique(self.STRLEN_WITHOUT_DUPLICATES, key=len)
+
+        self._assertGenerator(uniqued)
+        uniqued = list(uniqued)
+
+        self.assertItemsEqual(self.STRLEN_WITHOUT_DUPLICATES, uniqued)
+
+    def test_key__strlen__with_duplicates(self):
+        uniqued = __unit__.unique(self.STRLEN_WITH_DUPLICATES, key=len)
+
+        self._assertGenerator(uniqued)
+        uniqued = list(uniqued)
+
+        self.assertItemsEqual(self.STRLEN_WITHOUT_DUPLICATES, uniqued)
+
+    def test_iterable__hash_collisions(self):
+        # in CPython, hash(-1) == hash(-2)
+        uniqued = list(__unit__.unique([-1, -2, -1]))
+        self.assertEquals([-1, -2], uniqued)
+
+    def test_window__zero(self):
+        with self.assertRaises(ValueError):
+            __unit__.unique((), window=0)
+
+    def test_window__some_object(self):
+        with self.assertRaises(TypeError):
+            __unit__.unique((), window=object())
+
+    def test_window__with_error_rate(self):
+        with self.assertRaises(ValueError):
+            __unit__.unique((), window=1, error_rate=0.01, capacity=10)
+
+    def test_window__duplicates_within(self):
+        uniqued = __unit__.unique(self.NORMAL_WITH_DUPLICATES, window=10)
+
+        self._assertGenerator(uniqued)
+        self.assertEquals(self.NORMAL_WITHOUT_DUPLICATES, list(uniqued))
+
+    def test_window__duplicates_outside(self):
+        uniqued = __unit__.unique([1, 2, 3, 1, 3, 2], window=2)
+        self.assertEquals([1, 2, 3, 1, 2], list(uniqued))
+
+    def test_window__recently_seen_kept(self):
+        # repeated sightings keep the key in the window
+        uniqued = __unit__.unique([1, 2, 1, 3, 1, 4, 1], window=2)
+        self.assertEquals([1, 2, 3, 4], list(uniqued))
+
+    def test_window__long_stream(self):
+        iterable = [i % 7 for i in xrange(1000)]
+        self.assertEquals(list(range(7)),
+                          list(__unit__.unique(iterable, window=7)))
+        self.assertEquals(iterable,
+                          list(__unit__.unique(iterable, window=6)))
+
+    def test_error_rate__without_capacity(self):
+        with self.assertRaises(ValueError):
+            __unit__.unique((), error_rate=0.01)
+
+    def test_error_rate__invalid(self):
+        with self.assertRaises(ValueError):
+            __unit__.unique((), error_rate=1.5, capacity=10)
+
+    def test_capacity__without_error_rate(self):
+        with self.assertRaises(ValueError):
+            __unit__.unique((), capacity=10)
+
+    def test_error_rate__with_duplicates(self):
+        uniqued = __unit__.unique(
+            self.NORMAL_WITH_DUPLICATES, error_rate=0.001, capacity=100)
+
+        self._assertGenerator(uniqued)
+        self.assertEquals(self.NORMAL_WITHOUT_DUPLICATES, list(uniqued))
+
+    def test_error_rate__false_positives(self):
+        count = 10000
+        uniqued = list(__unit__.unique(
+            xrange(count), error_rate=0.01, capacity=count))
+
+        # allow for some leeway over the nominal error rate
+        self.assertGreater(len(uniqued), count * 0.97)
+
+
+class UniqueJustseen(_Algorithm):
+
+    def test_iterable__none(self):
+        with self.assertRaises(TypeError):
+            __unit__.unique_justseen(None)
+
+    def test_iterable__empty(self):
+        self.assertEmpty(__unit__.unique_justseen([]))
+
+    def test_iterable__sorted(self):
+        uniqued = __unit__.unique_justseen([1, 1, 2, 3, 3, 3, 4])
+
+        self._assertGenerator(uniqued)
+        self.assertEquals([1, 2, 3, 4], list(uniqued))
+
+    def test_iterable__unsorted(self):
+        uniqued = __unit__.unique_justseen("AAABBCCAA")
+        self.assertEquals(list("ABCA"), list(uniqued))
+
+    def test_key__non_function(self):
+        with self.assertRaises(TypeError):
+            __unit__.unique_justseen((), object())
+
+    def test_key__custom(self):
+        uniqued = __unit__.unique_justseen("aAbBBc", key=str.lower)
+        self.assertEquals(list("abc"), list(uniqued))
+
+
+class Window(_Algorithm):
+    ITERABLE = [1, 2, 3, 4, 5]
+
+    def test_iterable__none(self):
+        with self.assertRaises(TypeError):
+            __unit__.window(None, 2)
+
+    def test_n__zero(self):
+        with self.assertRaises(ValueError):
+            __unit__.window(self.ITERABLE, 0)
+
+    def test_n__some_object(self):
+        with self.assertRaises(TypeError):
+            __unit__.window(self.ITERABLE, object())
+
+    def test_step__zero(self):
+        with self.assertRaises(ValueError):
+            __unit__.window(self.ITERABLE, 2, step=0)
+
+    def test_iterable__shorter_than_n(self):
+        self.assertEmpty(__unit__.window(self.ITERABLE, 10))
+
+    def test_iterable__exactly_n(self):
+        self.assertEquals([tuple(self.ITERABLE)],
+                          list(__unit__.window(self.ITERABLE, 5)))
+
+    def test_step__default(self):
+        windows = __unit__.window(iter(self.ITERABLE), 3)
+
+        self._assertGenerator(windows)
+        self.assertEquals([(1, 2, 3), (2, 3, 4), (3, 4, 5)], list(windows))
+
+    def test_step__custom(self):
+        windows = __unit__.window(self.ITERABLE, 2, step=2)
+        self.assertEquals([(1, 2), (3, 4)], list(windows))
+
+    def test_step__greater_than_n(self):
+        windows = __unit__.window(xrange(10), 2, step=3)
+        self.assertEquals([(0, 1), (3, 4), (6, 7)], list(windows))
+
+    def test_copy__false(self):
+        windows = __unit__.window(self.ITERABLE, 3, copy=False)
+        self.assertEquals([(1, 2, 3), (2, 3, 4), (3, 4, 5)],
+                          [tuple(w) for w in windows])
+
+    @skipIf(numpy is None, "requires NumPy")
+    def test_iterable__ndarray(self):
+        array_ = numpy.arange(10)
+        windows = __unit__.window(array_, 3, step=2)
+
+        self.assertEquals([[0, 1, 2], [2, 3, 4], [4, 5, 6], [6, 7, 8]],
+                          windows.tolist())
+        self.assertTrue(numpy.shares_memory(array_, windows))
+
+
+# Sorting
+
+class MergeSorted(_Algorithm):
+    EVENS = [0, 2, 4, 6, 8]
+    ODDS = [1, 3, 5, 7]
+    TENS = [10, 20]
+
+    def test_no_args(self):
+        self.assertEmpty(__unit__.merge_sorted())
+
+    def test_some_object(self):
+        with self.assertRaises(TypeError):
+            __unit__.merge_sorted(object())
+
+    def test_invalid_keyword(self):
+        with self.assertRaises(TypeError):
+            __unit__.merge_sorted(self.EVENS, foo=42)
+
+    def test_single_iterable(self):
+        merged = __unit__.merge_sorted(self.EVENS)
+
+        self._assertGenerator(merged)
+        self.assertEquals(self.EVENS, list(merged))
+
+    def test_multiple_iterables(self):
+        merged = __unit__.merge_sorted(
+            iter(self.TENS), self.ODDS, [], self.EVENS)
+        self.assertEquals(sorted(self.EVENS + self.ODDS + self.TENS),
+                          list(merged))
+
+    def test_key(self):
+        merged = __unit__.merge_sorted(["a", "ccc"], ["bb", "dddd"], key=len)
+        self.assertEquals(["a", "bb", "ccc", "dddd"], list(merged))
+
+    def test_key__stability(self):
+        merged = __unit__.merge_sorted(
+            [(1, 'a'), (2, 'a')], [(1, 'b'), (2, 'b')], key=itemgetter(0))
+        self.assertEquals([(1, 'a'), (1, 'b'), (2, 'a'), (2, 'b')],
+                          list(merged))
+
+    def test_reverse(self):
+        merged = __unit__.merge_sorted(
+            self.EVENS[::-1], self.ODDS[::-1], reverse=True)
+        self.assertEquals(sorted(self.EVENS + self.ODDS, reverse=True),
+                          list(merged))
+
+    def test_unorderable_elements(self):
+        # elements with equal keys are never compared
+        merged = __unit__.merge_sorted([{'x': 1}], [{'x': 1}],
+                                       key=itemgetter('x'))
+        self.assertEquals([{'x': 1}, {'x': 1}], list(merged))
+
+
+class ExternalSorted(_Algorithm):
+    ITERABLE = [(i * 7919) % 1000 for i in xrange(1000)]
+
+    def test_iterable__none(self):
+        with self.assertRaises(TypeError):
+            __unit__.external_sorted(None)
+
+    def test_key__non_function(self):
+        with self.assertRaises(TypeError):
+            __unit__.external_sorted(self.ITERABLE, key=object())
+
+    def test_max_memory__zero(self):
+        with self.assertRaises(ValueError):
+            __unit__.external_sorted(self.ITERABLE, max_memory=0)
+
+    def test_max_files__some_object(self):
+        with self.assertRaises(TypeError):
+            __unit__.external_sorted(self.ITERABLE, max_files=object())
+
+    def test_max_files__one(self):
+        with self.assertRaises(ValueError):
+            __unit__.external_sorted(self.ITERABLE, max_files=1)
+
+    def test_iterable__empty(self):
+        self.assertEmpty(__unit__.external_sorted(iter([])))
+
+    def test_iterable__fits_in_memory(self):
+        sorted_ = __unit__.external_sorted(iter(self.ITERABLE))
+
+        self._assertGenerator(sorted_)
+        self.assertEquals(sorted(self.ITERABLE), list(sorted_))
+
+    def test_iterable__spilled(self):
+        sorted_ = __unit__.external_sorted(
+            iter(self.ITERABLE), max_memory=100, sizeof=functions.one())
+        self.assertEquals(sorted(self.ITERABLE), list(sorted_))
+
+    def test_reverse__spilled(self):
+        sorted_ = __unit__.external_sorted(
+            iter(self.ITERABLE), reverse=True,
+            max_memory=100, sizeof=functions.one())
+        self.assertEquals(sorted(self.ITERABLE, reverse=True), list(sorted_))
+
+    def test_key__spilled__stability(self):
+        pairs = [(x % 10, i) for i, x in enumerate(self.ITERABLE)]
+        sorted_ = __unit__.external_sorted(
+            pairs, key=itemgetter(0), max_memory=64, sizeof=functions.one())
+        self.assertEquals(sorted(pairs, key=itemgetter(0)), list(sorted_))
+
+    def test_max_files__multiple_passes(self):
+        pairs = [(x % 10, i) for i, x in enumerate(self.ITERABLE)]
+        temp_dir = tempfile.mkdtemp()
+        try:
+            # 100 runs of 10 elements, merged 3 at a time
+            sorted_ = __unit__.external_sorted(
+                pairs, key=itemgetter(0), max_memory=10,
+                sizeof=functions.one(), dir=temp_dir, max_files=3)
+
+            self.assertEquals(sorted(pairs, key=itemgetter(0)), list(sorted_))
+            self.assertEmpty(os.listdir(temp_dir))
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_close__removes_files(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            sorted_ = __unit__.external_sorted(
+                iter(self.ITERABLE), max_memory=100, sizeof=functions.one(),
+                dir=temp_dir, max_files=3)
+
+            self.assertEquals(0, next(sorted_))
+            sorted_.close()
+            self.assertEmpty(os.listdir(temp_dir))
+        finally:
+            shutil.rmtree(temp_dir)
+
+
+class _Top(_Algorithm):
+    ITERABLE = [5, 3, 8, 1, 9, 2, 7]
+    Record = namedtuple('Record', ['name', 'score'])
+    RECORDS = [Record('a', 2), Record('b', 3), Record('c', 2),
+               Record('d', 1), Record('e', 3)]
+    SCORE_FUNC = attrgetter('score')
+
+    class Score(object):
+        """Score which is compared by its value alone,
+        so that NumPy arrays of them can have ties.
+        """
+        def __init__(self, record):
+            self.record = record
+
+        def __lt__(self, other):
+            return self.record.score < other.record.score
+
+        def __gt__(self, other):
+            return self.record.score > other.record.score
+
+        def __eq__(self, other):
+            return self.record.score == other.record.score
+
+        __hash__ = None
+
+    def _scores_ndarray(self):
+        array_ = numpy.empty(len(self.RECORDS), dtype=object)
+        array_[:] = list(map(self.Score, self.RECORDS))
+        return array_
+
+
+class Top(_Top):
+
+    def test_iterable__none(self):
+        with self.assertRaises(TypeError):
+            __unit__.top(None, 3)
+
+    def test_k__some_object(self):
+        with self.assertRaises(TypeError):
+            __unit__.top(self.ITERABLE, object())
+
+    def test_k__negative(self):
+        with self.assertRaises(ValueError):
+            __unit__.top(self.ITERABLE, -1)
+
+    def test_k__zero(self):
+        self.assertEmpty(__unit__.top(self.ITERABLE, 0))
+
+    def test_k__more_than_length(self):
+        self.assertEquals(sorted(self.ITERABLE, reverse=True),
+                          __unit__.top(iter(self.ITERABLE), 100))
+
+    def test_iterable__some(self):
+        self.assertEquals([9, 8, 7], __unit__.top(iter(self.ITERABLE), 3))
+
+    def test_reverse(self):
+        self.assertEquals([1, 2, 3],
+                          __unit__.top(self.ITERABLE, 3, reverse=True))
+
+    def test_key__ties(self):
+        result = __unit__.top(self.RECORDS, 3, key=self.SCORE_FUNC)
+        self.assertEquals(['b', 'e', 'a'], [r.name for r in result])
+
+    def test_iterable__large(self):
+        import random
+        iterable = [random.random() for _ in xrange(10000)]
+        self.assertEquals(sorted(iterable, reverse=True)[:10],
+                          __unit__.top(iterable, 10))
+
+    @skipIf(numpy is None, "requires NumPy")
+    def test_iterable__ndarray(self):
+        result = __unit__.top(numpy.array(self.ITERABLE), 3)
+        self.assertIsInstance(result, numpy.ndarray)
+        self.assertEquals([9, 8, 7], result.tolist())
+
+    @skipIf(numpy is None, "requires NumPy")
+    def test_iterable__ndarray__k_zero(self):
+        result = __unit__.top(numpy.array(self.ITERABLE), 0)
+        self.assertIsInstance(result, numpy.ndarray)
+        self.assertZero(len(result))
+
+    @skipIf(numpy is None, "requires NumPy")
+    def test_iterable__ndarray__nan(self):
+        result = __unit__.top(numpy.array([1.0, float('nan'), 2.0]), 2)
+        self.assertEquals(2, len(result))
+
+    @skipIf(numpy is None, "requires NumPy")
+    def test_iterable__ndarray__ties(self):
+        result = __unit__.top(self._scores_ndarray(), 3)
+        self.assertEquals(['b', 'e', 'a'], [s.record.name for s in result])
+
+
+class Bottom(_Top):
+
+    def test_iterable__none(self):
+        with self.assertRaises(TypeError):
+            __unit__.bottom(None, 3)
+
+    def test_k__zero(self):
+        self.assertEmpty(__unit__.bottom(self.ITERABLE, 0))
+
+    def test_iterable__some(self):
+        self.assertEquals([1, 2, 3], __unit__.bottom(iter(self.ITERABLE), 3))
+
+    def test_reverse(self):
+        self.assertEquals([9, 8, 7],
+                          __unit__.bottom(self.ITERABLE, 3, reverse=True))
+
+    def test_key__ties(self):
+        result = __unit__.bottom(self.RECORDS, 3, key=self.SCORE_FUNC)
+        self.assertEquals(['d', 'a', 'c'], [r.name for r in result])
+
+    @skipIf(numpy is None, "requires NumPy")
+    def test_iterable__ndarray(self):
+        result = __unit__.bottom(numpy.array(self.ITERABLE), 3)
+        self.assertIsInstance(result, numpy.ndarray)
+        self.assertEquals([1, 2, 3], result.tolist())
+
+    @skipIf(numpy is None, "requires NumPy")
+    def test_iterable__ndarray__k_zero(self):
+        result = __unit__.bottom(numpy.array(self.ITERABLE), 0)
+        self.assertZero(len(result))
+
+    @skipIf(numpy is None, "requires NumPy")
+    def test_iterable__ndarray__nan(self):
+        result = __unit__.bottom(numpy.array([1.0, float('nan'), 2.0]), 2)
+        self.assertEquals([1.0, 2.0], result.tolist())
+
+    @skipIf(numpy is None, "requires NumPy")
+    def test_iterable__ndarray__ties(self):
+        result = __unit__.bottom(self._scores_ndarray(), 3)
+        self.assertEquals(['d', 'a', 'c'], [s.record.name for s in result])
+
+    @skipIf(numpy is None, "requires NumPy")
+    def test_iterable__ndarray__k_more_than_length(self):
+        result = __unit__.bottom(numpy.array(self.ITERABLE), 100)
+        self.assertEquals(sorted(self.ITERABLE), result.tolist())
+
+
+# Concurrency
+
+class Pmap(_Algorithm):
+    LENGTH = 100
+    ITERABLE = list(xrange(LENGTH))
+    SQUARES = [x * x for x in ITERABLE]
+    SQUARE = staticmethod(lambda x: x * x)
+
+    def setUp(self):
+        if futures is not None:
+            self.executor = futures.ThreadPoolExecutor(max_workers=4)
+
+    def tearDown(self):
+        if futures is not None:
+            self.executor.shutdown()
+
+    def test_func__none(self):
+        with self.assertRaises(TypeError):
+            __unit__.pmap(None, self.ITERABLE)
+
+    def test_iterable__none(self):
+        with self.assertRaises(TypeError):
+            __unit__.pmap(self.SQUARE, None)
+
+    def test_chunksize__zero(self):
+        with self.assertRaises(ValueError):
+            __unit__.pmap(self.SQUARE, self.ITERABLE, chunksize=0)
+
+    def test_max_in_flight__some_object(self):
+        with self.assertRaises(TypeError):
+            __unit__.pmap(self.SQUARE, self.ITERABLE, max_in_flight=object())
+
+    def test_executor__none(self):
+        mapped = __unit__.pmap(self.SQUARE, self.ITERABLE)
+
+        self._assertGenerator(mapped)
+        self.assertEquals(self.SQUARES, list(mapped))
+
+    @skipIf(futures is None, "requires concurrent.futures")
+    def test_ordered(self):
+        mapped = __unit__.pmap(self.SQUARE, self.ITERABLE, self.executor,
+                               chunksize=7, max_in_flight=3)
+
+        self._assertGenerator(mapped)
+        self.assertEquals(self.SQUARES, list(mapped))
+
+    @skipIf(futures is None, "requires concurrent.futures")
+    def test_unordered(self):
+        mapped = __unit__.pmap(self.SQUARE, self.ITERABLE, self.executor,
+                               chunksize=7, ordered=False, max_in_flight=3)
+
+        self._assertGenerator(mapped)
+        self.assertItemsEqual(self.SQUARES, list(mapped))
+
+    @skipIf(futures is None, "requires concurrent.futures")
+    def test_iterable__infinite(self):
+        consumed = [0]
+
+        def naturals():
+            while True:
+                consumed[0] += 1
+                yield consumed[0]
+
+        mapped = __unit__.pmap(self.SQUARE, naturals(), self.executor,
+                               chunksize=10, max_in_flight=2)
+        self.assertEquals([1, 4, 9], list(islice(mapped, 3)))
+        self.assertLessEqual(consumed[0], 10 * 3 + 1)
+        mapped.close()
+
+    @skipIf(futures is None, "requires concurrent.futures")
+    def test_func__exception(self):
+        def fail(x):
+            if x == self.LENGTH // 2:
+                raise RuntimeError()
+            return x
+
+        mapped = __unit__.pmap(fail, self.ITERABLE, self.executor)
+        with self.assertRaises(RuntimeError):
+            list(mapped)
+
+
+# Traversal
+
+class _Traversal(_Algorithm):
+    Node = namedtuple('Node', ['value', 'children'])
+    CHILDREN_FUNC = attr_func('children')
+
+    def _create_node(self, value=None, children=None):
+        return self.Node(value=value, children=list(children or []))
+
+    def _create_path(self, length, start=0):
+        if length > 0:
+            node = self._create_node(start + length - 1)
+            for i in range(start + length - 2, start - 1, -1):
+                node = self._create_node(i, [node])
+            return node
+
+
+    def _create_cycle(self, length):
+        nodes = [self._create_node(i) for i in range(length)]
+        for node, next_node in zip(nodes, nodes[1:] + nodes[:1]):
+            node.children.append(next_node)
+        return nodes[0]
+
+    def _create_diamond(self):
+        bottom = self._create_node(3)
+        left = self._create_node(1, [bottom])
+        right = self._create_node(2, [bottom])
+        return self._create_node(0, [left, right])
+
+
+class BreadthFirst(_Traversal):
+
+    def test_start__none(self):
+        bfs = __unit__.breadth_first(None, expand=functions.empty())
+        self.assertItemsEqual([None], bfs)
+
+    def test_start__some_object(self):
+        obj = object()
+        bfs = __unit__.breadth_first(obj, expand=functions.empty())
+        self.assertItemsEqual([obj], bfs)
+
+    def test_start__single_node(self):
+        node = self._create_node()
+        self.assertItemsEqual(
+            [node], __unit__.breadth_first(node, self.CHILDREN_FUNC))
+
+    def test_start__path(self):
+        graph = self._create_path(10)
+        bfs = __unit__.breadth_first(graph, self.CHILDREN_FUNC)
+        for i, node in enumerate(bfs, 0):
+            self.assertEquals(i, node.value)
+
+    def test_start__flat_graph(self):
+        nodes = list(map(self._create_node, range(1, 5 + 1)))
+        graph = self._create_node(0, nodes)
+
+        bfs = __unit__.breadth_first(graph, self.CHILDREN_FUNC)
+        for i, node in enumerate(bfs, 0):
+            self.assertEquals(i, node.value)
+
+    def test_expand__none(self):
+        with self.assertRaises(TypeError):
+            __unit__.breadth_first(self._create_node(), expand=None)
+
+    def test_expand__some_object(self):
+        with self.assertRaises(TypeError):
+            __unit__.breadth_first(self._create_node(), expand=object())
+
+    def test_visited__cycle(self):
+        graph = self._create_cycle(5)
+        bfs = __unit__.breadth_first(graph, self.CHILDREN_FUNC, visited=True)
+        self.assertEquals(list(range(5)), [node.value for node in bfs])
+
+    def test_visited__diamond(self):
+        graph = self._create_diamond()
+        expanded = []
+        expand = lambda node: expanded.append(node) or node.children
+
+        bfs = __unit__.breadth_first(graph, expand, visited=True)
+        self.assertEquals([0, 1, 2, 3], [node.value for node in bfs])
+        self.assertEquals(4, len(expanded))
+
+    def test_key__implies_visited(self):
+        graph = self._create_cycle(5)
+        bfs = __unit__.breadth_first(graph, self.CHILDREN_FUNC,
+                                     key=attr_func('value'))
+        self.assertEquals(list(range(5)), [node.value for node in bfs])
+
+    def test_key__non_function(self):
+        with self.assertRaises(TypeError):
+            __unit__.breadth_first(
+                self._create_node(), self.CHILDREN_FUNC, key=object())
+
+    def test_max_depth__negative(self):
+        with self.assertRaises(ValueError):
+            __unit__.breadth_first(
+                self._create_node(), self.CHILDREN_FUNC, max_depth=-1)
+
+    def test_max_depth__cycle(self):
+        graph = self._create_cycle(3)
+        bfs = __unit__.breadth_first(graph, self.CHILDREN_FUNC, max_depth=4)
+        self.assertEquals([0, 1, 2, 0, 1], [node.value for node in bfs])
+
+    def test_annotated(self):
+        graph = self._create_diamond()
+        bfs = __unit__.breadth_first(graph, self.CHILDREN_FUNC,
+                                     visited=True, annotated=True)
+
+        triples = [(node.value, depth, parent and parent.value)
+                   for node, depth, parent in bfs]
+        self.assertEquals([(0, 0, None), (1, 1, 0), (2, 1, 0), (3, 2, 1)],
+                          triples)
+
+    @skipIf(futures is None, "requires concurrent.futures")
+    def test_executor__same_order(self):
+        leaves = [self._create_node(i) for i in range(3, 7)]
+        graph = self._create_node(0, [self._create_node(1, leaves[:2]),
+                                      self._create_node(2, leaves[2:])])
+        expand = lambda node: (child for child in node.children)
+
+        with futures.ThreadPoolExecutor(max_workers=4) as executor:
+            bfs = __unit__.breadth_first(graph, expand, executor=executor)
+            self.assertEquals(list(range(7)), [node.value for node in bfs])
+
+    @skipIf(futures is None, "requires concurrent.futures")
+    def test_executor__with_options(self):
+        graph = self._create_cycle(5)
+        with futures.ThreadPoolExecutor(max_workers=4) as executor:
+            bfs = __unit__.breadth_first(
+                graph, self.CHILDREN_FUNC, visited=True, max_depth=3,
+                annotated=True, executor=executor)
+            self.assertEquals(
+                [(0, 0), (1, 1), (2, 2), (3, 3)],
+                [(node.value, depth) for node, depth, _ in bfs])
+
+    @skipIf(futures is None, "requires concurrent.futures")
+    def test_executor__exception(self):
+        def expand(node):
+            raise RuntimeError()
+
+        with futures.ThreadPoolExecutor(max_workers=4) as executor:
+            bfs = __unit__.breadth_first(
+                self._create_node(), expand, executor=executor)
+            with self.assertRaises(RuntimeError):
+                list(bfs)
+
+
+class DepthFirst(_Traversal):
+
+    def test_start__none(self):
+        dfs = __unit__.depth_first(None, descend=functions.empty())
+        self.assertItemsEqual([None], dfs)
+
+    def test_start__some_object(self):
+        obj = object()
+        dfs = __unit__.depth_first(obj, descend=functions.empty())
+        self.assertItemsEqual([obj], dfs)
+
+    def test_start__single_node(self):
+        node = self._create_node()
+        self.assertItemsEqual(
+            [node], __unit__.depth_first(node, self.CHILDREN_FUNC))
+
+    def test_start__path(self):
+        graph = self._create_path(10)
+        dfs = __unit__.depth_first(graph, self.CHILDREN_FUNC)
+        for i, node in enumerate(dfs, 0):
+            self.assertEquals(i, node.value)
+
+    def test_start__flat_graph(self):
+        child_values = range(1, 5 + 1)
+        nodes = list(map(self._create_node, child_values))
+        graph = self._create_node(0, nodes)
+
+        dfs = __unit__.depth_first(graph, self.CHILDREN_FUNC)
+        expected_values_order = [0] + list(reversed(child_values))
+        for i, node in zip(expected_values_order, dfs):
+            self.assertEquals(i, node.value)
+
+    def test_descend__none(self):
+        with self.assertRaises(TypeError):
+            __unit__.depth_first(self._create_node(), descend=None)
+
+    def test_descend__some_object(self):
+        with self.assertRaises(TypeError):
+            __unit__.depth_first(self._create_node(), descend=object())
+
+    def test_visited__cycle(self):
+        graph = self._create_cycle(5)
+        dfs = __unit__.depth_first(graph, self.CHILDREN_FUNC, visited=True)
+        self.assertEquals(list(range(5)), [node.value for node in dfs])
+
+    def test_visited__diamond(self):
+        graph = self._create_diamond()
+        expanded = []
+        descend = lambda node: expanded.append(node) or node.children
+
+        dfs = __unit__.depth_first(graph, descend, visited=True)
+        self.assertEquals([0, 2, 3, 1], [node.value for node in dfs])
+        self.assertEquals(4, len(expanded))
+
+    def test_key__non_function(self):
+        with self.assertRaises(TypeError):
+            __unit__.depth_first(
+                self._create_node(), self.CHILDREN_FUNC, key=object())
+
+    def test_max_depth__none(self):
+        with self.assertRaises(TypeError):
+            __unit__.depth_first(
+                self._create_node(), self.CHILDREN_FUNC, max_depth=object())
+
+    def test_max_depth__path(self):
+        graph = self._create_path(10)
+        dfs = __unit__.depth_first(graph, self.CHILDREN_FUNC, max_depth=3)
+        self.assertEquals([0, 1, 2, 3], [node.value for node in dfs])
+
+    def test_annotated(self):
+        graph = self._create_diamond()
+        dfs = __unit__.depth_first(graph, self.CHILDREN_FUNC,
+                                   visited=True, annotated=True)
+
+        triples = [(node.value, depth, parent and parent.value)
+                   for node, depth, parent in dfs]
+        self.assertEquals([(0, 0, None), (2, 1, 0), (3, 2, 2), (1, 1, 0)],
+                          triples)
+
+
+class IterativeDeepening(_Traversal):
+
+    def test_start__single_node(self):
+        node = self._create_node()
+        self.assertItemsEqual(
+            [node], __unit__.iterative_deepening(node, self.CHILDREN_FUNC))
+
+    def test_start__path(self):
+        graph = self._create_path(10)
+        iddfs = __unit__.iterative_deepening(graph, self.CHILDREN_FUNC)
+        self.assertEquals(list(range(10)), [node.value for node in iddfs])
+
+    def test_start__tree(self):
+        leaves = [self._create_node(i) for i in range(3, 7)]
+        graph = self._create_node(0, [self._create_node(1, leaves[:2]),
+                                      self._create_node(2, leaves[2:])])
+
+        iddfs = __unit__.iterative_deepening(graph, self.CHILDREN_FUNC)
+        bfs = __unit__.breadth_first(graph, self.CHILDREN_FUNC)
+        self.assertEquals(list(bfs), list(iddfs))
+
+    def test_expand__some_object(self):
+        with self.assertRaises(TypeError):
+            __unit__.iterative_deepening(self._create_node(), object())
+
+    def test_max_depth__cycle(self):
+        graph = self._create_cycle(3)
+        iddfs = __unit__.iterative_deepening(
+            graph, self.CHILDREN_FUNC, max_depth=4)
+        self.assertEquals([0, 1, 2, 0, 1], [node.value for node in iddfs])
+
+    def test_annotated(self):
+        graph = self._create_diamond()
+        iddfs = __unit__.iterative_deepening(
+            graph, self.CHILDREN_FUNC, annotated=True)
+
+        triples = [(node.value, depth, parent and parent.value)
+                   for node, depth, parent in iddfs]
+        self.assertEquals(
+            [(0, 0, None), (1, 1, 0), (2, 1, 0), (3, 2, 1), (3, 2, 2)],
+            triples)
+
+
+class ShortestPath(_Algorithm):
+    #: Weighted graph as a dictionary of adjacency lists
+    GRAPH = {
+        'a': [('b', 7), ('c', 9), ('f', 14)],
+        'b': [('a', 7), ('c', 10), ('d', 15)],
+        'c': [('a', 9), ('b', 10), ('d', 11), ('f', 2)],
+        'd': [('b', 15), ('c', 11), ('e', 6)],
+        'e': [('d', 6), ('f', 9)],
+        'f': [('a', 14), ('c', 2), ('e', 9)],
+        'z': [],
+    }
+    EXPAND = staticmethod(lambda node: ShortestPath.GRAPH[node])
+
+    def _grid_expand(self, width, height):
+        def expand(cell):
+            x, y = cell
+            for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+                if 0 <= x + dx < width and 0 <= y + dy < height:
+                    yield (x + dx, y + dy), 1
+        return expand
+
+    def test_expand__none(self):
+        with self.assertRaises(TypeError):
+            __unit__.shortest_path('a', 'e', None)
+
+    def test_heuristic__some_object(self):
+        with self.assertRaises(TypeError):
+            __unit__.shortest_path('a', 'e', self.EXPAND, heuristic=object())
+
+    def test_start_is_goal(self):
+        self.assertEquals(
+            (0, ['a']), __unit__.shortest_path('a', 'a', self.EXPAND))
+
+    def test_path(self):
+        self.assertEquals((20, ['a', 'c', 'f', 'e']),
+                          __unit__.shortest_path('a', 'e', self.EXPAND))
+
+    def test_unreachable(self):
+        self.assertIsNone(__unit__.shortest_path('a', 'z', self.EXPAND))
+
+    def test_negative_weight(self):
+        expand = lambda node: [('b', -1)] if node == 'a' else []
+        with self.assertRaises(ValueError):
+            __unit__.shortest_path('a', 'b', expand)
+
+    def test_early_exit(self):
+        expanded = []
+        expand = self._grid_expand(100, 100)
+
+        def recording_expand(cell):
+            expanded.append(cell)
+            return expand(cell)
+
+        distance, path = __unit__.shortest_path(
+            (0, 0), (0, 2), recording_expand)
+        self.assertEquals(2, distance)
+        self.assertEquals([(0, 0), (0, 1), (0, 2)], path)
+        self.assertLess(len(expanded), 20)
+
+    def test_heuristic__grid(self):
+        goal = (9, 9)
+        manhattan = lambda cell: sum(abs(g - c) for g, c in zip(goal, cell))
+
+        distance, path = __unit__.shortest_path(
+            (0, 0), goal, self._grid_expand(10, 10), heuristic=manhattan)
+        self.assertEquals(18, distance)
+        self.assertEquals(19, len(path))
+
+    def test_key(self):
+        Place = namedtuple('Place', ['name', 'roads'])
+        places = dict((name, Place(name, roads))
+                      for name, roads in dicts.iteritems(self.GRAPH))
+        expand = lambda place: [(places[name], weight)
+                                for name, weight in place.roads]
+
+        distance, path = __unit__.shortest_path(
+            places['a'], places['e'], expand, key=attr_func('name'))
+        self.assertEquals(20, distance)
+        self.assertEquals(['a', 'c', 'f', 'e'], [p.name for p in path])
+
+
+class BidirectionalSearch(_Algorithm):
+    #: Directed graph as a dictionary of adjacency lists
+    GRAPH = {
+        'a': ['b', 'c'],
+        'b': ['d'],
+        'c': ['d', 'e'],
+        'd': ['f'],
+        'e': ['f', 'g'],
+        'f': ['h'],
+        'g': [],
+        'h': ['a'],
+        'z': ['a'],
+    }
+
+    def setUp(self):
+        reverse = {}
+        for node, children in dicts.iteritems(self.GRAPH):
+            for child in children:
+                reverse.setdefault(child, []).append(node)
+
+        self.expand = lambda node: self.GRAPH[node]
+        self.expand_reverse = lambda node: reverse.get(node, [])
+
+    def _search(self, start, goal):
+        return __unit__.bidirectional_search(
+            start, goal, self.expand, self.expand_reverse)
+
+    def test_expand__none(self):
+        with self.assertRaises(TypeError):
+            __unit__.bidirectional_search('a', 'h', None, self.expand_reverse)
+
+    def test_expand_reverse__none(self):
+        with self.assertRaises(TypeError):
+            __unit__.bidirectional_search('a', 'h', self.expand, None)
+
+    def test_start_is_goal(self):
+        self.assertEquals(['a'], self._search('a', 'a'))
+
+    def test_adjacent(self):
+        self.assertEquals(['a', 'b'], self._search('a', 'b'))
+
+    def test_path(self):
+        path = self._search('a', 'h')
+        self.assertEquals(5, len(path))
+        self.assertEquals(['a', 'h'], [path[0], path[-1]])
+        self._assertPath(path)
+
+    def test_cycle(self):
+        path = self._search('h', 'g')
+        self.assertEquals(['h', 'a', 'c', 'e', 'g'], path)
+
+    def test_unreachable(self):
+        self.assertIsNone(self._search('a', 'z'))
+        self.assertIsNone(self._search('g', 'a'))
+
+    def test_long_chain(self):
+        length = 1000
+        expand = lambda n: [n + 1] if n < length else []
+        expand_reverse = lambda n: [n - 1] if n > 0 else []
+
+        path = __unit__.bidirectional_search(0, length, expand, expand_reverse)
+        self.assertEquals(list(xrange(length + 1)), path)
+
+    def _assertPath(self, path):
+        for node, next_node in zip(path, path[1:]):
+            self.assertIn(next_node, self.GRAPH[node])
+
+
+class _DependencyGraph(TestCase):
+    class Item(object):
+        """Simple class of items/nodes with dependencies that can be sorted."""
+
+        def __init__(self, name, deps=None):
+            self.name = name
+            self.deps = list(deps or ())
+
+        def __repr__(self):
+            if not self.deps:
+                return "Item(%s)" % (self.name,)
+            return "Item(%s, [<%s dep(s)>])" % (self.name, len(self.deps))
+
+    INCOMING_FUNC = attr_func('deps')
+
+    # Data and utility functions
+
+    NO_DEPS_ITEMS = list(map(Item, ("alice", "amy", "alex")))
+    FIRST_GEN_ITEMS = [Item("bob", deps=("alice",)),
+                       Item("barry", deps=("amy",)),
+                       Item("bart", deps=("alice", "alex"))]
+
+    CIRCULAR_DEPS_ITEMS = [Item("a", deps=("b",)),
+                           Item("b", deps=("a",))]
+
+    def _resolve(self, items):
+        """Turn textual references to items into actual objects.
+
+        Must be called on any of the above test data before passing it
+        to the tested :func:`topological_order` function.
+        Returns new item objects, leaving the test data intact.
+        """
+        item_dict = dict((item.name, self.Item(item.name, item.deps))
+                         for item in items)
+
+        result = []
+        for item in dicts.itervalues(item_dict):
+            item.deps = list(map(item_dict.get, item.deps))
+            result.append(item)
+        return result
+
+    def _assertDependenciesSatisfied(self, sorted_items):
+        """Check that every item has its dependencies satisfied
+        by the items that preceed it.
+        """
+        for i, item in enumerate(sorted_items):
+            for dep in item.deps:
+                self.assertIn(dep, sorted_items[:i])
+
+
+class TopologicalOrder(_DependencyGraph):
+
+    def test_nodes__none(self):
+        with self.assertRaises(TypeError):
+            __unit__.topological_order(None, self.INCOMING_FUNC)
+
+    def test_nodes__some_object(self):
+        with self.assertRaises(TypeError):
+            __unit__.topological_order(object(), self.INCOMING_FUNC)
+
+    def test_nodes__empty(self):
+        toposorted = __unit__.topological_order((), self.INCOMING_FUNC)
+        self.assertEmpty(toposorted)
+
+    def test_nodes__single__no_incoming(self):
+        for item in self._resolve(self.NO_DEPS_ITEMS):
+            self.assertItemsEqual(
+                [item],
+                __unit__.topological_order([item], self.INCOMING_FUNC))
+
+    def test_nodes__multiple__no_incoming(self):
+        items = self._resolve(self.NO_DEPS_ITEMS)
+        self.assertItemsEqual(
+            items, __unit__.topological_order(items, self.INCOMING_FUNC))
+
+    def test_nodes__multiple__with_deps(self):
+        items = self._resolve(self.NO_DEPS_ITEMS + self.FIRST_GEN_ITEMS)
+        sorted_items = list(__unit__.topological_order(items,
+                                                       self.INCOMING_FUNC))
+        self._assertDependenciesSatisfied(sorted_items)
+
+    def test_nodes__circular_deps(self):
+        with self.assertRaises(ValueError):  # TODO(xion): more specific error
+            sort_generator =__unit__.topological_order(
+                self._resolve(self.CIRCULAR_DEPS_ITEMS), self.INCOMING_FUNC)
+            for _ in sort_generator:
+                pass
+
+    def test_nodes__circular_deps__cycle_reported(self):
+        items = self._resolve(self.CIRCULAR_DEPS_ITEMS)
+        with self.assertRaises(__unit__.CycleError) as r:
+            list(__unit__.topological_order(items, self.INCOMING_FUNC))
+
+        cycle = r.exception.cycle
+        self.assertIs(cycle[0], cycle[-1])
+        self.assertItemsEqual(items, cycle[:-1])
+        for dep, item in zip(cycle, cycle[1:]):
+            self.assertIn(dep, item.deps)
+
+    def test_nodes__self_dependency(self):
+        item = self.Item("narcissus")
+        item.deps = [item]
+        with self.assertRaises(__unit__.CycleError) as r:
+            list(__unit__.topological_order([item], self.INCOMING_FUNC))
+        self.assertEquals([item, item], r.exception.cycle)
+
+    def test_nodes__generator(self):
+        items = self._resolve(self.NO_DEPS_ITEMS + self.FIRST_GEN_ITEMS)
+        self.assertItemsEqual(
+            items,
+            __unit__.topological_order(iter(items), self.INCOMING_FUNC))
+
+    def test_nodes__deps_outside_of_nodes(self):
+        items = self._resolve(self.NO_DEPS_ITEMS + self.FIRST_GEN_ITEMS)
+        bob = next(item for item in items if item.name == "bob")
+
+        sorted_items = list(
+            __unit__.topological_order([bob], self.INCOMING_FUNC))
+        self.assertEquals(bob.deps + [bob], sorted_items)
+
+    def test_nodes__long_chain(self):
+        length = 10000  # well over the default recursion limit
+        items = [self.Item(i) for i in xrange(length)]
+        for dep, item in zip(items, items[1:]):
+            item.deps.append(dep)
+
+        sorted_items = list(
+            __unit__.topological_order(reversed(items), self.INCOMING_FUNC))
+        self.assertEquals(items, sorted_items)
+
+    def test_key__non_function(self):
+        with self.assertRaises(TypeError):
+            __unit__.topological_order((), self.INCOMING_FUNC, key=object())
+
+    def test_key__custom(self):
+        # dependencies given by name are resolved through ``key``
+        items = dict((item.name, self.Item(item.name, item.deps))
+                     for item in self.NO_DEPS_ITEMS + self.FIRST_GEN_ITEMS)
+        incoming = lambda item: [items[name] for name in item.deps]
+
+        sorted_names = [item.name for item in __unit__.topological_order(
+            dicts.itervalues(items), incoming, key=attr_func('name'))]
+
+        self.assertItemsEqual(items, sorted_names)
+        for i, name in enumerate(sorted_names):
+            for dep in items[name].deps:
+                self.assertIn(dep, sorted_names[:i])
+
+
+class TopologicalLayers(_DependencyGraph):
+
+    def test_nodes__none(self):
+        with self.assertRaises(TypeError):
+            __unit__.topological_layers(None, self.INCOMING_FUNC)
+
+    def test_nodes__empty(self):
+        self.assertEmpty(
+            __unit__.topological_layers((), self.INCOMING_FUNC))
+
+    def test_incoming__non_function(self):
+        with self.assertRaises(TypeError):
+            __unit__.topological_layers((), object())
+
+    def test_nodes__multiple__no_incoming(self):
+        items = self._resolve(self.NO_DEPS_ITEMS)
+        layers = list(__unit__.topological_layers(items, self.INCOMING_FUNC))
+
+        self.assertEquals(1, len(layers))
+        self.assertItemsEqual(items, layers[0])
+
+    def test_nodes__multiple__with_deps(self):
+        items = self._resolve(self.NO_DEPS_ITEMS + self.FIRST_GEN_ITEMS)
+        layers = list(__unit__.topological_layers(items, self.INCOMING_FUNC))
+
+        self.assertEquals(2, len(layers))
+        self.assertItemsEqual(
+            [item.name for item in self.NO_DEPS_ITEMS],
+            [item.name for item in layers[0]])
+        self.assertItemsEqual(
+            [item.name for item in self.FIRST_GEN_ITEMS],
+            [item.name for item in layers[1]])
+
+    def test_nodes__circular_deps(self):
+        with self.assertRaises(__unit__.CycleError):
+            list(__unit__.topological_layers(
+                self._resolve(self.CIRCULAR_DEPS_ITEMS), self.INCOMING_FUNC))
+
+
+class RunInDependencyOrder(_DependencyGraph):
+
+    def test_nodes__none(self):
+        with self.assertRaises(TypeError):
+            __unit__.run_in_dependency_order(
+                None, self.INCOMING_FUNC, functions.identity())
+
+    def test_func__non_function(self):
+        with self.assertRaises(TypeError):
+            __unit__.run_in_dependency_order((), self.INCOMING_FUNC, object())
+
+    def test_nodes__empty(self):
+        self.assertEmpty(__unit__.run_in_dependency_order(
+            (), self.INCOMING_FUNC, functions.identity()))
+
+    def test_executor__none(self):
+        items = self._resolve(self.NO_DEPS_ITEMS + self.FIRST_GEN_ITEMS)
+        processed = []
+
+        results = __unit__.run_in_dependency_order(
+            items, self.INCOMING_FUNC, processed.append)
+
+        self.assertItemsEqual(items, [item for item, _ in results])
+        self._assertDependenciesSatisfied(processed)
+
+    @skipIf(futures is None, "requires concurrent.futures")
+    def test_executor__thread_pool(self):
+        items = self._resolve(self.NO_DEPS_ITEMS + self.FIRST_GEN_ITEMS)
+        processed = []
+        name_length = lambda item: processed.append(item) or len(item.name)
+
+        with futures.ThreadPoolExecutor(max_workers=4) as executor:
+            results = __unit__.run_in_dependency_order(
+                items, self.INCOMING_FUNC, name_length, executor=executor)
+
+        self.assertItemsEqual(
+            [(item, len(item.name)) for item in items], results)
+        self._assertDependenciesSatisfied(processed)
+
+    @skipIf(futures is None, "requires concurrent.futures")
+    def test_executor__exception(self):
+        items = self._resolve(self.NO_DEPS_ITEMS + self.FIRST_GEN_ITEMS)
+
+        def fail(item):
+            raise RuntimeError(item.name)
+
+        with futures.ThreadPoolExecutor(max_workers=4) as executor:
+            with self.assertRaises(RuntimeError):
+                __unit__.run_in_dependency_order(
+                    items, self.INCOMING_FUNC, fail, executor=executor)
+
+    def test_nodes__circular_deps(self):
+        processed = []
+        with self.assertRaises(__unit__.CycleError):
+            __unit__.run_in_dependency_order(
+                self._resolve(self.NO_DEPS_ITEMS + self.CIRCULAR_DEPS_ITEMS),
+                self.INCOMING_FUNC, processed.append)
+        self.assertEmpty(processed)
+
+
+class CriticalPath(_DependencyGraph):
+    #: Build steps with edges a -> b -> d, a -> c -> d, and an isolated e
+    ITEMS = [_DependencyGraph.Item("a"),
+             _DependencyGraph.Item("b", deps=("a",)),
+             _DependencyGraph.Item("c", deps=("a",)),
+             _DependencyGraph.Item("d", deps=("b", "c")),
+             _DependencyGraph.Item("e")]
+    DURATIONS = {"a": 2, "b": 5, "c": 1, "d": 3, "e": 4}
+
+    @staticmethod
+    def DURATION_FUNC(item):
+        return CriticalPath.DURATIONS[item.name]
+
+    def test_nodes__none(self):
+        with self.assertRaises(TypeError):
+            __unit__.critical_path(
+                None, self.INCOMING_FUNC, self.DURATION_FUNC)
+
+    def test_duration__some_object(self):
+        with self.assertRaises(TypeError):
+            __unit__.critical_path((), self.INCOMING_FUNC, object())
+
+    def test_nodes__empty(self):
+        self.assertEquals(
+            (0, [], []),
+            __unit__.critical_path((), self.INCOMING_FUNC, self.DURATION_FUNC))
+
+    def test_nodes__cycle(self):
+        items = self._resolve(self.CIRCULAR_DEPS_ITEMS)
+        with self.assertRaises(__unit__.CycleError):
+            __unit__.critical_path(
+                items, self.INCOMING_FUNC, self.DURATION_FUNC)
+
+    def test_length_and_path(self):
+        items = self._resolve(self.ITEMS)
+        length, path, _ = __unit__.critical_path(
+            items, self.INCOMING_FUNC, self.DURATION_FUNC)
+
+        self.assertEquals(10, length)
+        self.assertEquals(["a", "b", "d"], [item.name for item in path])
+
+    def test_schedule(self):
+        items = self._resolve(self.ITEMS)
+        _, _, schedule = __unit__.critical_path(
+            items, self.INCOMING_FUNC, self.DURATION_FUNC)
+
+        self._assertDependenciesSatisfied([entry[0] for entry in schedule])
+        self.assertItemsEqual([("a", 0, 0, 0),
+                               ("b", 2, 2, 0),
+                               ("c", 2, 6, 4),
+                               ("d", 7, 7, 0),
+                               ("e", 0, 6, 6)],
+                              [(item.name, earliest, latest, slack)
+                               for item, earliest, latest, slack in schedule])
+
+
+class StronglyConnectedComponents(_DependencyGraph):
+    #: Graph with two cycles (a <-> b, c -> d -> e -> c), a self-dependency
+    #: (f), and edges b -> c and e -> f between them
+    CYCLIC_ITEMS = [_DependencyGraph.Item("a", deps=("b",)),
+                    _DependencyGraph.Item("b", deps=("a",)),
+                    _DependencyGraph.Item("c", deps=("b", "e")),
+                    _DependencyGraph.Item("d", deps=("c",)),
+                    _DependencyGraph.Item("e", deps=("d",)),
+                    _DependencyGraph.Item("f", deps=("e", "f")),
+                    _DependencyGraph.Item("g", deps=("f",))]
+
+    def _names(self, components):
+        return [sorted(item.name for item in component)
+                for component in components]
+
+    def test_nodes__none(self):
+        with self.assertRaises(TypeError):
+            __unit__.strongly_connected_components(None, self.INCOMING_FUNC)
+
+    def test_incoming__some_object(self):
+        with self.assertRaises(TypeError):
+            __unit__.strongly_connected_components((), object())
+
+    def test_nodes__empty(self):
+        self.assertEmpty(
+            __unit__.strongly_connected_components((), self.INCOMING_FUNC))
+
+    def test_nodes__acyclic(self):
+        items = self._resolve(self.NO_DEPS_ITEMS + self.FIRST_GEN_ITEMS)
+        components = __unit__.strongly_connected_components(
+            items, self.INCOMING_FUNC)
+
+        self.assertEquals(len(items), len(components))
+        self.assertAll(lambda c: len(c) == 1, components)
+        self._assertDependenciesSatisfied([c[0] for c in components])
+
+    def test_nodes__cyclic(self):
+        items = self._resolve(self.CYCLIC_ITEMS)
+        components = __unit__.strongly_connected_components(
+            items, self.INCOMING_FUNC)
+
+        self.assertEquals(
+            [['a', 'b'], ['c', 'd', 'e'], ['f'], ['g']],
+            self._names(components))
+
+    def test_nodes__long_cycle(self):
+        length = 10000  # well over the default recursion limit
+        items = [self.Item(i) for i in xrange(length)]
+        for dep, item in zip(items, items[1:] + items[:1]):
+            item.deps.append(dep)
+
+        components = __unit__.strongly_connected_components(
+            items, self.INCOMING_FUNC)
+        self.assertEquals(1, len(components))
+        self.assertItemsEqual(items, components[0])
+
+    def test_condensation(self):
+        items = self._resolve(self.CYCLIC_ITEMS)
+        components, incoming = __unit__.strongly_connected_components(
+            items, self.INCOMING_FUNC, condensation=True)
+
+        self.assertEquals(4, len(components))
+        self.assertEquals([set(), set([0]), set([1]), set([2])], incoming)
+
+
+# Compiled graphs
+
+class CompileGraph(_Traversal):
+
+    def _create_tree(self):
+        leaves = [self._create_node(i) for i in range(3, 7)]
+        return self._create_node(0, [self._create_node(1, leaves[:2]),
+                                     self._create_node(2, leaves[2:])])
+
+    def test_nodes__none(self):
+        with self.assertRaises(TypeError):
+            __unit__.compile_graph(None, self.CHILDREN_FUNC)
+
+    def test_expand__some_object(self):
+        with self.assertRaises(TypeError):
+            __unit__.compile_graph([self._create_node()], object())
+
+    def test_nodes__empty(self):
+        graph = __unit__.compile_graph([], self.CHILDREN_FUNC)
+        self.assertZero(len(graph))
+        self.assertZero(graph.edge_count)
+
+    def test_tree(self):
+        tree = self._create_tree()
+        graph = __unit__.compile_graph([tree], self.CHILDREN_FUNC)
+
+        self.assertEquals(7, len(graph))
+        self.assertEquals(6, graph.edge_count)
+        self.assertEquals(
+            [1, 2], [graph.nodes[i].value
+                     for i in graph.children(graph.id_of(tree))])
+
+    def test_expand_called_once_per_node(self):
+        graph_start = self._create_diamond()
+        expanded = []
+        expand = lambda node: expanded.append(node) or node.children
+
+        __unit__.compile_graph([graph_start], expand)
+        self.assertEquals(4, len(expanded))
+
+    def test_id_of__missing_node(self):
+        graph = __unit__.compile_graph([self._create_node()],
+                                       self.CHILDREN_FUNC)
+        with self.assertRaises(KeyError):
+            graph.id_of(self._create_node())
+
+    def test_breadth_first(self):
+        tree = self._create_tree()
+        graph = __unit__.compile_graph([tree], self.CHILDREN_FUNC)
+
+        bfs = __unit__.breadth_first(tree, self.CHILDREN_FUNC)
+        self.assertEquals(list(bfs), list(graph.breadth_first(tree)))
+
+    def test_breadth_first__cycle__max_depth(self):
+        start = self._create_cycle(5)
+        graph = __unit__.compile_graph([start], self.CHILDREN_FUNC)
+
+        self.assertEquals(list(range(5)),
+                          [node.value for node in graph.breadth_first(start)])
+        self.assertEquals([0, 1], [node.value for node
+                                   in graph.breadth_first(start, max_depth=1)])
+
+    def test_depth_first(self):
+        start = self._create_diamond()
+        graph = __unit__.compile_graph([start], self.CHILDREN_FUNC)
+        self.assertEquals(
+            list(__unit__.depth_first(start, self.CHILDREN_FUNC,
+                                      visited=True)),
+            list(graph.depth_first(start)))
+
+    def test_depth_first__ids(self):
+        start = self._create_diamond()
+        graph = __unit__.compile_graph([start], self.CHILDREN_FUNC)
+        self.assertEquals(
+            [0, 2, 3, 1],
+            [graph.nodes[i].value for i in graph.depth_first(start, ids=True)])
+
+    def test_topological_order(self):
+        start = self._create_diamond()
+        graph = __unit__.compile_graph([start], self.CHILDREN_FUNC)
+
+        ordered = [node.value for node in graph.topological_order()]
+        self.assertEquals(0, ordered[0])
+        self.assertEquals(3, ordered[-1])
+
+    def test_topological_order__cycle(self):
+        start = self._create_cycle(3)
+        graph = __unit__.compile_graph([start], self.CHILDREN_FUNC)
+
+        with self.assertRaises(__unit__.CycleError) as r:
+            list(graph.topological_order())
+        cycle = [node.value for node in r.exception.cycle]
+        self.assertEquals(4, len(cycle))
+        self.assertEquals(cycle[0], cycle[-1])
+        for node, next_node in zip(cycle, cycle[1:]):
+            self.assertEquals((node + 1) % 3, next_node)
+
+    @skipIf(numpy is None, "requires NumPy")
+    def test_to_numpy(self):
+        graph = __unit__.compile_graph([self._create_diamond()],
+                                       self.CHILDREN_FUNC)
+        offsets, targets = graph.to_numpy()
+
+        self.assertEquals(list(graph.offsets), offsets.tolist())
+        self.assertEquals(list(graph.targets), targets.tolist())
+
+
+class ReachabilityIndex(_DependencyGraph):
+    #: Graph with edges a -> b -> c -> d, a -> c and e -> d
+    ITEMS = [_DependencyGraph.Item("a"),
+             _DependencyGraph.Item("b", deps=("a",)),
+             _DependencyGraph.Item("c", deps=("a", "b")),
+             _DependencyGraph.Item("d", deps=("c", "e")),
+             _DependencyGraph.Item("e")]
+
+    def _index(self):
+        items = self._resolve(self.ITEMS)
+        index = __unit__.ReachabilityIndex(
+            items, self.INCOMING_FUNC, key=attr_func('name'))
+        return index, dict((item.name, item) for item in items)
+
+    def _names(self, items):
+        return [item.name for item in items]
+
+    def test_nodes__none(self):
+        with self.assertRaises(TypeError):
+            __unit__.ReachabilityIndex(None, self.INCOMING_FUNC)
+
+    def test_incoming__some_object(self):
+        with self.assertRaises(TypeError):
+            __unit__.ReachabilityIndex((), object())
+
+    def test_nodes__empty(self):
+        index = __unit__.ReachabilityIndex((), self.INCOMING_FUNC)
+        self.assertZero(len(index))
+
+    def test_nodes__cycle(self):
+        items = self._resolve(self.CIRCULAR_DEPS_ITEMS)
+        with self.assertRaises(__unit__.CycleError):
+            __unit__.ReachabilityIndex(items, self.INCOMING_FUNC)
+
+    def test_nodes__topological_order(self):
+        index, _ = self._index()
+        self.assertEquals(5, len(index))
+        self._assertDependenciesSatisfied(index.nodes)
+
+    def test_reaches(self):
+        index, items = self._index()
+        reachable = set(["ab", "ac", "ad", "bc", "bd", "cd", "ed"])
+        for from_ in "abcde":
+            for to in "abcde":
+                self.assertEquals(from_ + to in reachable,
+                                  index.reaches(items[from_], items[to]))
+
+    def test_reaches__missing_node(self):
+        index, items = self._index()
+        with self.assertRaises(KeyError):
+            index.reaches(items["a"], self.Item("z"))
+
+    def test_ancestors(self):
+        index, items = self._index()
+        self.assertEmpty(index.ancestors(items["a"]))
+        self.assertEquals(["a", "b"], self._names(index.ancestors(items["c"])))
+        self.assertItemsEqual("abce", self._names(index.ancestors(items["d"])))
+
+    def test_descendants(self):
+        index, items = self._index()
+        self.assertEquals(["b", "c", "d"],
+                          self._names(index.descendants(items["a"])))
+        self.assertEquals(["d"], self._names(index.descendants(items["e"])))
+        self.assertEmpty(index.descendants(items["d"]))
+
+
+# Dynamic graphs
+
+class DynamicTopologicalOrder(_DependencyGraph):
+
+    def _assertValidOrder(self, order, edges):
+        positions = dict((node, i) for i, node in enumerate(order))
+        for from_, to in edges:
+            self.assertLess(positions[from_], positions[to])
+
+    def test_ctor__nodes__some_object(self):
+        with self.assertRaises(TypeError):
+            __unit__.DynamicTopologicalOrder(object())
+
+    def test_ctor__no_args(self):
+        order = __unit__.DynamicTopologicalOrder()
+        self.assertZero(len(order))
+        self.assertEmpty(list(order))
+
+    def test_ctor__nodes_only(self):
+        order = __unit__.DynamicTopologicalOrder("abc", key=str)
+        self.assertEquals(list("abc"), list(order))
+
+    def test_ctor__nodes_and_incoming(self):
+        items = self._resolve(self.NO_DEPS_ITEMS + self.FIRST_GEN_ITEMS)
+        order = __unit__.DynamicTopologicalOrder(items, self.INCOMING_FUNC)
+
+        self.assertEquals(len(items), len(order))
+        self._assertDependenciesSatisfied(list(order))
+
+    def test_ctor__cycle(self):
+        items = self._resolve(self.CIRCULAR_DEPS_ITEMS)
+        with self.assertRaises(__unit__.CycleError):
+            __unit__.DynamicTopologicalOrder(items, self.INCOMING_FUNC)
+
+    def test_add_node__twice(self):
+        order = __unit__.DynamicTopologicalOrder(key=str)
+        order.add_node("a")
+        order.add_node("a")
+        self.assertEquals(["a"], list(order))
+        self.assertIn("a", order)
+
+    def test_add_edge__already_ordered(self):
+        order = __unit__.DynamicTopologicalOrder("abc", key=str)
+        order.add_edge("a", "c")
+        self.assertEquals(list("abc"), list(order))
+
+    def test_add_edge__reorders(self):
+        order = __unit__.DynamicTopologicalOrder("abcde", key=str)
+        order.add_edge("b", "c")
+        order.add_edge("d", "b")
+        order.add_edge("e", "a")
+
+        self._assertValidOrder(list(order), ["bc", "db", "ea"])
+
+    def test_add_edge__adds_nodes(self):
+        order = __unit__.DynamicTopologicalOrder(key=str)
+        order.add_edge("b", "a")
+        self.assertEquals(["b", "a"], list(order))
+
+    def test_add_edge__self_loop(self):
+        order = __unit__.DynamicTopologicalOrder("a", key=str)
+        with self.assertRaises(__unit__.CycleError) as r:
+            order.add_edge("a", "a")
+        self.assertEquals(["a", "a"], r.exception.cycle)
+
+    def test_add_edge__self_loop__new_node(self):
+        order = __unit__.DynamicTopologicalOrder(key=str)
+        with self.assertRaises(__unit__.CycleError):
+            order.add_edge("a", "a")
+        self.assertNotIn("a", order)
+        self.assertZero(len(order))
+
+    def test_add_edge__cycle(self):
+        order = __unit__.DynamicTopologicalOrder("abcd", key=str)
+        order.add_edge("a", "b")
+        order.add_edge("b", "c")
+        order.add_edge("c", "d")
+
+        with self.assertRaises(__unit__.CycleError) as r:
+            order.add_edge("d", "a")
+        self.assertEquals(list("dabcd"), r.exception.cycle)
+
+        # graph is left unchanged
+        self.assertEquals(list("abcd"), list(order))
+        order.add_edge("a", "d")
+
+    def test_add_edge__random(self):
+        import random
+        rng = random.Random(42)
+
+        size = 50
+        order = __unit__.DynamicTopologicalOrder(xrange(size), key=int)
+        edges = set()
+        for _ in xrange(500):
+            from_, to = rng.randrange(size), rng.randrange(size)
+            try:
+                order.add_edge(from_, to)
+            except __unit__.CycleError as e:
+                self.assertEquals(e.cycle[0], e.cycle[-1])
+                self.assertEquals([from_, to], e.cycle[:2])
+                for edge in izip(e.cycle[1:], e.cycle[2:]):
+                    self.assertIn(edge, edges)
+            else:
+                edges.add((from_, to))
+
+        self.assertItemsEqual(xrange(size), order)
+        self._assertValidOrder(list(order), edges)
+
+    def test_remove_edge(self):
+        order = __unit__.DynamicTopologicalOrder("ab", key=str)
+        order.add_edge("a", "b")
+        order.remove_edge("a", "b")
+        order.add_edge("b", "a")
+
+        self.assertEquals(["b", "a"], list(order))
+
+    def test_remove_edge__missing(self):
+        order = __unit__.DynamicTopologicalOrder("ab", key=str)
+        with self.assertRaises(KeyError):
+            order.remove_edge("a", "b")
+
@@ -0,0 +1,389 @@
+"""
+Tests for the .algorithms.aio module.
+"""
+import asyncio
+from collections import namedtuple
+import time
+
+from taipan.functional import functions ; attr_func = functions.attr_func
+from taipan.testing import TestCase
+
+import taipan.algorithms as algorithms
+import taipan.algorithms.aio as __unit__
+
+
+class _AsyncAlgorithm(TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def _run(self, coro):
+        return self.loop.run_until_complete(coro)
+
+    def _list(self, async_iterable):
+        async def collect():
+            return [item async for item in async_iterable]
+        return self._run(collect())
+
+
+# Itertools recipes
+
+class ABatch(_AsyncAlgorithm):
+    N = 3
+    WITH_LEFTOVERS = [1, 2, 3, 4, 5]
+    FILLVALUE = object()
+
+    def test_iterable__none(self):
+        with self.assertRaises(TypeError):
+            __unit__.abatch(None, 1)
+
+    def test_n__zero(self):
+        with self.assertRaises(ValueError):
+            __unit__.abatch(self.WITH_LEFTOVERS, 0)
+
+    def test_iterable__async(self):
+        batched = __unit__.abatch(_async_iter(self.WITH_LEFTOVERS), self.N)
+        self.assertEquals([(1, 2, 3), (4, 5)], self._list(batched))
+
+    def test_iterable__sync(self):
+        batched = __unit__.abatch(self.WITH_LEFTOVERS, self.N)
+        self.assertEquals([(1, 2, 3), (4, 5)], self._list(batched))
+
+    def test_fillvalue(self):
+        batched = __unit__.abatch(self.WITH_LEFTOVERS, self.N, self.FILLVALUE)
+        self.assertEquals([(1, 2, 3), (4, 5, self.FILLVALUE)],
+                          self._list(batched))
+
+    def test_max_weight(self):
+        batched = __unit__.abatch(["a", "bb", "ccc", "d"], max_weight=3)
+        self.assertEquals([("a", "bb"), ("ccc",), ("d",)],
+                          self._list(batched))
+
+    def test_max_wait__slow_iterable(self):
+        async def slow():
+            yield 1
+            yield 2
+            await asyncio.sleep(0.3)
+            yield 3
+
+        batched = __unit__.abatch(slow(), 10, max_wait=0.05)
+        self.assertEquals([(1, 2), (3,)], self._list(batched))
+
+    def test_max_wait__endless_iterable(self):
+        async def endless():
+            i = 0
+            while True:
+                yield i
+                i += 1
+
+        async def first_two(batched):
+            try:
+                return [await batched.__anext__(), await batched.__anext__()]
+            finally:
+                await batched.aclose()
+
+        start = time.time()
+        batched = __unit__.abatch(endless(), max_wait=0.05)
+        first, second = self._run(first_two(batched))
+
+        self.assertLess(time.time() - start, 5)
+        self.assertEquals(list(range(len(first))), list(first))
+        self.assertEquals(len(first), second[0])
+
+
+class ACycle(_AsyncAlgorithm):
+    ITERABLE = [1, 2, 3]
+
+    def test_iterable__none(self):
+        with self.assertRaises(TypeError):
+            __unit__.acycle(None)
+
+    def test_n__negative(self):
+        with self.assertRaises(ValueError):
+            __unit__.acycle(self.ITERABLE, -1)
+
+    def test_n__zero(self):
+        self.assertEquals([], self._list(__unit__.acycle(self.ITERABLE, 0)))
+
+    def test_n__positive(self):
+        cycled = __unit__.acycle(_async_iter(self.ITERABLE), 3)
+        self.assertEquals(self.ITERABLE * 3, self._list(cycled))
+
+    def test_n__none(self):
+        cycled = __unit__.acycle(_async_iter(self.ITERABLE))
+
+        async def take(count):
+            return [await cycled.__anext__() for _ in range(count)]
+
+        self.assertEquals(self.ITERABLE * 5, self._run(take(15)))
+
+
+class AIntertwine(_AsyncAlgorithm):
+    LONGER = [13, 21, 34, 55, 89]
+    SHORTER = ['foo', 'bar', 'baz']
+    LONGER_AND_SHORTER = [13, 'foo', 21, 'bar', 34, 'baz', 55, 89]
+
+    def test_no_args(self):
+        self.assertEquals([], self._list(__unit__.aintertwine()))
+
+    def test_some_object(self):
+        with self.assertRaises(TypeError):
+            __unit__.aintertwine(object())
+
+    def test_two_iterables__inequal_lengths(self):
+        intertwined = __unit__.aintertwine(
+            _async_iter(self.LONGER), _async_iter(self.SHORTER))
+        self.assertEquals(self.LONGER_AND_SHORTER, self._list(intertwined))
+
+    def test_weights(self):
+        intertwined = __unit__.aintertwine(
+            self.LONGER, self.SHORTER, weights=[2, 1])
+        self.assertEquals([13, 21, 'foo', 34, 55, 'bar', 89, 'baz'],
+                          self._list(intertwined))
+
+    def test_concurrent_retrieval(self):
+        async def slow(items):
+            for item in items:
+                await asyncio.sleep(0.05)
+                yield item
+
+        sources = [slow([i, i]) for i in range(10)]
+        start = self.loop.time()
+        intertwined = self._list(__unit__.aintertwine(*sources))
+
+        self.assertEquals(list(range(10)) * 2, intertwined)
+        self.assertLess(self.loop.time() - start, 0.05 * 10)
+
+
+class AIterate(_AsyncAlgorithm):
+
+    def test_n__none(self):
+        iterator = iter(range(10))
+        self._run(__unit__.aiterate(iterator))
+        self.assertIsNone(next(iterator, None))
+
+    def test_n__few(self):
+        aiterator = _async_iter(range(10))
+        self._run(__unit__.aiterate(aiterator, 4))
+        self.assertEquals(list(range(4, 10)), self._list(aiterator))
+
+    def test_n__past_the_end(self):
+        aiterator = _async_iter(range(3))
+        self._run(__unit__.aiterate(aiterator, 10))
+        self.assertEquals([], self._list(aiterator))
+
+
+class APad(_AsyncAlgorithm):
+    PADDING = object()
+
+    def test_iterable__none(self):
+        with self.assertRaises(TypeError):
+            __unit__.apad(None)
+
+    def test_pad__custom(self):
+        padded = __unit__.apad(_async_iter([1, 2]), with_=self.PADDING)
+
+        async def take(count):
+            return [await padded.__anext__() for _ in range(count)]
+
+        self.assertEquals([1, 2] + [self.PADDING] * 3, self._run(take(5)))
+
+
+class AUnique(_AsyncAlgorithm):
+
+    def test_iterable__none(self):
+        with self.assertRaises(TypeError):
+            __unit__.aunique(None)
+
+    def test_iterable__with_duplicates(self):
+        uniqued = __unit__.aunique(_async_iter([1, 2, 2, 3, 4, 5, 1]))
+        self.assertEquals([1, 2, 3, 4, 5], self._list(uniqued))
+
+    def test_key__strlen(self):
+        uniqued = __unit__.aunique(
+            "Alice has a cat and a dog".split(), key=len)
+        self.assertEquals(["Alice", "has", "a"], self._list(uniqued))
+
+    def test_window(self):
+        uniqued = __unit__.aunique([1, 2, 3, 1, 3, 2], window=2)
+        self.assertEquals([1, 2, 3, 1, 2], self._list(uniqued))
+
+    def test_error_rate(self):
+        uniqued = __unit__.aunique(
+            [1, 2, 2, 3, 1], error_rate=0.001, capacity=100)
+        self.assertEquals([1, 2, 3], self._list(uniqued))
+
+
+# Traversal
+
+class _AsyncTraversal(_AsyncAlgorithm):
+    Node = namedtuple('Node', ['value', 'children'])
+    CHILDREN_FUNC = attr_func('children')
+
+    def _create_node(self, value=None, children=None):
+        return self.Node(value=value, children=list(children or []))
+
+    def _create_tree(self, depth, fanout, start=0):
+        counter = [start]
+
+        def create(level):
+            value = counter[0]
+            counter[0] += 1
+            children = [create(level + 1) for _ in range(fanout)] \
+                if level < depth else []
+            return self._create_node(value, children)
+
+        return create(0)
+
+    def _create_cycle(self, length):
+        nodes = [self._create_node(i) for i in range(length)]
+        for node, next_node in zip(nodes, nodes[1:] + nodes[:1]):
+            node.children.append(next_node)
+        return nodes[0]
+
+    def _async_expand(self, delay=0, calls=None):
+        """Create a coroutine function which expands nodes
+        and keeps track of how many are running at the same time.
+        """
+        calls = {'running': 0, 'max_running': 0} if calls is None else calls
+
+        async def expand(node):
+            calls['running'] += 1
+            calls['max_running'] = max(calls['max_running'], calls['running'])
+            try:
+                await asyncio.sleep(delay)
+                return node.children
+            finally:
+                calls['running'] -= 1
+
+        return expand
+
+
+class ABreadthFirst(_AsyncTraversal):
+
+    def test_expand__none(self):
+        with self.assertRaises(TypeError):
+            __unit__.abreadth_first(self._create_node(), None)
+
+    def test_concurrency__zero(self):
+        with self.assertRaises(ValueError):
+            __unit__.abreadth_first(
+                self._create_node(), self.CHILDREN_FUNC, concurrency=0)
+
+    def test_start__single_node(self):
+        node = self._create_node()
+        self.assertEquals(
+            [node], self._list(__unit__.abreadth_first(
+                node, self._async_expand())))
+
+    def test_start__tree__same_order_as_sync(self):
+        tree = self._create_tree(depth=3, fanout=3)
+        expected = list(algorithms.breadth_first(tree, self.CHILDREN_FUNC))
+        actual = self._list(
+            __unit__.abreadth_first(tree, self._async_expand(), concurrency=4))
+        self.assertEquals(expected, actual)
+
+    def test_expand__sync_function(self):
+        tree = self._create_tree(depth=2, fanout=2)
+        expected = list(algorithms.breadth_first(tree, self.CHILDREN_FUNC))
+        actual = self._list(__unit__.abreadth_first(tree, self.CHILDREN_FUNC))
+        self.assertEquals(expected, actual)
+
+    def test_concurrency__bounded(self):
+        tree = self._create_tree(depth=2, fanout=10)
+        calls = {'running': 0, 'max_running': 0}
+        self._list(__unit__.abreadth_first(
+            tree, self._async_expand(0.001, calls), concurrency=3))
+
+        self.assertLessEqual(calls['max_running'], 3)
+        self.assertGreater(calls['max_running'], 1)
+
+    def test_visited__cycle(self):
+        graph = self._create_cycle(5)
+        bfs = __unit__.abreadth_first(
+            graph, self._async_expand(), visited=True)
+        self.assertEquals(list(range(5)), [n.value for n in self._list(bfs)])
+
+    def test_max_depth__and_annotated(self):
+        tree = self._create_tree(depth=3, fanout=2)
+        bfs = __unit__.abreadth_first(tree, self._async_expand(),
+                                      max_depth=1, annotated=True)
+        self.assertEquals([(0, 0, None), (1, 1, 0), (8, 1, 0)],
+                          [(node.value, depth, parent and parent.value)
+                           for node, depth, parent in self._list(bfs)])
+
+
+class ADepthFirst(_AsyncTraversal):
+
+    def test_descend__none(self):
+        with self.assertRaises(TypeError):
+            __unit__.adepth_first(self._create_node(), None)
+
+    def test_concurrency__some_object(self):
+        with self.assertRaises(TypeError):
+            __unit__.adepth_first(
+                self._create_node(), self.CHILDREN_FUNC, concurrency=object())
+
+    def test_start__tree__same_order_as_sync(self):
+        tree = self._create_tree(depth=3, fanout=3)
+        expected = list(algorithms.depth_first(tree, self.CHILDREN_FUNC))
+        actual = self._list(
+            __unit__.adepth_first(tree, self._async_expand(), concurrency=4))
+        self.assertEquals(expected, actual)
+
+    def test_start__graph__same_order_as_sync(self):
+        graph = {0: [1, 2, 3], 1: [2], 2: [1], 3: []}
+        expected = list(algorithms.depth_first(
+            0, graph.__getitem__, max_depth=4))
+        actual = self._list(__unit__.adepth_first(
+            0, graph.__getitem__, concurrency=2, max_depth=4))
+        self.assertEquals(expected, actual)
+
+    def test_visited__dag__same_order_as_sync(self):
+        import random
+        rng = random.Random(42)
+
+        for _ in range(50):
+            size = rng.randint(2, 20)
+            dag = dict((i, [j for j in range(i + 1, size)
+                            if rng.random() < 0.3])
+                       for i in range(size))
+
+            async def descend(node):
+                await asyncio.sleep(0)
+                return dag[node]
+
+            expected = list(algorithms.depth_first(
+                0, dag.__getitem__, visited=True))
+            actual = self._list(__unit__.adepth_first(
+                0, descend, concurrency=3, visited=True))
+            self.assertEquals(expected, actual)
+
+    def test_concurrency__bounded(self):
+        tree = self._create_tree(depth=2, fanout=10)
+        calls = {'running': 0, 'max_running': 0}
+        self._list(__unit__.adepth_first(
+            tree, self._async_expand(0.001, calls), concurrency=3))
+
+        self.assertLessEqual(calls['max_running'], 3)
+        self.assertGreater(calls['max_running'], 1)
+
+    def test_visited__cycle(self):
+        graph = self._create_cycle(5)
+        dfs = __unit__.adepth_first(graph, self._async_expand(), visited=True)
+        self.assertEquals(list(range(5)), [n.value for n in self._list(dfs)])
+
+    def test_max_depth(self):
+        tree = self._create_tree(depth=3, fanout=2)
+        dfs = __unit__.adepth_first(tree, self._async_expand(), max_depth=1)
+        self.assertEquals([0, 8, 1], [n.value for n in self._list(dfs)])
+
+
+# Utility functions
+
+async def _async_iter(iterable):
+    for item in iterable:
+        yield item
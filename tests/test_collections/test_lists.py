@@ -3,6 +3,8 @@ Tests for the .collections.lists module.
 """
 from contextlib import contextmanager
 
+from taipan._compat import xrange
+from taipan.collections import is_sequence
 from taipan.testing import TestCase
 
 import taipan.collections.lists as __unit__
@@ -418,3 +420,96 @@ class Concat(TestCase):
 
     def test_correct(self):
         self.assertEquals(self.CONCATENATED, __unit__.concat(self.LISTS))
+
+
+# Lazy sequences
+
+class LazySeq(TestCase):
+    LENGTH = 1000
+    CHUNK_SIZE = 10
+
+    def _create(self, length=LENGTH):
+        """Create a lazy sequence over a generator which records
+        how many elements were pulled from it.
+        """
+        self.pulled = 0
+
+        def generator():
+            for i in xrange(length):
+                self.pulled += 1
+                yield i
+
+        return __unit__.LazySeq(generator(), chunk_size=self.CHUNK_SIZE)
+
+    def test_iterable__none(self):
+        with self.assertRaises(TypeError):
+            __unit__.LazySeq(None)
+
+    def test_chunk_size__zero(self):
+        with self.assertRaises(ValueError):
+            __unit__.LazySeq([], chunk_size=0)
+
+    def test_is_sequence(self):
+        self.assertTrue(is_sequence(self._create()))
+
+    def test_empty(self):
+        seq = self._create(0)
+        self.assertFalse(seq)
+        self.assertZero(len(seq))
+        self.assertEmpty(list(seq))
+
+    def test_index(self):
+        seq = self._create()
+        self.assertEquals(5, seq[5])
+        self.assertEquals(self.CHUNK_SIZE, self.pulled)
+        self.assertFalse(seq.exhausted)
+
+    def test_index__out_of_range(self):
+        seq = self._create()
+        with self.assertRaises(IndexError):
+            seq[self.LENGTH]
+        self.assertTrue(seq.exhausted)
+
+    def test_index__negative(self):
+        seq = self._create()
+        self.assertEquals(self.LENGTH - 1, seq[-1])
+        self.assertTrue(seq.exhausted)
+
+    def test_slice(self):
+        seq = self._create()
+        self.assertEquals([20, 22, 24], seq[20:25:2])
+        self.assertLessEqual(self.pulled, 3 * self.CHUNK_SIZE)
+
+    def test_slice__open_ended(self):
+        seq = self._create()
+        self.assertEquals([997, 998, 999], seq[997:])
+        self.assertEquals([2, 1, 0], seq[2::-1])
+
+    def test_bool(self):
+        seq = self._create()
+        self.assertTrue(seq)
+        self.assertEquals(self.CHUNK_SIZE, self.pulled)
+
+    def test_len(self):
+        seq = self._create()
+        self.assertEquals(self.LENGTH, len(seq))
+        self.assertEquals(self.LENGTH, self.pulled)
+
+    def test_iter__partial(self):
+        seq = self._create()
+        for i, elem in enumerate(seq):
+            if i == 14:
+                break
+        self.assertEquals(2 * self.CHUNK_SIZE, self.pulled)
+
+    def test_iter__many_times(self):
+        seq = self._create()
+        first, second = iter(seq), iter(seq)
+        self.assertEquals(list(xrange(self.LENGTH)), list(first))
+        self.assertEquals(list(xrange(self.LENGTH)), list(second))
+        self.assertEquals(self.LENGTH, self.pulled)
+
+    def test_contains(self):
+        seq = self._create()
+        self.assertIn(15, seq)
+        self.assertEquals(2 * self.CHUNK_SIZE, self.pulled)